@@ -0,0 +1,145 @@
+"""Benchmark suite of the data layer, CLI commands and rendering on synthetic datasets.
+
+Run with: PYTHONPATH=src python -m benchmarks run --scales 1000,10000,100000 -o results.json
+Compare two runs with: PYTHONPATH=src python -m benchmarks compare base.json results.json
+"""
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from fnmatch import fnmatch
+from typing import Dict, List, Optional, Tuple
+
+from typer import Argument, Exit, Option, Typer, echo
+
+from benchmarks.datasets import SCALES, dataset_path
+from benchmarks.scenarios import SCENARIOS, BenchmarkContext, prepare_environment, reset_console
+from tasks_tracker.configs import __version__
+from tasks_tracker.database import TasksTrackerData
+
+app = Typer(add_completion=False, help=__doc__)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+
+
+def run_scenario(name: str, context: BenchmarkContext, runs: int) -> Dict[str, float]:
+    operation = SCENARIOS[name].setup(context, runs + 1)
+    operation(runs)  # Warm up the caches with a run that is not measured
+
+    timings: List[float] = []
+    for run in range(runs):
+        started_at = time.perf_counter()
+        operation(run)
+        timings.append((time.perf_counter() - started_at) * 1000)
+        reset_console()
+
+    return {
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+        "max_ms": max(timings),
+    }
+
+
+@app.command()
+def run(
+    scales: str = Option(
+        "1000,10000,100000", help=f"Comma separated dataset sizes, e.g. {SCALES}."
+    ),
+    scenarios: str = Option("*", help="Comma separated scenario names, * patterns allowed."),
+    runs: int = Option(10, min=1, help="Measured runs per scenario."),
+    seed: int = Option(1017, help="Seed of the generated datasets."),
+    data_dir: str = Option(DEFAULT_DATA_DIR, help="Folder that keeps the generated datasets."),
+    output: Optional[str] = Option(None, "--output", "-o", help="JSON file for the results."),
+    include_slow: bool = Option(
+        False, help="Also run scenarios on scales above their limit, e.g. full scans of 10M rows."
+    ),
+) -> None:
+    """Run scenarios on every scale and print, or save, the timings."""
+    patterns = [pattern.strip() for pattern in scenarios.split(",")]
+    names = [name for name in SCENARIOS if any(fnmatch(name, pattern) for pattern in patterns)]
+    results = []
+
+    for scale in (int(scale) for scale in scales.split(",")):
+        source_path = dataset_path(data_dir, scale, seed)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            # Scenarios write, they run on a copy so that the kept dataset stays the same
+            db_path = os.path.join(work_dir, "tasks-tracker.db")
+            shutil.copyfile(source_path, db_path)
+            context = BenchmarkContext(db_path, scale, seed, TasksTrackerData(db_path), work_dir)
+            prepare_environment(context)
+
+            for name in names:
+                max_scale = SCENARIOS[name].max_scale
+                if max_scale and scale > max_scale and not include_slow:
+                    continue
+                timings = run_scenario(name, context, runs)
+                results.append({"scenario": name, "scale": scale, "runs": runs, **timings})
+                echo(f"{name:<45}{scale:>12,}{timings['median_ms']:>12.3f} ms")
+
+            context.tasks_data.connection.close()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "version": __version__,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": seed,
+        },
+        "results": results,
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, indent=2)
+
+
+def load_results(file_path: str) -> Dict[Tuple[str, int], dict]:
+    with open(file_path, encoding="utf-8") as stream:
+        report = json.load(stream)
+    return {(result["scenario"], result["scale"]): result for result in report["results"]}
+
+
+@app.command()
+def compare(
+    base: str = Argument(..., help="Results of the reference run."),
+    head: str = Argument(..., help="Results of the run to check."),
+    threshold: float = Option(0.15, help="Relative slowdown reported as a regression."),
+    metric: str = Option("median_ms", help="Timing compared between the runs."),
+) -> None:
+    """Compare two result files and exit with code 1 when a scenario got slower."""
+    base_results = load_results(base)
+    head_results = load_results(head)
+    regressions = 0
+
+    echo(f"{'scenario':<45}{'scale':>12}{'base':>12}{'head':>12}{'change':>10}")
+    for key in sorted(base_results.keys() & head_results.keys()):
+        base_ms = base_results[key][metric]
+        head_ms = head_results[key][metric]
+        change = head_ms / base_ms - 1 if base_ms else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  faster"
+        echo(f"{key[0]:<45}{key[1]:>12,}{base_ms:>12.3f}{head_ms:>12.3f}{change:>+10.1%}{flag}")
+
+    unmatched_results = len(base_results.keys() ^ head_results.keys())
+    if unmatched_results:
+        echo(f"{unmatched_results} result(s) only in one of the files were skipped.")
+
+    if regressions:
+        echo(f"{regressions} regression(s) above {threshold:.0%}.")
+        raise Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,92 @@
+"""Throughput and lost writes of many processes adding and updating tasks at the same time.
+
+Every process adds its own tasks then marks them as done, one transaction per write, like
+cron jobs running `tasks-tracker add` and `tasks-tracker update` at the same time.
+
+Run with: PYTHONPATH=src python -m benchmarks.concurrency --processes 1,4,16
+"""
+import io
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Tuple
+
+from rich.console import Console
+from typer import Option, run
+
+from tasks_tracker import utils
+from tasks_tracker.connection import ConnectionSettings
+from tasks_tracker.database import TasksTrackerData
+from tasks_tracker.model import Task
+
+
+def write_tasks(db_path: str, settings: ConnectionSettings, worker: int, tasks: int) -> int:
+    """Add then update the tasks of the worker and return how many writes failed."""
+    # Failed writes are counted, their error panels are not needed
+    utils._console = Console(file=io.StringIO())
+    try:
+        tasks_data = TasksTrackerData(db_path, settings)
+    except sqlite3.OperationalError:
+        # Without a busy timeout, even opening the database fails while another process writes
+        return tasks * 2
+
+    failed_writes = 0
+    for index in range(tasks):
+        task = Task(
+            f"{worker:04d}{index:06d}", "task", "not_started", "low", None, "2022-01-01", None
+        )
+        failed_writes += not tasks_data.add_new_task(task)
+        failed_writes += not tasks_data.update_task(task._replace(status="done"))
+    tasks_data.connection.close()
+    return failed_writes
+
+
+def stress(
+    directory: str, settings: ConnectionSettings, processes: int, tasks: int
+) -> Tuple[float, int, int]:
+    db_path = os.path.join(directory, f"{settings.journal_mode}-{processes}.db")
+    TasksTrackerData(db_path, settings).connection.close()
+
+    started_at = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        failed_writes = pool.starmap(
+            write_tasks, [(db_path, settings, worker, tasks) for worker in range(processes)]
+        )
+    seconds = time.perf_counter() - started_at
+
+    tasks_data = TasksTrackerData(db_path, settings)
+    done_tasks = tasks_data.connection.execute(
+        "SELECT COUNT(*) FROM tasks WHERE status = 'done'"
+    ).fetchone()[0]
+    tasks_data.connection.close()
+    lost_writes = processes * tasks - done_tasks
+    return processes * tasks * 2 / seconds, sum(failed_writes), lost_writes
+
+
+def main(
+    processes: str = Option("1,4,16", help="Comma separated numbers of writer processes."),
+    tasks: int = Option(200, help="Tasks added and updated by every process."),
+) -> None:
+    configurations = {
+        "rollback journal, no retry": ConnectionSettings(
+            journal_mode="delete", synchronous="full", busy_timeout_ms=0, write_retries=0
+        ),
+        "wal, busy timeout and retries": ConnectionSettings(),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, settings in configurations.items():
+            for process_count in (int(count) for count in processes.split(",")):
+                writes_per_second, failed_writes, lost_writes = stress(
+                    directory, settings, process_count, tasks
+                )
+                print(
+                    f"{name:<30} {process_count:>3} processes: {writes_per_second:>8,.0f} writes/sec, "
+                    f"{failed_writes} failed, {lost_writes} tasks not done"
+                )
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,99 @@
+"""Latency of commands run in-process and forwarded to `tasks-tracker serve`.
+
+Run with: PYTHONPATH=src python -m benchmarks.daemon --rows 100000
+"""
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+from typer import Option, run
+
+from benchmarks.datasets import generate_task_rows
+from tasks_tracker.client import forward_command
+from tasks_tracker.configs import NO_DAEMON_ENV
+from tasks_tracker.database import TasksTrackerData
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# The server and the in-process commands use the generated database. Forwarded commands do
+# not open it, and must not import the database module to change its path.
+ENTRY_POINT = "import sys; from tasks_tracker import database; database.DB_PATH = sys.argv.pop(1); from tasks_tracker import main; sys.argv[0] = 'tasks-tracker'; main()"
+CLIENT_ENTRY_POINT = "import sys; sys.argv.pop(1); from tasks_tracker import main; sys.argv[0] = 'tasks-tracker'; main()"
+
+COMMANDS = (["list", "--limit", "10"], ["add", "benchmark task", "-p", "high"])
+
+
+def run_entry_point(
+    db_path: str, args: List[str], env: Dict[str, str], entry_point: str = ENTRY_POINT
+) -> float:
+    started_at = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", entry_point, db_path, *args],
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - started_at
+
+
+def forward(socket_path: str, args: List[str]) -> float:
+    started_at = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        forward_command(socket_path, args)
+    return time.perf_counter() - started_at
+
+
+def wait_for_socket(socket_path: str, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if time.monotonic() > deadline:
+            raise RuntimeError("The server did not start.")
+        time.sleep(0.05)
+
+
+def main(
+    rows: int = Option(100_000, help="Number of tasks in the database."),
+    runs: int = Option(20, help="Number of runs per command."),
+    seed: int = Option(1017, help="Seed of the generated data."),
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "tasks-tracker.db")
+        socket_path = os.path.join(directory, "tasks-tracker.sock")
+        tasks_data = TasksTrackerData(db_path)
+        tasks_data.add_tasks_batch(list(generate_task_rows(rows, seed)))
+        tasks_data.connection.close()
+
+        env = {**os.environ, "PYTHONPATH": SRC_DIR, "TASKS_TRACKER_SOCKET": socket_path}
+        server = subprocess.Popen(
+            [sys.executable, "-c", ENTRY_POINT, db_path, "serve"],
+            env={**env, NO_DAEMON_ENV: "1"},
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_socket(socket_path)
+            for args in COMMANDS:
+                in_process = [
+                    run_entry_point(db_path, args, {**env, NO_DAEMON_ENV: "1"}) for _ in range(runs)
+                ]
+                forwarded = [
+                    run_entry_point(db_path, args, env, CLIENT_ENTRY_POINT) for _ in range(runs)
+                ]
+                round_trip = [forward(socket_path, args) for _ in range(runs)]
+                print(
+                    f"{' '.join(args):<28} in-process {statistics.median(in_process) * 1000:>7.1f}ms, "
+                    f"forwarded {statistics.median(forwarded) * 1000:>7.1f}ms, "
+                    f"server round trip {statistics.median(round_trip) * 1000:>6.1f}ms"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    run(main)
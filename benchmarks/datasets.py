@@ -0,0 +1,112 @@
+"""Seeded synthetic task databases for the benchmarks."""
+import os
+import random
+from datetime import date, timedelta
+from itertools import islice
+from typing import Iterator, List, Optional
+
+from tasks_tracker.database import SCHEMA_VERSION, TasksTrackerData
+from tasks_tracker.model import TaskRow
+from tasks_tracker.typing import Priority, Status
+
+SCALES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Most tasks of a long lived tracker are done, few are on hold
+STATUS_WEIGHTS = {
+    Status.DONE: 55,
+    Status.IN_PROGRESS: 15,
+    Status.NOT_STARTED: 25,
+    Status.ON_HOLD: 5,
+}
+PRIORITY_WEIGHTS = {Priority.LOW: 50, Priority.MEDIUM: 35, Priority.HIGH: 15}
+
+# Start dates spread over the last 3 years and the next 3 months, 60% of tasks have an end date
+# up to 90 days after their start date, which leaves some of them overdue.
+HISTORY_DAYS = 3 * 365
+FUTURE_DAYS = 90
+END_DATE_RATIO = 0.6
+MAX_DURATION_DAYS = 90
+
+# An odd multiplier is a permutation of the 40 bits IDs, so every index gets a unique ID that does
+# not follow the insertion order.
+ID_MULTIPLIER = 0x9E3779B97F
+ID_MASK = 16**10 - 1
+
+WORDS = (
+    "review design deploy fix write plan test update release check clean migrate document "
+    "refactor prepare call meet draft send book order report"
+).split()
+
+GENERATION_CHUNK_SIZE = 10_000
+
+
+def task_id(index: int) -> str:
+    return f"{(index * ID_MULTIPLIER) & ID_MASK:010x}"
+
+
+def generate_task_rows(count: int, seed: int, today: Optional[date] = None) -> Iterator[TaskRow]:
+    randomizer = random.Random(seed)
+    first_day = (today or date.today()) - timedelta(days=HISTORY_DAYS)
+    statuses = [status.value for status in STATUS_WEIGHTS]
+    priorities = [priority.value for priority in PRIORITY_WEIGHTS]
+    dates = [
+        (first_day + timedelta(days=day)).isoformat()
+        for day in range(HISTORY_DAYS + FUTURE_DAYS + MAX_DURATION_DAYS + 1)
+    ]
+
+    for chunk_start in range(0, count, GENERATION_CHUNK_SIZE):
+        size = min(GENERATION_CHUNK_SIZE, count - chunk_start)
+        chunk_statuses = randomizer.choices(statuses, list(STATUS_WEIGHTS.values()), k=size)
+        chunk_priorities = randomizer.choices(priorities, list(PRIORITY_WEIGHTS.values()), k=size)
+
+        for offset in range(size):
+            index = chunk_start + offset
+            start_day = randomizer.randrange(HISTORY_DAYS + FUTURE_DAYS)
+            has_end_date = randomizer.random() < END_DATE_RATIO
+            title_words = randomizer.sample(WORDS, 3)
+            yield (
+                task_id(index),
+                " ".join(title_words)[:30],
+                chunk_statuses[offset],
+                chunk_priorities[offset],
+                f"{title_words[0]} the task number {index}" if index % 4 else None,
+                dates[start_day],
+                dates[start_day + randomizer.randrange(MAX_DURATION_DAYS)]
+                if has_end_date
+                else None,
+            )
+
+
+def sample_ids(count: int, size: int, seed: int) -> List[str]:
+    randomizer = random.Random(seed)
+    return [task_id(randomizer.randrange(count)) for _ in range(size)]
+
+
+def create_dataset(db_path: str, count: int, seed: int, batch_size: int = 50_000) -> None:
+    tasks_data = TasksTrackerData(db_path)
+    rows = generate_task_rows(count, seed)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        tasks_data.add_tasks_batch(batch)
+    tasks_data.connection.execute("ANALYZE")
+    tasks_data.connection.close()
+
+
+def dataset_path(data_dir: str, count: int, seed: int) -> str:
+    """Return the path of a dataset, generated the first time it is asked for.
+
+    Datasets are kept between runs because the large ones take minutes to write. Their name holds
+    everything they depend on, so a new day or schema version gets a new file.
+    """
+    name = f"tasks-{count}-seed{seed}-v{SCHEMA_VERSION}-{date.today().isoformat()}.db"
+    db_path = os.path.join(data_dir, name)
+    if not os.path.exists(db_path):
+        os.makedirs(data_dir, exist_ok=True)
+        partial_path = f"{db_path}.partial"
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        create_dataset(partial_path, count, seed)
+        os.replace(partial_path, db_path)
+    return db_path
@@ -0,0 +1,88 @@
+"""Memory per task and rows per second of turning query rows into tasks.
+
+The `Task` class used before tasks became a NamedTuple is kept here as the baseline.
+
+Run with: PYTHONPATH=src python -m benchmarks.hydration --rows 200000
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+from typer import Option, run
+
+from benchmarks.datasets import generate_task_rows
+from tasks_tracker.database import TASK_COLUMNS, TasksTrackerData, task_row_factory
+from tasks_tracker.model import Task, generate_task_id
+
+
+class LegacyTask:
+    def __init__(
+        self,
+        id: Optional[str],
+        title: Optional[str],
+        status: Optional[str],
+        priority: Optional[str],
+        description: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        due_state: Optional[str] = None,
+    ) -> None:
+        self.id = id if id else generate_task_id()
+        self.title = title
+        self.status = status
+        self.priority = priority
+        self.description = description
+        self.start_date = start_date
+        self.end_date = end_date
+        self.due_state = due_state
+
+
+def measure(name: str, rows: int, hydrate: Callable[[], List]) -> None:
+    started_at = time.perf_counter()
+    hydrate()
+    seconds = time.perf_counter() - started_at
+
+    # Memory is measured on a second run, tracing allocations slows hydration down
+    tracemalloc.start()
+    tasks = hydrate()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+
+    print(f"{name:<24} {rows / seconds:>12,.0f} rows/sec, {memory / rows:>6,.0f} bytes/task")
+
+
+def main(
+    rows: int = Option(200_000, help="Number of tasks to hydrate."),
+    seed: int = Option(1017, help="Seed of the generated data."),
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        tasks_data = TasksTrackerData(os.path.join(directory, "tasks-tracker.db"))
+        tasks_data.add_tasks_batch(list(generate_task_rows(rows, seed)))
+        query = f"SELECT {TASK_COLUMNS}, NULL from tasks ORDER BY start_date ASC, id ASC"
+
+        def fetch_rows() -> List:
+            return tasks_data.connection.execute(query).fetchall()
+
+        def fetch_tasks() -> List:
+            cursor = tasks_data.connection.cursor()
+            cursor.row_factory = task_row_factory
+            return cursor.execute(query).fetchall()
+
+        measure("tuples", rows, fetch_rows)
+        measure("legacy Task(*row)", rows, lambda: [LegacyTask(*row) for row in fetch_rows()])
+        measure("Task(*row)", rows, lambda: [Task(*row) for row in fetch_rows()])
+        measure("task_row_factory", rows, fetch_tasks)
+        measure(
+            "get_task_columns",
+            rows,
+            lambda: list(tasks_data.get_task_columns(["status", "priority"]).values()),
+        )
+
+        tasks_data.connection.close()
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,87 @@
+"""Throughput of the thread-safe data layer from 1 to 32 threads.
+
+Every thread runs the same mix as a dashboard: task lookups, first pages of the list and a
+share of updates. The pooled data layer is compared with every call going through one shared
+connection behind a lock, which is what sharing a plain `TasksTrackerData` would need.
+
+Run with: PYTHONPATH=src python -m benchmarks.pool --rows 100000 --threads 1,2,4,8,16,32
+"""
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlite3 import Connection
+
+from typer import Option, run
+
+from benchmarks.datasets import create_dataset, sample_ids
+from tasks_tracker.configs import LIST_PAGE_SIZE
+from tasks_tracker.pool import PooledTasksTrackerData
+
+
+class SerializedTasksTrackerData(PooledTasksTrackerData):
+    """Every call uses the write connection and waits for the write lock."""
+
+    def reader(self) -> Connection:
+        return self.pool.write_connection
+
+    def find_task_by_id(self, id):
+        with self.pool.write_lock:
+            return super().find_task_by_id(id)
+
+    def get_tasks_list(self, *args, **kwargs):
+        with self.pool.write_lock:
+            return super().get_tasks_list(*args, **kwargs)
+
+
+def run_operations(tasks_data: PooledTasksTrackerData, ids, seed: int, update_ratio: float) -> int:
+    randomizer = random.Random(seed)
+    for id in ids:
+        task = tasks_data.find_task_by_id(id)
+        if randomizer.random() < update_ratio:
+            tasks_data.update_task(task._replace(title="updated"))
+        else:
+            tasks_data.get_tasks_list(limit=LIST_PAGE_SIZE + 1)
+    return len(ids)
+
+
+def measure(tasks_data: PooledTasksTrackerData, threads: int, operations: int, rows: int) -> float:
+    ids = sample_ids(rows, operations, seed=threads)
+    chunks = [ids[thread::threads] for thread in range(threads)]
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        done = sum(
+            executor.map(
+                lambda thread: run_operations(tasks_data, chunks[thread], thread, 0.1),
+                range(threads),
+            )
+        )
+    return done / (time.perf_counter() - started_at)
+
+
+def main(
+    rows: int = Option(100_000, help="Number of tasks in the database."),
+    threads: str = Option("1,2,4,8,16,32", help="Comma separated numbers of threads."),
+    operations: int = Option(5000, help="Operations per measure, shared by the threads."),
+    seed: int = Option(1017, help="Seed of the generated data."),
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "tasks-tracker.db")
+        create_dataset(db_path, rows, seed)
+
+        for name, data_class in (
+            ("shared connection", SerializedTasksTrackerData),
+            ("pooled", PooledTasksTrackerData),
+        ):
+            tasks_data = data_class(db_path)
+            for thread_count in (int(count) for count in threads.split(",")):
+                operations_per_second = measure(tasks_data, thread_count, operations, rows)
+                print(
+                    f"{name:<18} {thread_count:>3} threads: {operations_per_second:>9,.0f} ops/sec"
+                )
+            tasks_data.close()
+
+
+if __name__ == "__main__":
+    run(main)
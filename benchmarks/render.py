@@ -0,0 +1,82 @@
+"""Rows per second of every `list --format` renderer.
+
+The tasks are rendered in pages of LIST_PAGE_SIZE like the list command does, into memory: the
+table through a rich console sized like a terminal, the other formats through a text stream.
+The table is the slowest by far, so it only renders the first `--table-rows` tasks. The texts
+of its cells are also measured alone on all the tasks, which is the part rich does not draw.
+
+Run with: PYTHONPATH=src python -m benchmarks.render --rows 100000
+"""
+import io
+import time
+from datetime import date
+from typing import List
+
+from rich.console import Console
+from typer import Option, run
+
+from benchmarks.datasets import generate_task_rows
+from tasks_tracker import utils
+from tasks_tracker.configs import LIST_PAGE_SIZE
+from tasks_tracker.model import Task
+from tasks_tracker.render import RENDERERS
+from tasks_tracker.typing import ListFormat
+from tasks_tracker.utils import (
+    TABLE_DUE_STATE_WARNINGS,
+    EndDateCells,
+    get_due_state,
+    print_date,
+    styling_priority,
+    styling_status,
+)
+
+
+def load_tasks(rows: int, seed: int) -> List[Task]:
+    # Due states as the list query computes them
+    return [
+        Task(*row, get_due_state(row[6]) if row[6] else None)
+        for row in generate_task_rows(rows, seed, today=date.today())
+    ]
+
+
+def measure(list_format: ListFormat, tasks: List[Task]) -> float:
+    stream = io.StringIO()
+    utils._console = Console(file=stream, force_terminal=True, width=160)
+    renderer = RENDERERS[list_format](stream)
+
+    started_at = time.perf_counter()
+    for start in range(0, len(tasks), LIST_PAGE_SIZE):
+        renderer.write_page(tasks[start : start + LIST_PAGE_SIZE])
+    renderer.finish()
+    return len(tasks) / (time.perf_counter() - started_at)
+
+
+def measure_table_cells(tasks: List[Task]) -> float:
+    started_at = time.perf_counter()
+    end_dates = EndDateCells(TABLE_DUE_STATE_WARNINGS)
+    for task in tasks:
+        styling_priority(task.priority)
+        styling_status(task.status)
+        print_date(task.start_date)
+        end_dates.get(task.end_date, task.due_state)
+    return len(tasks) / (time.perf_counter() - started_at)
+
+
+def main(
+    rows: int = Option(100_000, help="Number of tasks rendered by the fast formats."),
+    table_rows: int = Option(5_000, help="Number of tasks rendered by the table."),
+    seed: int = Option(1017, help="Seed of the generated data."),
+) -> None:
+    tasks = load_tasks(rows, seed)
+    for list_format in ListFormat:
+        format_tasks = tasks[:table_rows] if list_format == ListFormat.TABLE else tasks
+        rows_per_second = measure(list_format, format_tasks)
+        print(
+            f"{list_format.value:<6} {len(format_tasks):>9,} rows: {rows_per_second:>12,.0f} rows/sec"
+        )
+    rows_per_second = measure_table_cells(tasks)
+    print(f"{'cells':<6} {len(tasks):>9,} rows: {rows_per_second:>12,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    run(main)
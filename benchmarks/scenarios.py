@@ -0,0 +1,269 @@
+"""Benchmark scenarios: the data layer methods, CLI commands and list rendering."""
+import io
+import os
+import random
+import shutil
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from rich.console import Console
+from typer.testing import CliRunner
+
+from benchmarks.datasets import generate_task_rows, sample_ids, task_id
+from tasks_tracker import cli, utils
+from tasks_tracker.configs import LIST_PAGE_SIZE
+from tasks_tracker.database import TasksTrackerData
+from tasks_tracker.model import Task
+from tasks_tracker.typing import Priority, Status
+
+# A benchmark operation gets the number of the run, starting from 0
+Operation = Callable[[int], object]
+
+
+class BenchmarkContext(NamedTuple):
+    db_path: str
+    scale: int
+    seed: int
+    tasks_data: TasksTrackerData
+    work_dir: str
+
+
+class Scenario(NamedTuple):
+    setup: Callable[[BenchmarkContext, int], Operation]
+    max_scale: Optional[int]
+
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+runner = CliRunner()
+
+
+def scenario(name: str, max_scale: Optional[int] = None):
+    """Register a scenario. Its setup gets the context and number of runs, returns the operation."""
+
+    def register(setup: Callable[[BenchmarkContext, int], Operation]):
+        SCENARIOS[name] = Scenario(setup, max_scale)
+        return setup
+
+    return register
+
+
+def new_task_rows(context: BenchmarkContext, count: int, offset: int = 0) -> List[tuple]:
+    # IDs after the dataset ones, so that they do not exist yet
+    first_index = context.scale + offset
+    rows = list(generate_task_rows(count, context.seed + offset + 1))
+    return [(task_id(first_index + index),) + row[1:] for index, row in enumerate(rows)]
+
+
+def invoke(args: List[str]) -> None:
+    result = runner.invoke(cli.cli_controller, args)
+    if result.exit_code != 0:
+        raise RuntimeError(f"{' '.join(args)} failed: {result.output}")
+
+
+# Data layer
+
+
+@scenario("data.add_new_task")
+def add_new_task(context: BenchmarkContext, runs: int) -> Operation:
+    tasks = [Task(*row) for row in new_task_rows(context, runs)]
+    return lambda run: context.tasks_data.add_new_task(tasks[run])
+
+
+@scenario("data.add_tasks_batch.1000")
+def add_tasks_batch(context: BenchmarkContext, runs: int) -> Operation:
+    batches = [new_task_rows(context, 1000, offset=10_000 + run * 1000) for run in range(runs)]
+    return lambda run: context.tasks_data.add_tasks_batch(batches[run])
+
+
+@scenario("data.find_task_by_id")
+def find_task_by_id(context: BenchmarkContext, runs: int) -> Operation:
+    ids = sample_ids(context.scale, runs, context.seed)
+    return lambda run: context.tasks_data.find_task_by_id(ids[run])
+
+
+@scenario("data.get_tasks_list.first_page")
+def get_tasks_list_first_page(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: context.tasks_data.get_tasks_list(limit=LIST_PAGE_SIZE + 1)
+
+
+@scenario("data.get_tasks_list.status_priority_page")
+def get_tasks_list_filtered_page(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: context.tasks_data.get_tasks_list(
+        status=Status.IN_PROGRESS, priority=Priority.HIGH, limit=LIST_PAGE_SIZE + 1
+    )
+
+
+@scenario("data.get_tasks_list.on_hold_all", max_scale=1_000_000)
+def get_tasks_list_on_hold(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: context.tasks_data.get_tasks_list(status=Status.ON_HOLD)
+
+
+@scenario("data.iter_task_rows.all", max_scale=1_000_000)
+def iter_task_rows(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: sum(1 for _ in context.tasks_data.iter_task_rows())
+
+
+@scenario("data.search_tasks.rare_word")
+def search_tasks_rare_word(context: BenchmarkContext, runs: int) -> Operation:
+    # Task numbers only appear in one description, like a searched ticket number
+    randomizer = random.Random(context.seed)
+    numbers = [str(randomizer.randrange(context.scale // 4) * 4 + 1) for _ in range(runs)]
+    return lambda run: context.tasks_data.search_tasks(numbers[run], limit=LIST_PAGE_SIZE)
+
+
+@scenario("data.search_tasks.common_prefix")
+def search_tasks_common_prefix(context: BenchmarkContext, runs: int) -> Operation:
+    # Around one task in seven has a title word starting with "rev", every match is ranked
+    return lambda run: context.tasks_data.search_tasks("rev*", limit=LIST_PAGE_SIZE)
+
+
+@scenario("data.search_tasks.word_status")
+def search_tasks_word_status(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: context.tasks_data.search_tasks(
+        "deploy release", status=Status.ON_HOLD, limit=LIST_PAGE_SIZE
+    )
+
+
+@scenario("data.get_tasks_stats.counters")
+def get_tasks_stats(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: context.tasks_data.get_tasks_stats()
+
+
+@scenario("data.get_tasks_stats.exact", max_scale=1_000_000)
+def get_tasks_stats_exact(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: context.tasks_data.get_tasks_stats(exact=True)
+
+
+@scenario("data.update_task")
+def update_task(context: BenchmarkContext, runs: int) -> Operation:
+    tasks = [
+        context.tasks_data.find_task_by_id(id)
+        for id in sample_ids(context.scale, runs, context.seed + 1)
+    ]
+    return lambda run: context.tasks_data.update_task(tasks[run])
+
+
+@scenario("data.find_and_update_task")
+def find_and_update_task(context: BenchmarkContext, runs: int) -> Operation:
+    # What a single task update used to cost: a read, then a write of every column
+    ids = sample_ids(context.scale, runs, context.seed + 1)
+
+    def operation(run: int) -> object:
+        task = context.tasks_data.find_task_by_id(ids[run])
+        return context.tasks_data.update_task(task._replace(status="done"))
+
+    return operation
+
+
+@scenario("data.patch_task")
+def patch_task(context: BenchmarkContext, runs: int) -> Operation:
+    ids = sample_ids(context.scale, runs, context.seed + 1)
+    return lambda run: context.tasks_data.patch_task(ids[run], {"status": "done"})
+
+
+@scenario("data.update_tasks.status_priority", max_scale=1_000_000)
+def update_tasks_filtered(context: BenchmarkContext, runs: int) -> Operation:
+    # The same tasks every run: the changed field is not one of the filters
+    return lambda run: context.tasks_data.update_tasks(
+        {"description": f"sprint {run} closed"}, status=Status.IN_PROGRESS, priority=Priority.HIGH
+    )
+
+
+@scenario("data.update_tasks.100_ids")
+def update_tasks_ids(context: BenchmarkContext, runs: int) -> Operation:
+    ids = [sample_ids(context.scale, 100, context.seed + 3 + run) for run in range(runs)]
+    return lambda run: context.tasks_data.update_tasks({"priority": "high"}, ids=ids[run])
+
+
+@scenario("data.delete_task")
+def delete_task(context: BenchmarkContext, runs: int) -> Operation:
+    rows = new_task_rows(context, runs, offset=20_000_000)
+    context.tasks_data.add_tasks_batch(rows)
+    return lambda run: context.tasks_data.delete_task(rows[run][0])
+
+
+@scenario("data.delete_all_tasks", max_scale=100_000)
+def delete_all_tasks(context: BenchmarkContext, runs: int) -> Operation:
+    # Every run empties its own copy of the dataset
+    copies = []
+    for run in range(runs):
+        copy_path = os.path.join(context.work_dir, f"delete-all-{run}.db")
+        shutil.copyfile(context.db_path, copy_path)
+        copies.append(TasksTrackerData(copy_path))
+    return lambda run: copies[run].delete_all_tasks()
+
+
+# CLI commands, the output is rendered and captured by the runner
+
+
+@scenario("cli.list.first_page")
+def cli_list(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: invoke(["list", "--limit", str(LIST_PAGE_SIZE)])
+
+
+@scenario("cli.list.status_page")
+def cli_list_status(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: invoke(["list", "--status", "in_progress", "--limit", str(LIST_PAGE_SIZE)])
+
+
+@scenario("cli.search")
+def cli_search(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: invoke(["search", "deploy release", "--status", "on_hold"])
+
+
+@scenario("cli.stats")
+def cli_stats(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: invoke(["stats"])
+
+
+@scenario("cli.add")
+def cli_add(context: BenchmarkContext, runs: int) -> Operation:
+    return lambda run: invoke(["add", f"benchmark task {run}", "--priority", "high"])
+
+
+@scenario("cli.update")
+def cli_update(context: BenchmarkContext, runs: int) -> Operation:
+    ids = sample_ids(context.scale, runs, context.seed + 2)
+    return lambda run: invoke(["update", ids[run], "--force", "--status", "done"])
+
+
+@scenario("cli.delete")
+def cli_delete(context: BenchmarkContext, runs: int) -> Operation:
+    rows = new_task_rows(context, runs, offset=30_000_000)
+    context.tasks_data.add_tasks_batch(rows)
+    return lambda run: invoke(["delete", rows[run][0], "--force"])
+
+
+@scenario("cli.batch.add_1000")
+def cli_batch_add(context: BenchmarkContext, runs: int) -> Operation:
+    # The same 1000 commands as 1000 `cli.add` runs, in one process and one transaction
+    script = "".join(f"add 'benchmark task {index}' --priority high\n" for index in range(1000))
+
+    def run_batch(run: int) -> None:
+        result = runner.invoke(cli.cli_controller, ["batch", "-"], input=script)
+        if result.exit_code != 0:
+            raise RuntimeError(f"batch failed: {result.output}")
+
+    return run_batch
+
+
+# Rendering
+
+
+@scenario("render.print_tasks_list_table.1000")
+def render_tasks_list_table(context: BenchmarkContext, runs: int) -> Operation:
+    tasks = context.tasks_data.get_tasks_list(limit=1000)
+    return lambda run: utils.print_tasks_list_table(tasks)
+
+
+def prepare_environment(context: BenchmarkContext) -> None:
+    """Point the CLI at the benchmark database and the console at a terminal sized buffer."""
+    cli._app_data = context.tasks_data
+    utils._console = Console(file=io.StringIO(), force_terminal=True, width=160)
+
+
+def reset_console() -> None:
+    console_file = utils._console.file if utils._console else None
+    if isinstance(console_file, io.StringIO):
+        console_file.seek(0)
+        console_file.truncate()
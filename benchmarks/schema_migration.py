@@ -0,0 +1,132 @@
+"""Lookup and list latency of a legacy database before and after the schema upgrade.
+
+Run with: PYTHONPATH=src python -m benchmarks.schema_migration --rows 300000
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from enum import Enum
+from sqlite3 import Connection, connect
+from typing import Callable, Dict, List
+
+from typer import Option, run
+
+from tasks_tracker.configs import DB_DATE_FORMAT
+from tasks_tracker.database import TasksTrackerData, build_filter_clause
+from tasks_tracker.typing import Priority, Status
+
+LEGACY_FIND_QUERY = """SELECT * from tasks WHERE id = ?"""
+LEGACY_LIST_QUERY = """SELECT * from tasks WHERE (status = ?1 OR ?1 IS NULL) AND (priority = ?2 OR ?2 IS NULL) AND (start_date >= ?3 OR ?3 IS NULL) AND (end_date <= ?4 OR ?4 IS NULL OR end_date IS NULL) ORDER BY start_date ASC"""
+
+LIST_FILTERS = (
+    ("status + priority", (Status.ON_HOLD, Priority.HIGH, None, None)),
+    ("status + start date", (Status.IN_PROGRESS, None, datetime(2030, 1, 1), None)),
+    ("start date", (None, None, datetime(2030, 12, 1), None)),
+)
+
+
+def create_legacy_database(db_path: str, rows: int, seed: int) -> List[str]:
+    randomizer = random.Random(seed)
+    statuses = [status.value for status in Status]
+    priorities = [priority.value for priority in Priority]
+    first_day = date(2022, 1, 1)
+    ids = [f"{index:010x}" for index in randomizer.sample(range(16**10), rows)]
+
+    connection = connect(db_path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE tasks( id text, title text, status text, priority text, description text, start_date text, end_date text)"
+        )
+        connection.executemany(
+            "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    id,
+                    f"task {index}",
+                    randomizer.choice(statuses),
+                    randomizer.choice(priorities),
+                    None,
+                    (first_day + timedelta(days=randomizer.randrange(3650))).isoformat(),
+                    None,
+                )
+                for index, id in enumerate(ids)
+            ),
+        )
+    connection.close()
+    return ids
+
+
+def measure(operation: Callable[[], object], repeat: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        operation()
+    return (time.perf_counter() - started_at) / repeat * 1000
+
+
+def legacy_timings(connection: Connection, ids: List[str], repeat: int) -> Dict[str, float]:
+    timings = {
+        "find by id": measure(
+            lambda: connection.execute(LEGACY_FIND_QUERY, (random.choice(ids),)).fetchone(), repeat
+        )
+    }
+    for name, filters in LIST_FILTERS:
+        parameters = [
+            filter.value
+            if isinstance(filter, Enum)
+            else filter.strftime(DB_DATE_FORMAT)
+            if filter
+            else None
+            for filter in filters
+        ]
+        timings[f"list {name}"] = measure(
+            lambda: connection.execute(LEGACY_LIST_QUERY, parameters).fetchall(), repeat
+        )
+    return timings
+
+
+def upgraded_timings(connection: Connection, ids: List[str], repeat: int) -> Dict[str, float]:
+    timings = {
+        "find by id": measure(
+            lambda: connection.execute(LEGACY_FIND_QUERY, (random.choice(ids),)).fetchone(), repeat
+        )
+    }
+    for name, filters in LIST_FILTERS:
+        # The same query TasksTrackerData.get_tasks_list sends, without building Task objects
+        where_clause, parameters = build_filter_clause(*filters)
+        query = f"SELECT * from tasks {where_clause} ORDER BY start_date ASC"
+        timings[f"list {name}"] = measure(
+            lambda: connection.execute(query, parameters).fetchall(), repeat
+        )
+    return timings
+
+
+def main(
+    rows: int = Option(300_000, help="Number of tasks in the legacy database."),
+    repeat: int = Option(20, help="Number of runs per measured operation."),
+    seed: int = Option(1017, help="Seed of the generated data."),
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "tasks-tracker.db")
+        ids = create_legacy_database(db_path, rows, seed)
+
+        connection = connect(db_path)
+        before = legacy_timings(connection, ids, repeat)
+        connection.close()
+
+        started_at = time.perf_counter()
+        tasks_data = TasksTrackerData(db_path)
+        migration_time = time.perf_counter() - started_at
+        after = upgraded_timings(tasks_data.connection, ids, repeat)
+        tasks_data.connection.close()
+
+    print(f"{rows} tasks, migration took {migration_time:.2f}s")
+    print(f"{'operation':<28}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for name, before_ms in before.items():
+        after_ms = after[name]
+        print(f"{name:<28}{before_ms:>14.3f}{after_ms:>14.3f}{before_ms / after_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    run(main)
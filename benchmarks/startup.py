@@ -0,0 +1,58 @@
+"""Wall time and import time of CLI commands that do not need the database.
+
+Run with: PYTHONPATH=src python -m benchmarks.startup
+"""
+import os
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+from typer import Option, run
+
+COMMANDS = (
+    ("--help",),
+    ("--version",),
+    ("add", "--help"),
+    ("list", "--help"),
+    ("add", "title", "--priority", "urgent"),
+)
+
+ENTRY_POINT = "import sys; from tasks_tracker import main; sys.argv[0] = 'tasks-tracker'; main()"
+
+
+def run_command(args: Tuple[str, ...]) -> Tuple[float, float, List[Tuple[int, str]]]:
+    started_at = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", ENTRY_POINT, *args],
+        capture_output=True,
+        text=True,
+        env=os.environ,
+    )
+    wall_ms = (time.perf_counter() - started_at) * 1000
+
+    top_level_imports = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_time, cumulative_time, module = line[len("import time:") :].split("|")
+            total_us += int(self_time)
+            if not module.startswith("  "):
+                top_level_imports.append((int(cumulative_time), module.strip()))
+    return wall_ms, total_us / 1000, sorted(top_level_imports, reverse=True)
+
+
+def main(
+    repeat: int = Option(5, help="Number of runs per command, the fastest one is reported."),
+    top: int = Option(3, help="Number of slowest top level imports to show per command."),
+) -> None:
+    print(f"{'command':<40}{'wall (ms)':>12}{'imports (ms)':>14}")
+    for args in COMMANDS:
+        wall_ms, import_ms, top_level_imports = min(run_command(args) for _ in range(repeat))
+        print(f"{' '.join(args):<40}{wall_ms:>12.1f}{import_ms:>14.1f}")
+        for cumulative_us, module in top_level_imports[:top]:
+            print(f"    {module:<36}{cumulative_us / 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,92 @@
+"""Effect of the storage profiles on writes and on listing the tasks.
+
+Every profile gets its own database: the tasks are imported in batches, then tasks are added one
+commit at a time like `tasks-tracker add`, and the database is opened again to list pages,
+read every task and count them exactly. Use --directory to compare disks, /tmp may be tmpfs.
+
+Run with: PYTHONPATH=src python -m benchmarks.storage_profiles --rows 200000
+"""
+import os
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+from typer import Option, run
+
+from benchmarks.datasets import generate_task_rows
+from tasks_tracker.configs import IMPORT_BATCH_SIZE, LIST_PAGE_SIZE
+from tasks_tracker.connection import STORAGE_PROFILES, ConnectionSettings
+from tasks_tracker.database import TasksTrackerData
+from tasks_tracker.model import Task
+from tasks_tracker.typing import Status
+
+
+def timed(operation: Callable[[], object]) -> float:
+    started_at = time.perf_counter()
+    operation()
+    return time.perf_counter() - started_at
+
+
+def import_rows(tasks_data: TasksTrackerData, rows: int, seed: int) -> None:
+    batch = []
+    for row in generate_task_rows(rows, seed):
+        batch.append(row)
+        if len(batch) == IMPORT_BATCH_SIZE:
+            tasks_data.add_tasks_batch(batch)
+            batch = []
+    tasks_data.add_tasks_batch(batch)
+
+
+def add_tasks(tasks_data: TasksTrackerData, count: int) -> None:
+    for index in range(count):
+        tasks_data.add_new_task(
+            Task(f"zz{index:08d}", "task", "not_started", "low", None, "2022-01-01", None)
+        )
+
+
+def list_pages(tasks_data: TasksTrackerData, count: int) -> None:
+    for _ in range(count):
+        tasks_data.get_tasks_list(Status.IN_PROGRESS, limit=LIST_PAGE_SIZE + 1)
+
+
+def measure(
+    directory: str, profile: str, rows: int, writes: int, lists: int, seed: int
+) -> Dict[str, float]:
+    db_path = os.path.join(directory, f"{profile}.db")
+    settings = ConnectionSettings(storage_profile=profile)
+    tasks_data = TasksTrackerData(db_path, settings)
+    import_seconds = timed(lambda: import_rows(tasks_data, rows, seed))
+    add_seconds = timed(lambda: add_tasks(tasks_data, writes))
+    tasks_data.connection.close()
+
+    tasks_data = TasksTrackerData(db_path, settings)
+    results = {
+        "import rows/s": rows / import_seconds,
+        "add ms": add_seconds / writes * 1000,
+        "list page ms": timed(lambda: list_pages(tasks_data, lists)) / lists * 1000,
+        "read all s": timed(lambda: sum(1 for _ in tasks_data.iter_task_rows())),
+        "exact stats ms": timed(lambda: tasks_data.get_tasks_stats(exact=True)) * 1000,
+    }
+    tasks_data.connection.close()
+    return results
+
+
+def main(
+    rows: int = Option(200_000, help="Tasks imported in every database."),
+    writes: int = Option(500, help="Tasks then added with a commit each."),
+    lists: int = Option(200, help="First pages of the in progress tasks listed."),
+    profiles: str = Option(",".join(STORAGE_PROFILES), help="Comma separated storage profiles."),
+    directory: Optional[str] = Option(None, help="Folder of the databases, a temporary one."),
+    seed: int = Option(1017, help="Seed of the generated data."),
+) -> None:
+    with tempfile.TemporaryDirectory(dir=directory) as temporary_directory:
+        for profile in profiles.split(","):
+            results = measure(temporary_directory, profile, rows, writes, lists, seed)
+            print(
+                f"{profile:<11} "
+                + ", ".join(f"{name} {value:>9,.2f}" for name, value in results.items())
+            )
+
+
+if __name__ == "__main__":
+    run(main)
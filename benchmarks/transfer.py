@@ -0,0 +1,84 @@
+"""Throughput and peak memory of the import and export pipelines.
+
+Run with: PYTHONPATH=src python -m benchmarks.transfer --rows 1000000
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Tuple
+
+from typer import Option, run
+
+from tasks_tracker.database import TasksTrackerData
+from tasks_tracker.transfer import (
+    export_tasks_to_stream,
+    import_tasks_from_stream,
+    open_transfer_file,
+)
+from tasks_tracker.typing import Priority, Status, TransferFormat
+
+
+def write_source_file(file_path: str, rows: int, seed: int) -> None:
+    randomizer = random.Random(seed)
+    statuses = [status.value for status in Status]
+    priorities = [priority.value for priority in Priority]
+    first_day = date(2022, 1, 1)
+
+    with open(file_path, "w", encoding="utf-8") as stream:
+        stream.write("id,title,status,priority,description,start_date,end_date\n")
+        for index in range(rows):
+            start_date = first_day + timedelta(days=randomizer.randrange(3650))
+            stream.write(
+                f"{index:010x},task {index},{randomizer.choice(statuses)},"
+                f"{randomizer.choice(priorities)},description of task {index},"
+                f"{start_date.isoformat()},\n"
+            )
+
+
+def export_file(
+    tasks_data: TasksTrackerData, output_path: str, file_format: TransferFormat
+) -> Tuple[float, int]:
+    started_at = time.perf_counter()
+    with open_transfer_file(output_path, file_format, "w") as stream:
+        exported_rows = export_tasks_to_stream(stream, file_format, tasks_data.iter_task_rows())
+    return time.perf_counter() - started_at, exported_rows
+
+
+def main(
+    rows: int = Option(1_000_000, help="Number of tasks to import and export."),
+    seed: int = Option(1017, help="Seed of the generated data."),
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, "source.csv")
+        write_source_file(source_path, rows, seed)
+        tasks_data = TasksTrackerData(os.path.join(directory, "tasks-tracker.db"))
+
+        with open_transfer_file(source_path, TransferFormat.CSV, "r") as stream:
+            summary = import_tasks_from_stream(
+                tasks_data, stream, TransferFormat.CSV, batch_size=10000, allow_past_dates=True
+            )
+        print(f"import csv: {summary.rows_per_second:>12,.0f} rows/sec")
+
+        for file_format in (TransferFormat.CSV, TransferFormat.JSONL, TransferFormat.BINARY):
+            output_path = os.path.join(directory, f"export.{file_format.value}")
+            seconds, exported_rows = export_file(tasks_data, output_path, file_format)
+
+            # Memory is measured on a second run, tracing allocations slows the export down
+            tracemalloc.start()
+            export_file(tasks_data, output_path, file_format)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"export {file_format.value}: {exported_rows / seconds * 60:>12,.0f} rows/min, "
+                f"peak {peak_memory / 1024:,.0f} KiB, {os.path.getsize(output_path):,} bytes"
+            )
+
+        tasks_data.connection.close()
+
+
+if __name__ == "__main__":
+    run(main)
@@ -1,5 +1,45 @@
-from . import cli, configs
+import sys
+import time
+
+# Wall and CPU time when the entry point started, the start of the imports shown by --profile
+STARTED_AT = None
+
+
+def _import_cli():
+    # Typer imports rich (including its markdown and syntax highlighting modules) only to style
+    # --help pages and errors, which costs more than the rest of the start up together. Hide rich
+    # while typer is imported so it falls back to click's plain output. Rich itself is imported
+    # later, and only by commands that print panels or tables.
+    if "typer" not in sys.modules and "rich" not in sys.modules:
+        sys.modules["rich"] = None  # type: ignore
+        try:
+            import typer  # noqa: F401
+        finally:
+            del sys.modules["rich"]
+
+    from . import cli
+
+    return cli
 
 
 def main():
-    cli.cli_controller(prog_name=configs.__app_name__)
+    global STARTED_AT
+    STARTED_AT = (time.perf_counter(), time.process_time())
+
+    from . import configs
+    from .client import can_forward, forward_command
+    from .settings import InvalidSettingError, get_socket_path
+
+    # Commands run by `tasks-tracker serve` when it is running, skipping the imports below
+    args = sys.argv[1:]
+    try:
+        socket_path = get_socket_path() if can_forward(args) else None
+    except InvalidSettingError:
+        # Run in-process, where the command reports the error in a panel
+        socket_path = None
+    if socket_path:
+        exit_code = forward_command(socket_path, args)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    _import_cli().cli_controller(prog_name=configs.__app_name__)
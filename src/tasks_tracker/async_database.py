@@ -0,0 +1,142 @@
+"""Asyncio API of the data layer.
+
+The SQLite work runs on a dedicated thread pool with `PooledTasksTrackerData`, so awaiting a
+query never blocks the event loop and queries of different coroutines run side by side.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, TypeVar
+
+from tasks_tracker.configs import EXPORT_CHUNK_SIZE
+from tasks_tracker.connection import ConnectionSettings
+from tasks_tracker.model import Task
+from tasks_tracker.pool import PooledTasksTrackerData
+from tasks_tracker.typing import Priority, Status
+
+T = TypeVar("T")
+
+EXECUTOR_WORKERS = 4
+
+
+class AsyncTasksTrackerData:
+    """Open it with `await AsyncTasksTrackerData.open()`, and close it when done."""
+
+    def __init__(self, tasks_data: PooledTasksTrackerData, executor: ThreadPoolExecutor):
+        self.tasks_data = tasks_data
+        self.executor = executor
+
+    @classmethod
+    async def open(
+        cls,
+        db_path: Optional[str] = None,
+        settings: Optional[ConnectionSettings] = None,
+        workers: int = EXECUTOR_WORKERS,
+    ) -> "AsyncTasksTrackerData":
+        executor = ThreadPoolExecutor(workers, thread_name_prefix="tasks-tracker-data")
+        # Opening the database may migrate it, which is blocking work too
+        tasks_data = await asyncio.get_running_loop().run_in_executor(
+            executor, PooledTasksTrackerData, db_path, settings
+        )
+        return cls(tasks_data, executor)
+
+    async def __aenter__(self) -> "AsyncTasksTrackerData":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def run(self, method: Callable[..., T], *args: Any, **kwargs: Any) -> "asyncio.Future[T]":
+        return asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(method, *args, **kwargs)
+        )
+
+    async def add_new_task(self, task: Task) -> bool:
+        return await self.run(self.tasks_data.add_new_task, task)
+
+    async def get_tasks_list(
+        self,
+        status: Optional[Status] = None,
+        priority: Optional[Priority] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        include_archived: bool = False,
+    ) -> List[Task]:
+        return await self.run(
+            self.tasks_data.get_tasks_list,
+            status,
+            priority,
+            start_date,
+            end_date,
+            limit=limit,
+            include_archived=include_archived,
+        )
+
+    async def iter_tasks(
+        self,
+        status: Optional[Status] = None,
+        priority: Optional[Priority] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> AsyncIterator[Task]:
+        """Same tasks as `get_tasks_list`, loaded `chunk_size` at a time.
+
+        Every chunk is a keyset page query, so no cursor is kept open between chunks. The next
+        chunk is loaded while the caller goes through the current one. Use `contextlib.aclosing`
+        to stop loading chunks as soon as the loop is left early.
+        """
+
+        def load_chunk(after: Optional[tuple]) -> "asyncio.Future[List[Task]]":
+            return self.run(
+                self.tasks_data.get_tasks_list,
+                status,
+                priority,
+                start_date,
+                end_date,
+                after=after,
+                limit=chunk_size,
+            )
+
+        next_chunk = load_chunk(None)
+        try:
+            while next_chunk is not None:
+                tasks = await next_chunk
+                next_chunk = (
+                    load_chunk((tasks[-1].start_date, tasks[-1].id))
+                    if len(tasks) == chunk_size
+                    else None
+                )
+                for task in tasks:
+                    yield task
+        finally:
+            if next_chunk is not None:
+                next_chunk.cancel()
+
+    async def find_task_by_id(self, id: str, include_archived: bool = False) -> Optional[Task]:
+        return await self.run(self.tasks_data.find_task_by_id, id, include_archived)
+
+    async def update_task(self, task: Task) -> bool:
+        return await self.run(self.tasks_data.update_task, task)
+
+    async def patch_task(self, id: str, changes: Dict[str, Optional[str]]) -> Optional[List[Task]]:
+        return await self.run(self.tasks_data.patch_task, id, changes)
+
+    async def delete_task(self, id: str) -> Optional[bool]:
+        return await self.run(self.tasks_data.delete_task, id)
+
+    async def archive_tasks(
+        self, ids: Optional[List[str]] = None, done_for_days: Optional[int] = None
+    ) -> Optional[int]:
+        return await self.run(self.tasks_data.archive_tasks, ids, done_for_days)
+
+    async def delete_all_tasks(self) -> bool:
+        return await self.run(self.tasks_data.delete_all_tasks)
+
+    async def close(self) -> None:
+        # Wait for the queries in flight, such as the next chunk of a stopped `iter_tasks`,
+        # before closing their connections
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+        self.tasks_data.close()
@@ -0,0 +1,271 @@
+"""Run a script of `add`, `update` and `delete` commands against one database connection.
+
+Every line of a script is a command with the same arguments and options as on the command line.
+The commands are committed in groups, each one in its own savepoint so that a failed command
+is rolled back alone.
+"""
+import json
+import shlex
+import time
+from itertools import islice
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from click import ClickException, Group
+
+from tasks_tracker.configs import (
+    ADDING_TASK_ERROR,
+    BATCH_UNKNOWN_COMMAND_ERROR,
+    DELETE_ALL_TASKS_ERROR,
+    DELETE_TASK_ERROR,
+    NO_TASK_FOUND_ERROR,
+    UPDATE_TASK_ERROR,
+    __app_name__,
+)
+from tasks_tracker.model import new_task, task_changes
+from tasks_tracker.typing import Priority, Status
+from tasks_tracker.utils import (
+    bulk_target_validation,
+    format_db_date_str,
+    input_data_validation,
+    task_changes_validation,
+)
+
+if TYPE_CHECKING:
+    from tasks_tracker.database import TasksTrackerData
+
+Params = Dict[str, Any]
+
+
+class BatchCommandError(Exception):
+    pass
+
+
+class CommandOutput(NamedTuple):
+    """ID of the task of a single task command, number of tasks of a set-based one."""
+
+    id: Optional[str] = None
+    count: Optional[int] = None
+
+
+class BatchResult(NamedTuple):
+    line_number: int
+    command: str
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+    count: Optional[int] = None
+
+    def to_json(self) -> str:
+        result: Dict[str, Any] = {"line": self.line_number, "command": self.command, "ok": self.ok}
+        if self.id:
+            result["id"] = self.id
+        if self.count is not None:
+            result["count"] = self.count
+        if self.error:
+            result["error"] = self.error
+        return json.dumps(result, ensure_ascii=False)
+
+
+class BatchSummary(NamedTuple):
+    commands: int
+    failed: int
+    seconds: float
+
+    @property
+    def commands_per_second(self) -> float:
+        return self.commands / self.seconds if self.seconds else 0.0
+
+
+def run_add(app_data: "TasksTrackerData", params: Params) -> CommandOutput:
+    input_data_validation(
+        title=params["title"],
+        description=params["description"],
+        start_date=params["start_date"],
+        end_date=params["end_date"],
+    )
+    task = new_task(
+        title=params["title"],
+        status=params["status"],
+        priority=params["priority"],
+        description=params["description"],
+        start_date=format_db_date_str(params["start_date"]),
+        end_date=format_db_date_str(params["end_date"]),
+    )
+    if not app_data.add_new_task(task):
+        raise BatchCommandError(ADDING_TASK_ERROR)
+    return CommandOutput(id=task.id)
+
+
+def run_update(app_data: "TasksTrackerData", params: Params) -> CommandOutput:
+    input_data_validation(
+        title=params["title"],
+        description=params["description"],
+        start_date=params["start_date"],
+        end_date=params["end_date"],
+    )
+    changes = task_changes(
+        title=params["title"],
+        status=params["status"],
+        priority=params["priority"],
+        description=params["description"],
+        start_date=format_db_date_str(params["start_date"]),
+        end_date=format_db_date_str(params["end_date"]),
+    )
+    target = get_target(
+        params,
+        status=params["where_status"] and Status(params["where_status"]),
+        priority=params["where_priority"] and Priority(params["where_priority"]),
+        start_date=params["where_start_date"],
+        end_date=params["where_end_date"],
+    )
+    if target is None:
+        updated_tasks = app_data.patch_task(params["ids"][0], changes)
+        if updated_tasks is None:
+            raise BatchCommandError(UPDATE_TASK_ERROR)
+        if not updated_tasks:
+            raise BatchCommandError(NO_TASK_FOUND_ERROR)
+        return CommandOutput(id=updated_tasks[0].id)
+
+    task_changes_validation(changes)
+    updated_count = app_data.update_tasks(changes, **target)
+    if updated_count is None:
+        raise BatchCommandError(UPDATE_TASK_ERROR)
+    return CommandOutput(count=updated_count)
+
+
+def run_delete(app_data: "TasksTrackerData", params: Params) -> CommandOutput:
+    target = get_target(
+        params,
+        status=params["status"] and Status(params["status"]),
+        priority=params["priority"] and Priority(params["priority"]),
+        start_date=params["start_date"],
+        end_date=params["end_date"],
+    )
+    if target is None:
+        id = params["ids"][0]
+        is_task_deleted = app_data.delete_task(id)
+        if is_task_deleted is None:
+            raise BatchCommandError(DELETE_TASK_ERROR)
+        if not is_task_deleted:
+            raise BatchCommandError(NO_TASK_FOUND_ERROR)
+        return CommandOutput(id=id)
+
+    deleted_count = app_data.delete_tasks(**target)
+    if deleted_count is None:
+        raise BatchCommandError(DELETE_TASK_ERROR)
+    return CommandOutput(count=deleted_count)
+
+
+def get_target(params: Params, **filters: Any) -> Optional[Params]:
+    """Arguments of the set-based data methods, None for a command on a single task."""
+    if params["dry_run"]:
+        raise BatchCommandError("A batch cannot run a command with --dry-run.")
+    ids = params["ids"]
+    for id in ids or []:
+        input_data_validation(id=id)
+    if ids and len(ids) == 1 and not any(filters.values()):
+        return None
+    bulk_target_validation(ids, *filters.values())
+    return dict(ids=ids or None, **filters)
+
+
+def run_delete_all(app_data: "TasksTrackerData", params: Params) -> CommandOutput:
+    if not app_data.delete_all_tasks():
+        raise BatchCommandError(DELETE_ALL_TASKS_ERROR)
+    return CommandOutput()
+
+
+BATCH_COMMANDS: Dict[str, Callable[["TasksTrackerData", Params], CommandOutput]] = {
+    "add": run_add,
+    "update": run_update,
+    "delete": run_delete,
+    "delete-all": run_delete_all,
+}
+
+
+def read_script(stream: IO[str]) -> Iterator[Tuple[int, str]]:
+    """Yield the commands of a script with their line number, skipping blank and # lines."""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line_number, line
+
+
+def parse_script_line(cli_command: Group, line: str) -> Tuple[str, Params]:
+    """Parse a line with the options of the CLI command and return its name and parameters."""
+    try:
+        args = shlex.split(line)
+    except ValueError as error:
+        raise BatchCommandError(f"Invalid command line: {error}.")
+
+    # Lines copied from a shell script may start with the program name
+    if args and args[0] == __app_name__:
+        args = args[1:]
+    if not args or args[0] not in BATCH_COMMANDS or "--help" in args:
+        command = args[0] if args else ""
+        raise BatchCommandError(
+            BATCH_UNKNOWN_COMMAND_ERROR.format(command, ", ".join(BATCH_COMMANDS))
+        )
+
+    command = cli_command.get_command(None, args[0])  # type: ignore
+    context = command.make_context(args[0], args[1:])
+    return args[0], context.params
+
+
+def run_script_line(
+    app_data: "TasksTrackerData", cli_command: Group, line_number: int, line: str
+) -> BatchResult:
+    command = line.split(maxsplit=1)[0]
+    try:
+        command, params = parse_script_line(cli_command, line)
+        with app_data.transaction():
+            output = BATCH_COMMANDS[command](app_data, params)
+        return BatchResult(line_number, command, True, id=output.id, count=output.count)
+    except ClickException as error:
+        return BatchResult(line_number, command, False, error=error.format_message())
+    except BatchCommandError as error:
+        return BatchResult(line_number, command, False, error=str(error))
+
+
+def run_batch(
+    app_data: "TasksTrackerData",
+    cli_command: Group,
+    lines: Iterable[Tuple[int, str]],
+    commit_size: int,
+    on_result: Callable[[BatchResult], None],
+) -> BatchSummary:
+    """Run the script lines, committing every `commit_size` commands.
+
+    The results of a group are reported once the group is committed. When a commit fails the
+    error is raised and the results of the group are not reported.
+    """
+    started_at = time.perf_counter()
+    commands = failed = 0
+    lines = iter(lines)
+
+    while True:
+        group: List[Tuple[int, str]] = list(islice(lines, commit_size))
+        if not group:
+            break
+
+        with app_data.transaction():
+            results = [run_script_line(app_data, cli_command, *line) for line in group]
+
+        for result in results:
+            on_result(result)
+            commands += 1
+            failed += not result.ok
+
+    return BatchSummary(commands=commands, failed=failed, seconds=time.perf_counter() - started_at)
@@ -0,0 +1,92 @@
+"""On-disk cache of the `list` output, for dashboards and prompts running the same list again.
+
+An entry is keyed by the list arguments, the day and the change counter of the database, which
+every change of a task increases through the change log triggers. A change of the tasks makes
+the entries saved before it unreachable: they are the least recently used ones and the first to
+be evicted once the cache is over its size. Every entry is a file, used entries get a new
+modification time, so the cache is shared by processes without a lock.
+"""
+import hashlib
+import json
+import os
+from typing import Any, NamedTuple, Optional
+
+from tasks_tracker.configs import LIST_CACHE_MAX_BYTES, __version__
+
+ENTRY_SUFFIX = ".entry"
+
+
+class CacheEntry(NamedTuple):
+    """Output of the pages of a list, and what its renderer needs to end the list."""
+
+    tasks_count: int
+    next_cursor: Optional[str]
+    output: str
+
+
+class ResultCache:
+    def __init__(self, directory: str, max_bytes: int = LIST_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Key of the normalized parts of a query, with the version of the app rendering it."""
+        encoded_parts = json.dumps([__version__, *parts], default=str)
+        return hashlib.sha1(encoded_parts.encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self.entry_path(key)
+        try:
+            with open(path, encoding="utf-8", newline="") as entry_file:
+                header = json.loads(entry_file.readline())
+                output = entry_file.read()
+            # Most recently used first when evicting
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(header["tasks_count"], header["next_cursor"], output)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Save the entry, then evict the least recently used entries over the cache size.
+
+        The cache never makes a command fail: an entry that cannot be saved is left out.
+        """
+        header = json.dumps({"tasks_count": entry.tasks_count, "next_cursor": entry.next_cursor})
+        content = f"{header}\n{entry.output}"
+        if len(content.encode("utf-8")) > self.max_bytes:
+            return
+        path = self.entry_path(key)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8", newline="") as entry_file:
+                entry_file.write(content)
+            os.replace(temporary_path, path)
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        entries = []
+        for dir_entry in os.scandir(self.directory):
+            if dir_entry.name.endswith(ENTRY_SUFFIX):
+                try:
+                    stat = dir_entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Evicted by another process
+                pass
+            total_size -= size
@@ -1,44 +1,189 @@
-from datetime import datetime
-from typing import Optional
+import os
+import signal
+import sys
+import time
+from contextlib import nullcontext
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, List, NoReturn, Optional
 
-from typer import Argument, Exit, Option, Typer, confirm
+from typer import Argument, BadParameter, Context, Exit, Option, Typer, confirm, echo, open_file
 
 from tasks_tracker.configs import (
     ADDING_TASK_ERROR,
     ADDING_TASK_SUCCESS,
+    ARCHIVE_TASKS_DRY_RUN,
+    ARCHIVE_TASKS_ERROR,
+    ARCHIVE_TASKS_SUCCESS,
+    BATCH_COMMIT_SIZE,
+    BATCH_TASKS_ERROR,
+    CHANGES_ERROR,
+    CHANGES_KEEP_DELETES_DAYS,
+    CHANGES_NONE,
+    CHANGES_PRUNED_ERROR,
+    CHANGES_SUCCESS,
     DB_DATE_FORMAT,
     DELETE_ALL_TASKS_ERROR,
     DELETE_ALL_TASKS_SUCCESS,
     DELETE_TASK_ERROR,
     DELETE_TASK_SUCCESS,
+    DELETE_TASKS_DRY_RUN,
+    DELETE_TASKS_SUCCESS,
     DISPLAYING_DATE_FORMAT,
+    EXPORT_TASKS_ERROR,
+    EXPORT_TASKS_SUCCESS,
+    IMPORT_ALREADY_DONE,
+    IMPORT_BATCH_SIZE,
+    IMPORT_FILE_ERROR,
+    IMPORT_FORMAT_ERROR,
+    IMPORT_TASKS_ERROR,
+    LIST_PAGE_SIZE,
     NO_TASK_FOUND_ERROR,
+    PRUNE_CHANGES_ERROR,
+    PRUNE_CHANGES_SUCCESS,
+    SERVE_RUNNING_ERROR,
+    SERVE_STARTED,
     UPDATE_TASK_ERROR,
     UPDATE_TASK_SUCCESS,
+    UPDATE_TASKS_DRY_RUN,
+    UPDATE_TASKS_SUCCESS,
     __app_name__,
     __author__,
     __version__,
 )
-from tasks_tracker.database import TasksTrackerData
-from tasks_tracker.model import Task
-from tasks_tracker.typing import Priority, Status
+from tasks_tracker.model import new_task, task_changes
+from tasks_tracker.render import RENDERERS
+from tasks_tracker.settings import (
+    InvalidSettingError,
+    get_setting,
+    get_socket_path,
+    is_enabled,
+    load_config_file,
+)
+from tasks_tracker.transfer import (
+    detect_format,
+    export_tasks_to_stream,
+    import_tasks_from_stream,
+    open_transfer_file,
+    write_changes,
+)
+from tasks_tracker.typing import ListFormat, Priority, Status, TransferFormat
 from tasks_tracker.utils import (
+    bulk_target_validation,
+    console_to_stderr,
+    decode_page_cursor,
+    encode_page_cursor,
     format_db_date_str,
+    get_console,
     get_task_priority_value,
     get_task_status_value,
     input_data_validation,
+    is_terminal_output,
     print_error,
     print_success_message,
     print_task_detail,
     print_tasks_list_table,
+    print_tasks_stats,
     print_text_with_panel,
+    task_changes_validation,
 )
 
+if TYPE_CHECKING:
+    from tasks_tracker.database import TasksTrackerData
+    from tasks_tracker.metrics import MetricsRecorder
+    from tasks_tracker.profiling import Profiler
+
 cli_controller = Typer(
     add_completion=False, help="A simple CLI application to manage and track multiple tasks."
 )
 
-app_data = TasksTrackerData()
+_app_data: Optional["TasksTrackerData"] = None
+_profiler: Optional["Profiler"] = None
+# Database of the --db option, else the one of the settings
+_db_path: Optional[str] = None
+
+
+def _exit_with_setting_error(error: InvalidSettingError) -> NoReturn:
+    from rich.markup import escape
+
+    # The message quotes the settings as they were written, which is not rich markup
+    print_error(escape(str(error)))
+    raise Exit(code=1)
+
+
+def get_app_data() -> "TasksTrackerData":
+    # The database is opened (and migrated) by the first command that needs it, so --help,
+    # --version and argument errors never touch SQLite.
+    global _app_data
+    if _app_data is not None:
+        return _app_data
+
+    from tasks_tracker.connection import load_connection_settings
+
+    try:
+        settings = load_connection_settings()
+    except InvalidSettingError as error:
+        _exit_with_setting_error(error)
+
+    if _profiler is not None:
+        from tasks_tracker.profiling import ProfiledTasksTrackerData
+
+        _app_data = ProfiledTasksTrackerData(_profiler, _db_path, settings)
+    else:
+        from tasks_tracker.database import TasksTrackerData
+
+        _app_data = TasksTrackerData(_db_path, settings)
+    if get_setting("metrics_file"):
+        from tasks_tracker.metrics import get_metrics_recorder
+
+        get_metrics_recorder().measure_data(_app_data)
+    return _app_data
+
+
+def _start_profiling(ctx: Context, output: Optional[str]) -> None:
+    """Profile the command, and print the profile to stderr once it is done."""
+    global _profiler
+    import tasks_tracker
+    from tasks_tracker.profiling import ProfiledTasksTrackerData, Profiler
+
+    _profiler = Profiler(tasks_tracker.STARTED_AT)
+    if output:
+        import cProfile
+
+        function_profiler = cProfile.Profile()
+        function_profiler.enable()
+
+    def stop_profiling() -> None:
+        global _app_data, _profiler
+        if output:
+            function_profiler.disable()
+            function_profiler.dump_stats(output)
+        if _profiler is not None:
+            for line in _profiler.report():
+                echo(line, err=True)
+        # The profiled data layer reports to this profiler only
+        if isinstance(_app_data, ProfiledTasksTrackerData):
+            _app_data.close()
+            _app_data = None
+        _profiler = None
+
+    ctx.call_on_close(stop_profiling)
+
+
+def _start_metrics(ctx: Context, metrics: "MetricsRecorder") -> None:
+    """Record the command once it is done, then save the metrics of the process."""
+    command = ctx.invoked_subcommand or ""
+    started_at = time.perf_counter()
+
+    def save_metrics() -> None:
+        # Called while the exception stopping the command, if any, goes through the context
+        error = sys.exc_info()[1]
+        succeeded = error is None or (isinstance(error, Exit) and error.exit_code == 0)
+        metrics.record_command(command, time.perf_counter() - started_at, succeeded)
+        if _app_data is not None:
+            metrics.record_database(_app_data)
+        metrics.save()
+
+    ctx.call_on_close(save_metrics)
 
 
 def _show_version_callback(value: bool) -> None:
@@ -56,6 +201,7 @@ def _show_author_callback(value: bool) -> None:
 
 @cli_controller.callback()
 def main(
+    ctx: Context,
     author: Optional[bool] = Option(
         None,
         "--author",
@@ -72,8 +218,39 @@ def main(
         callback=_show_version_callback,
         is_eager=True,
     ),
+    db_path: Optional[str] = Option(
+        None,
+        "--db",
+        help="Database file, instead of the one of the config file or TASKS_TRACKER_DB.",
+        show_default=False,
+    ),
+    profile: bool = Option(
+        False,
+        "--profile",
+        help="Print the time of every phase of the command and its SQL statements to stderr.",
+    ),
+    profile_output: Optional[str] = Option(
+        None,
+        "--profile-output",
+        help="Profile the command and save its cProfile stats to this file, to read with pstats.",
+        show_default=False,
+    ),
 ) -> None:
-    return
+    global _db_path
+    # Commands forwarded to `serve` keep the database of the server
+    if db_path:
+        _db_path = os.path.expanduser(db_path)
+    try:
+        load_config_file()
+    except InvalidSettingError as error:
+        _exit_with_setting_error(error)
+    if profile or profile_output:
+        _start_profiling(ctx, profile_output)
+    if get_setting("metrics_file"):
+        from tasks_tracker.metrics import get_metrics_recorder
+
+        # Saved before the profiled data layer is closed, close callbacks run last first
+        _start_metrics(ctx, get_metrics_recorder())
 
 
 @cli_controller.command()
@@ -126,17 +303,16 @@ def add(
         title=title, description=description, start_date=start_date, end_date=end_date
     )
 
-    task = Task(
-        None,
+    task = new_task(
         title=title,
-        status=get_task_status_value(status) or Status.NOT_STARTED.value,
-        priority=get_task_priority_value(priority) or Priority.LOW.value,
+        status=get_task_status_value(status),
+        priority=get_task_priority_value(priority),
         description=description,
-        start_date=format_db_date_str(start_date) or datetime.now().strftime(DB_DATE_FORMAT),
+        start_date=format_db_date_str(start_date),
         end_date=format_db_date_str(end_date),
     )
 
-    adding_new_task_success = app_data.add_new_task(task)
+    adding_new_task_success = get_app_data().add_new_task(task)
 
     if adding_new_task_success:
         print_success_message(ADDING_TASK_SUCCESS)
@@ -145,6 +321,23 @@ def add(
         print_error(ADDING_TASK_ERROR)
 
 
+def _get_list_cache_key(list_format: ListFormat, *arguments: Any) -> Optional[str]:
+    """Key of the output of a list in the cache, None when the tasks changes cannot be known."""
+    from tasks_tracker.cache import ResultCache
+
+    change_counter = get_app_data().get_change_counter()
+    if change_counter is None:
+        return None
+    # The table is drawn for the console it is printed to, and every format shows due states
+    console = get_console()
+    output = (
+        (console.width, console.color_system, console.is_terminal)
+        if list_format == ListFormat.TABLE
+        else None
+    )
+    return ResultCache.make_key(change_counter, date.today(), list_format.value, output, *arguments)
+
+
 @cli_controller.command()
 def list(
     status: Optional[Status] = Option(
@@ -181,14 +374,179 @@ def list(
         show_default=False,
         formats=[DISPLAYING_DATE_FORMAT],
     ),
+    limit: Optional[int] = Option(
+        None, "--limit", "-l", min=1, help="Show at most this number of tasks.", show_default=False
+    ),
+    page_size: int = Option(
+        LIST_PAGE_SIZE, "--page-size", min=1, help="Number of tasks fetched and shown at a time."
+    ),
+    after: Optional[str] = Option(
+        None,
+        "--after",
+        help="Show the tasks after this cursor, printed at the end of a limited list.",
+        show_default=False,
+    ),
+    list_format: Optional[ListFormat] = Option(
+        None,
+        "--format",
+        "-F",
+        help="Output format. [default: table in a terminal, plain otherwise]",
+        show_default=False,
+    ),
+    include_archived: bool = Option(
+        False, "--include-archived", help="Also show the archived tasks."
+    ),
+    use_cache: Optional[bool] = Option(
+        None,
+        "--cache/--no-cache",
+        help="Show the same list again from a cache, until the tasks change. "
+        "[default: the list cache setting, off]",
+        show_default=False,
+    ),
+) -> None:
+    if use_cache is None:
+        use_cache = is_enabled("list_cache")
+    page_key = decode_page_cursor(after)
+    if list_format is None:
+        list_format = ListFormat.TABLE if is_terminal_output() else ListFormat.PLAIN
+    renderer = RENDERERS[list_format]()
+    next_cursor = None
+
+    cache = cache_key = None
+    if use_cache:
+        from tasks_tracker.cache import CacheEntry, ResultCache
+
+        cache_key = _get_list_cache_key(
+            list_format,
+            get_task_status_value(status),
+            get_task_priority_value(priority),
+            start_date,
+            end_date,
+            limit,
+            page_size,
+            page_key,
+            include_archived,
+        )
+        if cache_key:
+            cache = ResultCache(f"{get_app_data().db_path}-cache")
+
+    # Every page is read with a seek on (start_date, id) and printed before the next one is
+    # fetched, so the first rows show up as fast on a large table as on a small one.
+    try:
+        cached_list = cache.get(cache_key) if cache and cache_key else None
+        if cached_list:
+            renderer.replay(cached_list.output, cached_list.tasks_count)
+            renderer.finish(cached_list.next_cursor)
+            return
+        if cache:
+            renderer.record(cache.max_bytes)
+
+        while True:
+            size = page_size if limit is None else min(page_size, limit - renderer.tasks_count)
+            tasks = get_app_data().get_tasks_list(
+                status,
+                priority,
+                start_date,
+                end_date,
+                after=page_key,
+                limit=size + 1,
+                include_archived=include_archived,
+            )
+            has_more_tasks = len(tasks) > size
+            tasks = tasks[:size]
+            renderer.write_page(tasks)
+
+            if not has_more_tasks:
+                break
+            page_key = (tasks[-1].start_date, tasks[-1].id)
+            if limit is not None and renderer.tasks_count >= limit:
+                next_cursor = encode_page_cursor(tasks[-1])
+                break
+        output = renderer.recorded_output()
+        if cache and cache_key and output is not None:
+            cache.put(cache_key, CacheEntry(renderer.tasks_count, next_cursor, output))
+        renderer.finish(next_cursor)
+    except BrokenPipeError:
+        # The reader of the output, such as `head`, stopped reading: stop without a traceback,
+        # and send what is left in the stdout buffer nowhere
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise Exit(code=1)
+
+
+@cli_controller.command()
+def search(
+    text: str = Argument(
+        ..., help="Words to find in the title or description, end a word with * to match its start."
+    ),
+    status: Optional[Status] = Option(
+        None,
+        "--status",
+        "-s",
+        help="Filter by status.",
+        is_eager=True,
+        show_default=False,
+    ),
+    priority: Optional[Priority] = Option(
+        None,
+        "--priority",
+        "-p",
+        help="Filter by priority.",
+        is_eager=True,
+        show_default=False,
+    ),
+    start_date: Optional[datetime] = Option(
+        None,
+        "--start-date",
+        "-sd",
+        help="Filter by the date from the start date. E.g 22/02/2022",
+        is_eager=True,
+        show_default=False,
+        formats=[DISPLAYING_DATE_FORMAT],
+    ),
+    end_date: Optional[datetime] = Option(
+        None,
+        "--end-date",
+        "-ed",
+        help="Filter by the date before the end date. E.g 22/02/2022",
+        is_eager=True,
+        show_default=False,
+        formats=[DISPLAYING_DATE_FORMAT],
+    ),
+    limit: int = Option(
+        LIST_PAGE_SIZE, "--limit", "-l", min=1, help="Show at most this number of tasks."
+    ),
 ) -> None:
-    tasks = app_data.get_tasks_list(status, priority, start_date, end_date)
+    try:
+        tasks = get_app_data().search_tasks(text, status, priority, start_date, end_date, limit)
+    except ValueError as error:
+        raise BadParameter(str(error), param_hint="'TEXT'")
     print_tasks_list_table(tasks)
 
 
+@cli_controller.command()
+def stats(
+    exact: bool = Option(
+        False, "--exact", help="Count the tasks again instead of reading the saved counts."
+    ),
+    as_json: bool = Option(False, "--json", help="Print the counts as a JSON object."),
+) -> None:
+    tasks_stats = get_app_data().get_tasks_stats(exact=exact)
+    if tasks_stats is None:
+        raise Exit(code=1)
+
+    if as_json:
+        import json
+
+        echo(json.dumps(tasks_stats._asdict()))
+    else:
+        print_tasks_stats(tasks_stats)
+
+
 @cli_controller.command()
 def update(
-    id: str = Argument(..., help="Task ID", show_default=False),
+    ids: Optional[List[str]] = Argument(
+        None, help="IDs of the tasks to update.", show_default=False
+    ),
     is_forced_update: bool = Option(False, "--force", "-f", help="Force update task."),
     title: Optional[str] = Option(
         None,
@@ -240,34 +598,114 @@ def update(
         show_default=False,
         formats=[DISPLAYING_DATE_FORMAT],
     ),
+    where_status: Optional[Status] = Option(
+        None, "--where-status", help="Only update the tasks with this status.", show_default=False
+    ),
+    where_priority: Optional[Priority] = Option(
+        None,
+        "--where-priority",
+        help="Only update the tasks with this priority.",
+        show_default=False,
+    ),
+    where_start_date: Optional[datetime] = Option(
+        None,
+        "--where-start-date",
+        help="Only update the tasks starting from this date. E.g 22/02/2022",
+        show_default=False,
+        formats=[DISPLAYING_DATE_FORMAT],
+    ),
+    where_end_date: Optional[datetime] = Option(
+        None,
+        "--where-end-date",
+        help="Only update the tasks ending before this date. E.g 22/02/2022",
+        show_default=False,
+        formats=[DISPLAYING_DATE_FORMAT],
+    ),
+    dry_run: bool = Option(
+        False, "--dry-run", help="Show the number of tasks to update without updating them."
+    ),
 ) -> None:
+    for id in ids or []:
+        input_data_validation(id=id)
     input_data_validation(
-        id=id, title=title, description=description, start_date=start_date, end_date=end_date
+        title=title, description=description, start_date=start_date, end_date=end_date
     )
+    where_filters = (where_status, where_priority, where_start_date, where_end_date)
+
+    if ids and len(ids) == 1 and not any(where_filters) and not dry_run:
+        update_single_task(
+            ids[0], is_forced_update, title, description, priority, status, start_date, end_date
+        )
+        return
+
+    # Several tasks are updated by one statement, without loading them
+    bulk_target_validation(ids, *where_filters)
+    changes = task_changes(
+        title=title,
+        status=get_task_status_value(status),
+        priority=get_task_priority_value(priority),
+        description=description,
+        start_date=format_db_date_str(start_date),
+        end_date=format_db_date_str(end_date),
+    )
+    task_changes_validation(changes)
+    target = dict(
+        ids=ids or None,
+        status=where_status,
+        priority=where_priority,
+        start_date=where_start_date,
+        end_date=where_end_date,
+    )
+
+    if dry_run or not is_forced_update:
+        tasks_count = get_app_data().count_tasks(**target)
+        if tasks_count is None:
+            print_error(UPDATE_TASK_ERROR)
+            return
+        if dry_run:
+            print_success_message(UPDATE_TASKS_DRY_RUN.format(tasks_count))
+            return
+        if not confirm(f"Update {tasks_count} tasks with provided data?"):
+            raise Exit()
 
+    updated_tasks = get_app_data().update_tasks(changes, **target)
+    if updated_tasks is None:
+        print_error(UPDATE_TASK_ERROR)
+    else:
+        print_success_message(UPDATE_TASKS_SUCCESS.format(updated_tasks))
+
+
+def update_single_task(
+    id: str,
+    is_forced_update: bool,
+    title: Optional[str],
+    description: Optional[str],
+    priority: Optional[Priority],
+    status: Optional[Status],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> None:
     can_update = confirm("Update this task with provided data?") if not is_forced_update else True
 
     if can_update:
-        current_task = app_data.find_task_by_id(id)
-
-        if current_task:
-            updated_task = Task(
-                id=id,
-                title=title or current_task.title,
-                status=get_task_status_value(status) or current_task.status,
-                priority=get_task_priority_value(priority) or current_task.priority,
-                description=description or current_task.description,
-                start_date=format_db_date_str(start_date) or current_task.start_date,
-                end_date=format_db_date_str(end_date) or current_task.end_date,
-            )
+        # The fields are merged by the database, which also tells whether the task exists
+        updated_tasks = get_app_data().patch_task(
+            id,
+            task_changes(
+                title=title,
+                status=get_task_status_value(status),
+                priority=get_task_priority_value(priority),
+                description=description,
+                start_date=format_db_date_str(start_date),
+                end_date=format_db_date_str(end_date),
+            ),
+        )
 
-            is_task_updated_successfully = app_data.update_task(updated_task)
-
-            if is_task_updated_successfully:
-                print_success_message(UPDATE_TASK_SUCCESS)
-                print_task_detail(updated_task)
-            else:
-                print_error(UPDATE_TASK_ERROR)
+        if updated_tasks:
+            print_success_message(UPDATE_TASK_SUCCESS)
+            print_task_detail(updated_tasks[0])
+        elif updated_tasks is None:
+            print_error(UPDATE_TASK_ERROR)
         else:
             print_error(error_message=NO_TASK_FOUND_ERROR)
 
@@ -277,34 +715,139 @@ def update(
 
 @cli_controller.command()
 def delete(
-    id: str = Argument(..., help="Task ID", show_default=False),
+    ids: Optional[List[str]] = Argument(
+        None, help="IDs of the tasks to delete.", show_default=False
+    ),
     is_forced_delete: bool = Option(
         False,
         "--force",
         "-f",
         help="Force deleting task.",
     ),
+    status: Optional[Status] = Option(
+        None,
+        "--status",
+        "-s",
+        help="Only delete the tasks with this status.",
+        is_eager=True,
+        show_default=False,
+    ),
+    priority: Optional[Priority] = Option(
+        None,
+        "--priority",
+        "-p",
+        help="Only delete the tasks with this priority.",
+        is_eager=True,
+        show_default=False,
+    ),
+    start_date: Optional[datetime] = Option(
+        None,
+        "--start-date",
+        "-sd",
+        help="Only delete the tasks starting from this date. E.g 22/02/2022",
+        is_eager=True,
+        show_default=False,
+        formats=[DISPLAYING_DATE_FORMAT],
+    ),
+    end_date: Optional[datetime] = Option(
+        None,
+        "--end-date",
+        "-ed",
+        help="Only delete the tasks ending before this date. E.g 22/02/2022",
+        is_eager=True,
+        show_default=False,
+        formats=[DISPLAYING_DATE_FORMAT],
+    ),
+    dry_run: bool = Option(
+        False, "--dry-run", help="Show the number of tasks to delete without deleting them."
+    ),
 ):
-    input_data_validation(id=id)
+    for id in ids or []:
+        input_data_validation(id=id)
+    filters = (status, priority, start_date, end_date)
+
+    if ids and len(ids) == 1 and not any(filters) and not dry_run:
+        delete_single_task(ids[0], is_forced_delete)
+        return
+
+    bulk_target_validation(ids, *filters)
+    target = dict(
+        ids=ids or None, status=status, priority=priority, start_date=start_date, end_date=end_date
+    )
+
+    if dry_run or not is_forced_delete:
+        tasks_count = get_app_data().count_tasks(**target)
+        if tasks_count is None:
+            print_error(DELETE_TASK_ERROR)
+            return
+        if dry_run:
+            print_success_message(DELETE_TASKS_DRY_RUN.format(tasks_count))
+            return
+        if not confirm(f"Surely you want to delete {tasks_count} tasks?"):
+            raise Exit()
 
+    deleted_tasks = get_app_data().delete_tasks(**target)
+    if deleted_tasks is None:
+        print_error(DELETE_TASK_ERROR)
+    else:
+        print_success_message(DELETE_TASKS_SUCCESS.format(deleted_tasks))
+
+
+def delete_single_task(id: str, is_forced_delete: bool) -> None:
     can_delete = confirm("Surely you want to delete this task?") if not is_forced_delete else True
 
     if can_delete:
-        current_task = app_data.find_task_by_id(id)
-
-        if current_task:
-            is_task_deleted_succesfully = app_data.delete_task(id)
+        is_task_deleted = get_app_data().delete_task(id)
 
-            if is_task_deleted_succesfully:
-                print_success_message(DELETE_TASK_SUCCESS)
-            else:
-                print_error(DELETE_TASK_ERROR)
+        if is_task_deleted:
+            print_success_message(DELETE_TASK_SUCCESS)
+        elif is_task_deleted is None:
+            print_error(DELETE_TASK_ERROR)
         else:
             print_error(error_message=NO_TASK_FOUND_ERROR)
     else:
         raise Exit()
 
 
+@cli_controller.command()
+def archive(
+    ids: Optional[List[str]] = Argument(
+        None,
+        help="IDs of the tasks to archive. By default, the done tasks are archived.",
+        show_default=False,
+    ),
+    done_for_days: Optional[int] = Option(
+        None,
+        "--done-for",
+        "-d",
+        min=0,
+        help="Only archive the tasks done for more than this number of days.",
+        show_default=False,
+    ),
+    dry_run: bool = Option(
+        False, "--dry-run", help="Show the number of tasks to archive without moving them."
+    ),
+) -> None:
+    for id in ids or []:
+        input_data_validation(id=id)
+    if ids and done_for_days is not None:
+        raise BadParameter("Provide the IDs of the tasks or --done-for, not both.")
+
+    if dry_run:
+        tasks_count = get_app_data().count_tasks_to_archive(ids or None, done_for_days)
+        if tasks_count is None:
+            print_error(ARCHIVE_TASKS_ERROR)
+        else:
+            print_success_message(ARCHIVE_TASKS_DRY_RUN.format(tasks_count))
+        return
+
+    archived_tasks = get_app_data().archive_tasks(ids or None, done_for_days)
+    if archived_tasks is None:
+        print_error(ARCHIVE_TASKS_ERROR)
+    else:
+        print_success_message(ARCHIVE_TASKS_SUCCESS.format(archived_tasks))
+
+
 @cli_controller.command()
 def delete_all(
     is_forced_delete_all: bool = Option(
@@ -319,7 +862,7 @@ def delete_all(
     )
 
     if can_delete_all:
-        all_tasks_deleted_successfully = app_data.delete_all_tasks()
+        all_tasks_deleted_successfully = get_app_data().delete_all_tasks()
 
         if all_tasks_deleted_successfully:
             print_success_message(DELETE_ALL_TASKS_SUCCESS)
@@ -327,3 +870,267 @@ def delete_all(
             print_error(DELETE_ALL_TASKS_ERROR)
     else:
         raise Exit()
+
+
+@cli_controller.command("import")
+def import_tasks(
+    file: str = Argument(
+        ...,
+        help="CSV, JSON Lines or binary file to import, - to read from stdin.",
+        show_default=False,
+    ),
+    file_format: Optional[TransferFormat] = Option(
+        None,
+        "--format",
+        "-F",
+        help="Format of the file. Detected from the file extension by default.",
+        show_default=False,
+    ),
+    batch_size: int = Option(
+        IMPORT_BATCH_SIZE, "--batch-size", "-b", min=1, help="Number of tasks per transaction."
+    ),
+    checkpoint: Optional[str] = Option(
+        None,
+        "--checkpoint",
+        "-c",
+        help="Name of the checkpoint used to resume a stopped import. Defaults to the file path.",
+        show_default=False,
+    ),
+    restart: bool = Option(
+        False,
+        "--restart",
+        help="Ignore the checkpoint and import all rows, also of a file already imported.",
+    ),
+    allow_past_dates: bool = Option(
+        False, "--allow-past-dates", help="Accept start and end dates in the past."
+    ),
+) -> None:
+    file_format = file_format or detect_format(file)
+    if not file_format:
+        print_error(IMPORT_FORMAT_ERROR)
+        raise Exit(code=1)
+
+    if not checkpoint and file != "-":
+        checkpoint = os.path.abspath(file)
+    if checkpoint and restart:
+        get_app_data().delete_import_checkpoint(checkpoint)
+    elif checkpoint and get_app_data().is_import_completed(checkpoint):
+        # Rows without an ID would be added a second time
+        echo(IMPORT_ALREADY_DONE.format(file), err=True)
+        raise Exit()
+
+    # Rows already imported are kept, the checkpoint resumes after them once the file is fixed
+    try:
+        with open_transfer_file(file, file_format, "r") as stream:
+            summary = import_tasks_from_stream(
+                get_app_data(),
+                stream,
+                file_format,
+                batch_size=batch_size,
+                checkpoint=checkpoint,
+                allow_past_dates=allow_past_dates,
+                on_row_error=lambda error: echo(
+                    f"row {error.row_number}: {error.message}", err=True
+                ),
+            )
+    except (OSError, UnicodeDecodeError, ValueError) as error:
+        print_error(IMPORT_FILE_ERROR.format(file, error))
+        raise Exit(code=1)
+
+    if summary:
+        print_success_message(
+            f"Imported {summary.rows_imported} of {summary.rows_read} rows in {summary.seconds:.2f}s "
+            f"({summary.rows_per_second:.0f} rows/sec).\n"
+            f"{summary.rows_rejected} rejected, {summary.rows_duplicated} skipped with an existing ID."
+        )
+    else:
+        print_error(IMPORT_TASKS_ERROR)
+        raise Exit(code=1)
+
+
+@cli_controller.command()
+def export(
+    file: str = Argument("-", help="File to write the tasks to, - to write to stdout."),
+    file_format: Optional[TransferFormat] = Option(
+        None,
+        "--format",
+        "-F",
+        help="Format of the file. Detected from the file extension, JSON Lines by default.",
+        show_default=False,
+    ),
+    status: Optional[Status] = Option(
+        None,
+        "--status",
+        "-s",
+        help="Filter by status.",
+        is_eager=True,
+        show_default=False,
+    ),
+    priority: Optional[Priority] = Option(
+        None,
+        "--priority",
+        "-p",
+        help="Filter by priority.",
+        is_eager=True,
+        show_default=False,
+    ),
+    start_date: Optional[datetime] = Option(
+        None,
+        "--start-date",
+        "-sd",
+        help="Filter by the date from the start date. E.g 22/02/2022",
+        is_eager=True,
+        show_default=False,
+        formats=[DISPLAYING_DATE_FORMAT],
+    ),
+    end_date: Optional[datetime] = Option(
+        None,
+        "--end-date",
+        "-ed",
+        help="Filter by the date before the end date. E.g 22/02/2022",
+        is_eager=True,
+        show_default=False,
+        formats=[DISPLAYING_DATE_FORMAT],
+    ),
+    include_archived: bool = Option(
+        False, "--include-archived", help="Also export the archived tasks."
+    ),
+) -> None:
+    file_format = file_format or detect_format(file) or TransferFormat.JSONL
+
+    # Nothing but tasks may go to stdout when it is the export output, errors included
+    with console_to_stderr() if file == "-" else nullcontext():
+        try:
+            with open_transfer_file(file, file_format, "w") as stream:
+                rows = get_app_data().iter_task_rows(
+                    status, priority, start_date, end_date, include_archived=include_archived
+                )
+                exported_rows = export_tasks_to_stream(stream, file_format, rows)
+        except Exception:
+            print_error(EXPORT_TASKS_ERROR, with_trace=True)
+            raise Exit(code=1)
+
+    # Nothing but tasks may go to stdout when it is the export output
+    if file == "-":
+        echo(EXPORT_TASKS_SUCCESS.format(exported_rows), err=True)
+    else:
+        print_success_message(EXPORT_TASKS_SUCCESS.format(exported_rows))
+
+
+@cli_controller.command()
+def changes(
+    since: int = Option(
+        0,
+        "--since",
+        "-s",
+        min=0,
+        help="Sequence number of the last change already read. From 0, every task is listed.",
+    ),
+    limit: Optional[int] = Option(
+        None, "--limit", "-l", min=1, help="Maximum number of changes.", show_default=False
+    ),
+) -> None:
+    from tasks_tracker.database import ChangesPrunedError
+
+    # Stdout is the JSON lines feed, errors go to stderr
+    with console_to_stderr():
+        try:
+            last_seq = write_changes(sys.stdout, get_app_data().iter_changes(since, limit))
+        except ChangesPrunedError:
+            print_error(CHANGES_PRUNED_ERROR.format(since))
+            raise Exit(code=1)
+        except Exception:
+            print_error(CHANGES_ERROR, with_trace=True)
+            raise Exit(code=1)
+
+    # Nothing but changes may go to stdout
+    if last_seq is None:
+        echo(CHANGES_NONE.format(since), err=True)
+    else:
+        echo(CHANGES_SUCCESS.format(last_seq), err=True)
+
+
+@cli_controller.command()
+def prune_changes(
+    deleted_for_days: int = Option(
+        CHANGES_KEEP_DELETES_DAYS,
+        "--deleted-for",
+        "-d",
+        min=0,
+        help="Drop the deletes logged more than this number of days ago.",
+    ),
+) -> None:
+    pruned_changes = get_app_data().prune_changes(deleted_for_days)
+    if pruned_changes is None:
+        print_error(PRUNE_CHANGES_ERROR)
+    else:
+        print_success_message(PRUNE_CHANGES_SUCCESS.format(pruned_changes))
+
+
+@cli_controller.command()
+def batch(
+    file: str = Argument("-", help="Script with one command per line, - to read from stdin."),
+    commit_size: int = Option(
+        BATCH_COMMIT_SIZE,
+        "--commit-size",
+        "-c",
+        min=1,
+        help="Number of commands committed together.",
+    ),
+) -> None:
+    from typer.main import get_command
+
+    from tasks_tracker.batch import read_script, run_batch
+
+    # Stdout is one JSON result per command, the rest of the output goes to stderr
+    with console_to_stderr():
+        try:
+            with open_file(file, encoding="utf-8") as stream:
+                summary = run_batch(
+                    get_app_data(),
+                    get_command(cli_controller),  # type: ignore
+                    read_script(stream),
+                    commit_size,
+                    on_result=lambda result: echo(result.to_json()),
+                )
+        except Exception:
+            print_error(BATCH_TASKS_ERROR, with_trace=True)
+            raise Exit(code=1)
+
+    echo(
+        f"Ran {summary.commands} commands in {summary.seconds:.2f}s "
+        f"({summary.commands_per_second:.0f} commands/sec), {summary.failed} failed.",
+        err=True,
+    )
+    if summary.failed:
+        raise Exit(code=1)
+
+
+@cli_controller.command()
+def serve(
+    socket_path: Optional[str] = Option(
+        None,
+        "--socket",
+        help="Unix socket to listen on. [default: the socket setting, else one per database]",
+        show_default=False,
+    ),
+) -> None:
+    from tasks_tracker.server import close_server, create_server
+
+    socket_path = socket_path or get_socket_path(_db_path)
+    server = create_server(socket_path)
+    if server is None:
+        print_error(SERVE_RUNNING_ERROR.format(socket_path))
+        raise Exit(code=1)
+
+    # Open the database now rather than on the first forwarded command
+    get_app_data()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print_success_message(SERVE_STARTED.format(socket_path))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_server(server)
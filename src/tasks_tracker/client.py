@@ -0,0 +1,114 @@
+"""Forward commands to the server started by `tasks-tracker serve`.
+
+The entry point imports this module before anything else, so it must stay cheap to import:
+the socket and json modules are only imported when a server is running.
+"""
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from tasks_tracker.configs import SERVE_LOST_ERROR
+from tasks_tracker.settings import is_enabled
+
+if TYPE_CHECKING:
+    from socket import socket
+
+# Import and export stream files of any size and always run in-process.
+FORWARDED_COMMANDS = (
+    "add",
+    "list",
+    "search",
+    "stats",
+    "update",
+    "delete",
+    "delete-all",
+    "archive",
+)
+CONFIRMED_COMMANDS = ("update", "delete", "delete-all")
+FORCE_OPTIONS = ("--force", "-f")
+
+
+def needs_confirmation(args: List[str]) -> bool:
+    return args[0] in CONFIRMED_COMMANDS and not any(option in args for option in FORCE_OPTIONS)
+
+
+def can_forward(args: List[str]) -> bool:
+    if not args or args[0] not in FORWARDED_COMMANDS or is_enabled("no_daemon"):
+        return False
+    # The server has no terminal to ask for a confirmation
+    return not (needs_confirmation(args) and sys.stdin.isatty())
+
+
+def get_output_width() -> Optional[int]:
+    if os.environ.get("COLUMNS", "").isdigit():
+        return int(os.environ["COLUMNS"])
+    try:
+        return os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError):
+        return None
+
+
+def receive_all(connection: "socket") -> bytes:
+    chunks = []
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def is_own_socket(path: str) -> bool:
+    """Whether the path is a socket of this user, so that no other user receives the commands."""
+    import stat
+
+    try:
+        path_stat = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(path_stat.st_mode) and (
+        not hasattr(os, "getuid") or path_stat.st_uid == os.getuid()
+    )
+
+
+def forward_command(socket_path: str, args: List[str]) -> Optional[int]:
+    """Run the command on the server and return its exit code, None when no server is running.
+
+    Commands also run in-process when the socket belongs to another user.
+    """
+    if not is_own_socket(socket_path):
+        return None
+
+    import json
+    import socket
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            connection.connect(socket_path)
+        except OSError:
+            # A socket file left behind by a server that did not stop cleanly
+            return None
+
+        tty = sys.stdout.isatty()
+        request = {
+            "args": args,
+            # Only the confirmation prompt reads stdin, which may be a pipe that never closes
+            "input": sys.stdin.read() if needs_confirmation(args) else None,
+            "tty": tty,
+            "width": get_output_width() if tty or "COLUMNS" in os.environ else None,
+        }
+        try:
+            connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            connection.shutdown(socket.SHUT_WR)
+            response: Dict[str, Any] = json.loads(receive_all(connection))
+        except (OSError, ValueError):
+            sys.stderr.write(f"{SERVE_LOST_ERROR}\n")
+            return 1
+    finally:
+        connection.close()
+
+    sys.stdout.write(response["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
@@ -5,13 +5,27 @@ __author__ = "Irene Nguyen"
 __version__ = "0.1.0"
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Default database, the config file and the environment variables are read by settings.py
 DB_PATH = os.path.join(ROOT_DIR, "tasks-tracker.db")
 
+# Set to 1 to always run in-process instead of through `serve`
+NO_DAEMON_ENV = "TASKS_TRACKER_NO_DAEMON"
+# Set to 1 to cache the output of `list`, the same as its --cache option
+LIST_CACHE_ENV = "TASKS_TRACKER_LIST_CACHE"
+# Prometheus textfile collector file of the metrics, they are only recorded when it is set
+METRICS_FILE_ENV = "TASKS_TRACKER_METRICS_FILE"
+
+INVALID_CONFIG_FILE_ERROR = "Cannot read the config file {}: {}"
+INVALID_SETTING_ERROR = (
+    "Invalid value '{}' of {} (or of {} in the {} section of the config file), use {}."
+)
+
 DISPLAYING_DATE_FORMAT = "%d/%m/%Y"
 DB_DATE_FORMAT = "%Y-%m-%d"
 
 NO_TASK_FOUND = "No task found!"
 DATA_CONNECTION_ERROR = "Something wrong with database. Please try again."
+DATABASE_LOCKED_ERROR = "The database is busy with other changes. Please try again."
 ADDING_TASK_SUCCESS = "New task added successfully."
 ADDING_TASK_ERROR = "Adding task failed. Please try again."
 NO_TASK_FOUND_ERROR = "Cannot find any task with provided ID."
@@ -19,5 +33,47 @@ UPDATE_TASK_SUCCESS = "Task updated successfully."
 UPDATE_TASK_ERROR = "Updating task failed. Please try again."
 DELETE_TASK_SUCCESS = "Task deleted successfully."
 DELETE_TASK_ERROR = "Deleting task failed. Please try again."
+UPDATE_TASKS_SUCCESS = "Tasks updated: {}."
+UPDATE_TASKS_DRY_RUN = "Tasks that would be updated: {}."
+DELETE_TASKS_SUCCESS = "Tasks deleted: {}."
+DELETE_TASKS_DRY_RUN = "Tasks that would be deleted: {}."
+ARCHIVE_TASKS_SUCCESS = "Tasks archived: {}."
+ARCHIVE_TASKS_DRY_RUN = "Tasks that would be archived: {}."
+ARCHIVE_TASKS_ERROR = "Archiving tasks failed. Please try again."
 DELETE_ALL_TASKS_SUCCESS = "All tasks deleted successfully."
 DELETE_ALL_TASKS_ERROR = "Deleting all tasks failed. Please try again."
+IMPORT_FORMAT_ERROR = "Cannot detect the file format. Please provide it with --format."
+IMPORT_TASKS_ERROR = "Importing tasks stopped. Run the same command again to resume."
+IMPORT_FILE_ERROR = "Cannot read the tasks from {}: {}"
+IMPORT_ALREADY_DONE = (
+    "{} was already imported, nothing was added. Use --restart to import it again."
+)
+
+EXPORT_TASKS_SUCCESS = "Exported {} tasks."
+EXPORT_TASKS_ERROR = "Exporting tasks failed. Please try again."
+CHANGES_SUCCESS = "Changes streamed up to {0}, continue with --since {0}."
+CHANGES_NONE = "No change after {}."
+CHANGES_PRUNED_ERROR = (
+    "Deletes after {} were pruned from the change log. Read it again with --since 0."
+)
+CHANGES_ERROR = "Reading the changes failed. Please try again."
+PRUNE_CHANGES_SUCCESS = "Deletes pruned from the change log: {}."
+PRUNE_CHANGES_ERROR = "Pruning the change log failed. Please try again."
+SERVE_STARTED = "Serving commands on {}. Press Ctrl+C to stop."
+SERVE_RUNNING_ERROR = "A server is already running on {}."
+SERVE_LOST_ERROR = "The server stopped before the command finished, it may not have run."
+BATCH_UNKNOWN_COMMAND_ERROR = "Unknown batch command '{}', use one of {}."
+METRICS_SAVE_ERROR = "Saving metrics to {} failed: {}"
+BATCH_TASKS_ERROR = "Running the batch failed. Commands without a result line were not saved."
+
+LIST_PAGE_SIZE = 50
+# Size of the `list` output cache, larger outputs are not cached
+LIST_CACHE_MAX_BYTES = 2 * 1024 * 1024
+IMPORT_BATCH_SIZE = 10000
+EXPORT_CHUNK_SIZE = 1000
+BATCH_COMMIT_SIZE = 1000
+DUE_SOON_DAYS = 7
+# Deletes stay in the change log for this many days by default, see `prune-changes`
+CHANGES_KEEP_DELETES_DAYS = 30
+# Displayed dates kept by the formatting cache, about ten years of distinct days
+DATE_CACHE_SIZE = 4096
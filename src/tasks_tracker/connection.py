@@ -0,0 +1,189 @@
+"""SQLite connections shared by every process writing to the same tasks database.
+
+Databases use write-ahead logging by default: readers do not block the writer and the writer
+does not block readers. Writers still take turns, so write transactions wait up to the busy
+timeout for the lock and are retried a few times with a growing delay before giving up.
+"""
+import sqlite3
+import time
+from typing import Callable, NamedTuple, Optional, Tuple, TypeVar
+
+from tasks_tracker.settings import parse_setting
+
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+
+T = TypeVar("T")
+
+
+class DatabaseLockedError(Exception):
+    """Another process kept the database locked through every retry."""
+
+
+class StorageProfile(NamedTuple):
+    """Storage tuning of the connections, applied by `open_connection`."""
+
+    # Bytes of the database file read through memory mapping instead of system calls
+    mmap_size: int
+    # Pages kept in memory per connection, in KiB when negative
+    cache_size: int
+    temp_store: str
+    synchronous: str
+
+
+STORAGE_PROFILES = {
+    # The SQLite defaults. With WAL, "normal" only syncs at checkpoints: a power loss may drop
+    # the last commits but never corrupts the database.
+    "default": StorageProfile(0, -2000, "default", "normal"),
+    # Large databases on a fast disk: the file is mapped and a large cache keeps the indexes
+    "fast": StorageProfile(256 * 1024 * 1024, -65536, "memory", "normal"),
+    # Every commit is synced to the disk before the command ends
+    "durable": StorageProfile(0, -2000, "default", "full"),
+    # Throwaway databases, on tmpfs or of a CI job: nothing is synced, a crash may corrupt them
+    "ephemeral": StorageProfile(256 * 1024 * 1024, -65536, "memory", "off"),
+    # Small machines: a small cache, and temporary tables and indexes on the disk
+    "low_memory": StorageProfile(0, -512, "file", "normal"),
+}
+TEMP_STORES = ("default", "file", "memory")
+
+
+class ConnectionSettings(NamedTuple):
+    journal_mode: str = "wal"
+    storage_profile: str = "default"
+    # Synchronous level of the storage profile when not set
+    synchronous: Optional[str] = None
+    busy_timeout_ms: int = 5000
+    write_retries: int = 5
+    retry_backoff_seconds: float = 0.05
+    # Done tasks are archived when the database is opened, once done for more than these days
+    archive_done_days: Optional[int] = None
+
+
+def parse_count(value: str) -> int:
+    count = int(value)
+    if count < 0:
+        raise ValueError(value)
+    return count
+
+
+def parse_seconds(value: str) -> float:
+    seconds = float(value)
+    # Also rejects nan
+    if not seconds >= 0:
+        raise ValueError(value)
+    return seconds
+
+
+def parse_choice(name: str, choices: Tuple[str, ...]) -> Optional[str]:
+    def parse(value: str) -> str:
+        if value.lower() not in choices:
+            raise ValueError(value)
+        return value.lower()
+
+    return parse_setting(name, parse, f"one of {', '.join(choices)}")
+
+
+def load_connection_settings() -> ConnectionSettings:
+    """Default settings, overridden by the config file and the environment variables."""
+    defaults = ConnectionSettings()
+    busy_timeout_ms = parse_setting("busy_timeout_ms", parse_count, "a whole number")
+    write_retries = parse_setting("write_retries", parse_count, "a whole number")
+    retry_backoff_seconds = parse_setting("retry_backoff_seconds", parse_seconds, "seconds")
+    archive_done_days = parse_setting("archive_done_days", parse_count, "a number of days")
+    return ConnectionSettings(
+        journal_mode=parse_choice("journal_mode", JOURNAL_MODES) or defaults.journal_mode,
+        storage_profile=(
+            parse_choice("storage_profile", tuple(STORAGE_PROFILES)) or defaults.storage_profile
+        ),
+        synchronous=parse_choice("synchronous", SYNCHRONOUS_LEVELS) or defaults.synchronous,
+        busy_timeout_ms=defaults.busy_timeout_ms if busy_timeout_ms is None else busy_timeout_ms,
+        write_retries=defaults.write_retries if write_retries is None else write_retries,
+        retry_backoff_seconds=(
+            defaults.retry_backoff_seconds
+            if retry_backoff_seconds is None
+            else retry_backoff_seconds
+        ),
+        archive_done_days=archive_done_days,
+    )
+
+
+def get_storage_profile(settings: ConnectionSettings) -> StorageProfile:
+    profile = STORAGE_PROFILES.get(settings.storage_profile.lower())
+    if profile is None:
+        raise ValueError(
+            f"Invalid storage profile '{settings.storage_profile}', "
+            f"use one of {', '.join(STORAGE_PROFILES)}."
+        )
+    if settings.synchronous:
+        profile = profile._replace(synchronous=settings.synchronous)
+    return profile
+
+
+def is_locked_error(error: Exception) -> bool:
+    return isinstance(error, sqlite3.OperationalError) and (
+        getattr(error, "sqlite_errorname", "") in ("SQLITE_BUSY", "SQLITE_LOCKED")
+        or "database is locked" in str(error)
+    )
+
+
+def retry_when_locked(operation: Callable[[], T], settings: ConnectionSettings) -> T:
+    """Run the operation again while the database is locked, doubling the delay each time."""
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except sqlite3.OperationalError as error:
+            if not is_locked_error(error):
+                raise
+            if attempt >= settings.write_retries:
+                raise DatabaseLockedError(str(error)) from error
+            time.sleep(settings.retry_backoff_seconds * 2**attempt)
+            attempt += 1
+
+
+def begin_write(connection: sqlite3.Connection, settings: ConnectionSettings) -> None:
+    # The write lock is taken when the transaction starts rather than by its first write, so a
+    # busy database is detected before anything of the transaction has run.
+    retry_when_locked(lambda: connection.execute("BEGIN IMMEDIATE"), settings)
+
+
+def commit_write(connection: sqlite3.Connection, settings: ConnectionSettings) -> None:
+    # Without WAL, the commit waits for the readers to finish. A busy commit keeps the
+    # transaction open, so it can be tried again.
+    retry_when_locked(lambda: connection.execute("COMMIT"), settings)
+
+
+def open_connection(
+    db_path: str,
+    settings: ConnectionSettings,
+    check_same_thread: bool = True,
+    factory: Callable[..., sqlite3.Connection] = sqlite3.Connection,
+) -> sqlite3.Connection:
+    profile = get_storage_profile(settings)
+    if settings.journal_mode.lower() not in JOURNAL_MODES:
+        raise ValueError(f"Invalid journal mode '{settings.journal_mode}'.")
+    if profile.synchronous.lower() not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Invalid synchronous level '{profile.synchronous}'.")
+    if profile.temp_store.lower() not in TEMP_STORES:
+        raise ValueError(f"Invalid temp store '{profile.temp_store}'.")
+
+    # Transactions are started explicitly with `begin_write`, so that they can be nested
+    connection = sqlite3.connect(
+        db_path,
+        isolation_level=None,
+        timeout=settings.busy_timeout_ms / 1000,
+        check_same_thread=check_same_thread,
+        factory=factory,
+    )
+    connection.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+    connection.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+    connection.execute(f"PRAGMA temp_store = {profile.temp_store}")
+    # WAL is saved in the database file. Changing the journal mode needs a moment alone with the
+    # file, so it is only done when the mode is not already the right one.
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode != settings.journal_mode.lower():
+        retry_when_locked(
+            lambda: connection.execute(f"PRAGMA journal_mode = {settings.journal_mode}"), settings
+        )
+    connection.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    return connection
@@ -1,39 +1,437 @@
-from datetime import datetime
-from sqlite3 import Connection, Cursor, connect
-from typing import List, Optional
+import json
+from contextlib import contextmanager
+from datetime import date, datetime
+from sqlite3 import Connection, Cursor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from tasks_tracker.configs import DATA_CONNECTION_ERROR, DB_DATE_FORMAT, DB_PATH
-from tasks_tracker.model import Task
-from tasks_tracker.typing import Priority, Status
+from tasks_tracker.configs import (
+    DATA_CONNECTION_ERROR,
+    DATABASE_LOCKED_ERROR,
+    DB_PATH,
+    DUE_SOON_DAYS,
+    EXPORT_CHUNK_SIZE,
+)
+from tasks_tracker.connection import (
+    ConnectionSettings,
+    DatabaseLockedError,
+    begin_write,
+    commit_write,
+    load_connection_settings,
+    open_connection,
+)
+from tasks_tracker.metrics import get_metrics_recorder
+from tasks_tracker.model import PageKey, Task, TaskChange, TaskRow, TasksStats
+from tasks_tracker.settings import get_db_path
+from tasks_tracker.typing import DueState, Operation, Priority, Status
 from tasks_tracker.utils import print_error
 
+# Dates are stored as the number of days since 1970-01-01, which compares and indexes as a plain
+# integer. Tasks keep using DB_DATE_FORMAT strings, the conversion is done by SQLite in queries.
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+DATE_TO_DAY = f"CAST(julianday({{}}) - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER)"
+DAY_TO_DATE = f"date({UNIX_EPOCH_JULIAN_DAY} + {{}})"
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+TASK_COLUMN_EXPRESSIONS = {
+    "id": "id",
+    "title": "title",
+    "status": "status",
+    "priority": "priority",
+    "description": "description",
+    "start_date": DAY_TO_DATE.format("start_date"),
+    "end_date": DAY_TO_DATE.format("end_date"),
+}
+TASK_COLUMNS = ", ".join(TASK_COLUMN_EXPRESSIONS.values())
+# Stored columns of a task, shared by `tasks` and `tasks_archive`
+TASK_TABLE_COLUMNS = ", ".join(TASK_COLUMN_EXPRESSIONS)
+TASK_VALUES = f"?, ?, ?, ?, ?, {DATE_TO_DAY.format('?')}, {DATE_TO_DAY.format('?')}"
+TODAY = DATE_TO_DAY.format("date('now', 'localtime')")
+
+# Matches the "Expired" and "Expired soon" warnings of the list: a task expires at the start of
+# its end date. Parameters are today and tomorrow as days.
+DUE_STATE_COLUMN = f"""CASE WHEN end_date IS NULL THEN NULL WHEN end_date <= ? THEN '{DueState.EXPIRED.value}' WHEN end_date = ? THEN '{DueState.EXPIRES_SOON.value}' ELSE '{DueState.ON_TIME.value}' END"""
+# Queries that do not compute the due state still select a column for it, see task_row_factory.
+NO_DUE_STATE_COLUMN = "NULL"
+
+# Partial update of a task, parameters are the ID then the PATCH_FIELDS values, where NULL keeps
+# the current value. RETURNING gives back the saved task from the same statement.
+PATCH_FIELDS = ("title", "status", "priority", "description", "start_date", "end_date")
+PATCH_TASK_QUERY = f"""UPDATE tasks SET title = COALESCE(?2, title), status = COALESCE(?3, status), priority = COALESCE(?4, priority), description = COALESCE(?5, description), start_date = COALESCE({DATE_TO_DAY.format("?6")}, start_date), end_date = COALESCE({DATE_TO_DAY.format("?7")}, end_date) WHERE id = ?1 RETURNING {TASK_COLUMNS}, {NO_DUE_STATE_COLUMN}"""
+
+# Overdue and due soon counts only include the tasks that still have to be done.
+OPEN_TASK_CONDITION = f"{{end_date}} IS NOT NULL AND {{status}} IS NOT '{Status.DONE.value}'"
+# Statements of the counter triggers, for the `new` or `old` task and a "+ 1" or "- 1" change.
+COUNT_TASK = f"""INSERT INTO task_counters VALUES ({{task}}.status, {{task}}.priority, 0 {{change}}) ON CONFLICT (status, priority) DO UPDATE SET tasks = tasks {{change}}; INSERT INTO task_due_counters SELECT {{task}}.end_date, 0 {{change}} WHERE {OPEN_TASK_CONDITION.format(status="{task}.status", end_date="{task}.end_date")} ON CONFLICT (end_date) DO UPDATE SET open_tasks = open_tasks {{change}};"""
+
+# Statements of the change log triggers, for the `new` or `old` task and an Operation value. The
+# log keeps the last change of every task: its older entries are dropped by the same trigger.
+LOG_CHANGE = f"""DELETE FROM task_change_log WHERE task_id = {{task}}.id; INSERT INTO task_change_log (task_id, operation, changed_on) VALUES ({{task}}.id, '{{operation}}', {TODAY});"""
+TASK_CHANGED_CONDITION = " OR ".join(
+    f"old.{column} IS NOT new.{column}" for column in TASK_COLUMN_EXPRESSIONS if column != "id"
+)
+
+# Every entry upgrades the schema by one version. The current version of a database file is
+# stored in `PRAGMA user_version`, so files created before migrations existed start at 0.
+MIGRATIONS: Tuple[Tuple[str, ...], ...] = (
+    # 1: the original table, without any key or index.
+    (
+        """CREATE TABLE IF NOT EXISTS tasks( id text, title text, status text, priority text, description text, start_date text, end_date text)""",
+    ),
+    # 2: `id` becomes the primary key and the `get_tasks_list` filters get composite indexes.
+    (
+        """CREATE TABLE tasks_v2 (id TEXT PRIMARY KEY NOT NULL, title TEXT, status TEXT, priority TEXT, description TEXT, start_date TEXT NOT NULL, end_date TEXT)""",
+        # The first row of an ID keeps it, undated rows get the date they are migrated.
+        """INSERT OR IGNORE INTO tasks_v2 SELECT id, title, status, priority, description, COALESCE(start_date, date('now', 'localtime')), end_date FROM tasks WHERE id IS NOT NULL ORDER BY rowid""",
+        # Rows without an ID and the other rows of a duplicated ID get a new one, in the format
+        # of `generate_task_id`, rather than being lost.
+        """INSERT INTO tasks_v2 SELECT lower(hex(randomblob(5))), title, status, priority, description, COALESCE(start_date, date('now', 'localtime')), end_date FROM tasks WHERE rowid NOT IN (SELECT MIN(rowid) FROM tasks WHERE id IS NOT NULL GROUP BY id) ORDER BY rowid""",
+        """DROP TABLE tasks""",
+        """ALTER TABLE tasks_v2 RENAME TO tasks""",
+        """CREATE INDEX idx_tasks_start_date ON tasks (start_date, id)""",
+        """CREATE INDEX idx_tasks_status_start_date ON tasks (status, start_date, id)""",
+        """CREATE INDEX idx_tasks_priority_start_date ON tasks (priority, start_date, id)""",
+        """CREATE INDEX idx_tasks_status_priority_start_date ON tasks (status, priority, start_date, id)""",
+    ),
+    # 3: progress of bulk imports, saved in the same transaction as each imported batch.
+    (
+        """CREATE TABLE import_checkpoints (name TEXT PRIMARY KEY NOT NULL, rows_done INTEGER NOT NULL)""",
+    ),
+    # 4: dates are stored as days since 1970-01-01 and the end date gets an index.
+    (
+        """CREATE TABLE tasks_v4 (id TEXT PRIMARY KEY NOT NULL, title TEXT, status TEXT, priority TEXT, description TEXT, start_date INTEGER NOT NULL, end_date INTEGER)""",
+        f"""INSERT INTO tasks_v4 SELECT id, title, status, priority, description, COALESCE({DATE_TO_DAY.format("start_date")}, {DATE_TO_DAY.format("date('now', 'localtime')")}), {DATE_TO_DAY.format("end_date")} FROM tasks""",
+        """DROP TABLE tasks""",
+        """ALTER TABLE tasks_v4 RENAME TO tasks""",
+        """CREATE INDEX idx_tasks_start_date ON tasks (start_date, id)""",
+        """CREATE INDEX idx_tasks_status_start_date ON tasks (status, start_date, id)""",
+        """CREATE INDEX idx_tasks_priority_start_date ON tasks (priority, start_date, id)""",
+        """CREATE INDEX idx_tasks_status_priority_start_date ON tasks (status, priority, start_date, id)""",
+        """CREATE INDEX idx_tasks_end_date ON tasks (end_date)""",
+    ),
+    # 5: full-text index of the titles and descriptions. The index reads the text from `tasks`
+    # by rowid, so a migration that rebuilds `tasks` must run the 'rebuild' command again.
+    (
+        """CREATE VIRTUAL TABLE tasks_fts USING fts5(title, description, content='tasks', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+        """CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN INSERT INTO tasks_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description); END""",
+        """CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description); END""",
+        # Updates always set every column, the index is only touched when the text changed.
+        """CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description); INSERT INTO tasks_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description); END""",
+        """INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')""",
+    ),
+    # 6: task counts kept up to date by triggers, per status and priority and per end date of
+    # the tasks not done, so that `stats` does not depend on the number of tasks. Counts are
+    # changed with upserts: a NULL status or priority gets a new row for every change, which
+    # still adds up to the right count.
+    (
+        """CREATE TABLE task_counters (status TEXT, priority TEXT, tasks INTEGER NOT NULL, PRIMARY KEY (status, priority))""",
+        """CREATE TABLE task_due_counters (end_date INTEGER PRIMARY KEY NOT NULL, open_tasks INTEGER NOT NULL)""",
+        """INSERT INTO task_counters SELECT status, priority, COUNT(*) FROM tasks GROUP BY status, priority""",
+        f"""INSERT INTO task_due_counters SELECT end_date, COUNT(*) FROM tasks WHERE {OPEN_TASK_CONDITION.format(status="status", end_date="end_date")} GROUP BY end_date""",
+        f"""CREATE TRIGGER task_counters_insert AFTER INSERT ON tasks BEGIN {COUNT_TASK.format(task="new", change="+ 1")} END""",
+        f"""CREATE TRIGGER task_counters_delete AFTER DELETE ON tasks BEGIN {COUNT_TASK.format(task="old", change="- 1")} END""",
+        f"""CREATE TRIGGER task_counters_update AFTER UPDATE OF status, priority, end_date ON tasks WHEN old.status IS NOT new.status OR old.priority IS NOT new.priority OR old.end_date IS NOT new.end_date BEGIN {COUNT_TASK.format(task="old", change="- 1")} {COUNT_TASK.format(task="new", change="+ 1")} END""",
+        # Covers the exact counts of open tasks by end date
+        """DROP INDEX idx_tasks_end_date""",
+        """CREATE INDEX idx_tasks_end_date_status ON tasks (end_date, status)""",
+    ),
+    # 7: archive of the tasks moved out of `tasks`, and the day every task was done, kept by
+    # triggers for the archive policy. Tasks already done count as done on the migration day.
+    (
+        """ALTER TABLE tasks ADD COLUMN done_on INTEGER""",
+        f"""UPDATE tasks SET done_on = {TODAY} WHERE status = '{Status.DONE.value}'""",
+        """CREATE INDEX idx_tasks_done_on ON tasks (done_on) WHERE done_on IS NOT NULL""",
+        f"""CREATE TRIGGER tasks_done_on_insert AFTER INSERT ON tasks WHEN new.status = '{Status.DONE.value}' BEGIN UPDATE tasks SET done_on = {TODAY} WHERE rowid = new.rowid; END""",
+        f"""CREATE TRIGGER tasks_done_on_update AFTER UPDATE OF status ON tasks WHEN old.status IS NOT new.status BEGIN UPDATE tasks SET done_on = CASE WHEN new.status = '{Status.DONE.value}' THEN {TODAY} END WHERE rowid = new.rowid; END""",
+        """CREATE TABLE tasks_archive (id TEXT PRIMARY KEY NOT NULL, title TEXT, status TEXT, priority TEXT, description TEXT, start_date INTEGER NOT NULL, end_date INTEGER, done_on INTEGER, archived_on INTEGER NOT NULL)""",
+        """CREATE INDEX idx_tasks_archive_start_date ON tasks_archive (start_date, id)""",
+        """CREATE INDEX idx_tasks_archive_status_start_date ON tasks_archive (status, start_date, id)""",
+    ),
+    # 8: log of the changes of the tasks, for `changes --since`. AUTOINCREMENT never gives a
+    # sequence number again, even after the last entries were dropped. The existing tasks are
+    # logged as inserted, so reading the log from the start gives every task. A delete from
+    # `tasks` is logged as 'archive' when the archive trigger just logged the task.
+    (
+        """CREATE TABLE task_change_log (seq INTEGER PRIMARY KEY AUTOINCREMENT, task_id TEXT NOT NULL, operation TEXT NOT NULL, changed_on INTEGER NOT NULL)""",
+        """CREATE INDEX idx_task_change_log_task_id ON task_change_log (task_id)""",
+        f"""CREATE INDEX idx_task_change_log_deletes ON task_change_log (changed_on) WHERE operation = '{Operation.DELETE.value}'""",
+        # Last sequence number of the deletes dropped by `prune_changes`
+        """CREATE TABLE task_change_log_pruned (seq INTEGER NOT NULL)""",
+        """INSERT INTO task_change_log_pruned VALUES (0)""",
+        f"""INSERT INTO task_change_log (task_id, operation, changed_on) SELECT id, '{Operation.ARCHIVE.value}', {TODAY} FROM tasks_archive WHERE id NOT IN (SELECT id FROM tasks) ORDER BY rowid""",
+        f"""INSERT INTO task_change_log (task_id, operation, changed_on) SELECT id, '{Operation.INSERT.value}', {TODAY} FROM tasks ORDER BY rowid""",
+        f"""CREATE TRIGGER task_change_log_insert AFTER INSERT ON tasks BEGIN {LOG_CHANGE.format(task="new", operation=Operation.INSERT.value)} END""",
+        # `done_on` is kept by its own triggers and is not part of the task
+        f"""CREATE TRIGGER task_change_log_update AFTER UPDATE OF title, status, priority, description, start_date, end_date ON tasks WHEN {TASK_CHANGED_CONDITION} BEGIN {LOG_CHANGE.format(task="new", operation=Operation.UPDATE.value)} END""",
+        f"""CREATE TRIGGER task_change_log_delete AFTER DELETE ON tasks WHEN NOT EXISTS (SELECT 1 FROM task_change_log WHERE task_id = old.id AND operation = '{Operation.ARCHIVE.value}') BEGIN {LOG_CHANGE.format(task="old", operation=Operation.DELETE.value)} END""",
+        f"""CREATE TRIGGER task_change_log_archive AFTER INSERT ON tasks_archive BEGIN {LOG_CHANGE.format(task="new", operation=Operation.ARCHIVE.value)} END""",
+    ),
+    # 9: archived tasks deleted by `delete_all_tasks` are logged as deleted, unless a task of
+    # `tasks` has their ID again.
+    (
+        f"""CREATE TRIGGER task_change_log_archive_delete AFTER DELETE ON tasks_archive WHEN NOT EXISTS (SELECT 1 FROM tasks WHERE id = old.id) BEGIN {LOG_CHANGE.format(task="old", operation=Operation.DELETE.value)} END""",
+    ),
+    # 10: the checkpoint of a finished import is kept, so that importing the file again is noticed.
+    ("""ALTER TABLE import_checkpoints ADD COLUMN completed INTEGER NOT NULL DEFAULT 0""",),
+)
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def to_day(value: date) -> int:
+    return value.toordinal() - UNIX_EPOCH_ORDINAL
+
+
+def date_str_to_day(date_str: str) -> int:
+    return to_day(date.fromisoformat(date_str))
+
+
+_new_tuple = tuple.__new__
+
+
+def task_row_factory(cursor: Cursor, row: Tuple) -> Task:
+    """Build tasks straight from the rows, which must have one value for every Task field.
+
+    The row tuple becomes the task without going through the NamedTuple constructor.
+    """
+    return _new_tuple(Task, row)
+
+
+def task_cursor(connection: Connection) -> Cursor:
+    cursor = connection.cursor()
+    cursor.row_factory = task_row_factory
+    return cursor
+
+
+def get_schema_version(connection: Connection) -> int:
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(
+    connection: Connection,
+    target_version: int = SCHEMA_VERSION,
+    settings: ConnectionSettings = ConnectionSettings(),
+) -> int:
+    """Upgrade the database in place, one transaction per version, and return the new version."""
+    version = get_schema_version(connection)
+
+    while version < target_version:
+        # Take the write lock before reading the version again so that two processes opening an
+        # old file at the same time do not both run the same migration.
+        begin_write(connection, settings)
+        try:
+            version = get_schema_version(connection)
+            if version < target_version:
+                for statement in MIGRATIONS[version]:
+                    connection.execute(statement)
+                version += 1
+                connection.execute(f"PRAGMA user_version = {version}")
+            commit_write(connection, settings)
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    return version
+
+
+def build_filter_clause(
+    status: Optional[Status] = None,
+    priority: Optional[Priority] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    after: Optional[PageKey] = None,
+    ids: Optional[Sequence[str]] = None,
+) -> Tuple[str, List[Any]]:
+    # Only the provided filters end up in the query, otherwise SQLite cannot pick an index.
+    conditions: List[str] = []
+    parameters: List[Any] = []
+
+    if ids is not None:
+        # One JSON array parameter for any number of IDs, each one looked up with the key
+        conditions.append("id IN (SELECT value FROM json_each(?))")
+        parameters.append(json.dumps(list(ids)))
+    if status:
+        conditions.append("status = ?")
+        parameters.append(status.value)
+    if priority:
+        conditions.append("priority = ?")
+        parameters.append(priority.value)
+    if start_date:
+        conditions.append("start_date >= ?")
+        parameters.append(to_day(start_date))
+    if end_date:
+        conditions.append("(end_date <= ? OR end_date IS NULL)")
+        parameters.append(to_day(end_date))
+    if after:
+        # Keyset pagination: seek past the last row of the previous page in the
+        # (start_date, id) order instead of scanning and skipping it with OFFSET.
+        conditions.append("(start_date, id) > (?, ?)")
+        parameters.extend((date_str_to_day(after[0]), after[1]))
+
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where_clause, parameters
+
+
+def build_archive_clause(
+    ids: Optional[Sequence[str]] = None, done_for_days: Optional[int] = None
+) -> Tuple[str, List[Any]]:
+    """Tasks with one of the IDs, or else the done tasks, done for more than the given days."""
+    if ids is not None:
+        return build_filter_clause(ids=ids)
+    if done_for_days is None:
+        return "WHERE done_on IS NOT NULL", []
+    return "WHERE done_on IS NOT NULL AND done_on < ?", [to_day(date.today()) - done_for_days]
+
+
+def tasks_with_archive(where_clause: str, order_clause: str = "") -> str:
+    """Subquery of the tasks and the archived tasks matching the clause, with stored columns.
+
+    The parameters of the clause are needed twice. With the list order, both sides are read in
+    that order from their (start_date, id) index and merged.
+    """
+    return f"""(SELECT {TASK_TABLE_COLUMNS} FROM tasks {where_clause} UNION ALL SELECT {TASK_TABLE_COLUMNS} FROM tasks_archive {where_clause} {order_clause})"""
+
+
+def change_row_factory(cursor: Cursor, row: Tuple) -> TaskChange:
+    seq, operation, task_id, *task = row
+    return TaskChange(seq, operation, task_id, None if task[0] is None else tuple(task))
+
+
+def build_search_query(text: str) -> str:
+    """FTS5 query matching every word of the text, a word ending with * matches as a prefix.
+
+    Words are quoted, so the FTS5 operators and punctuation of the text are searched as text
+    instead of failing as a syntax error.
+    """
+    terms = []
+    for word in text.split():
+        is_prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            quoted_word = '"{}"'.format(word.replace('"', '""'))
+            terms.append(f"{quoted_word}*" if is_prefix else quoted_word)
+
+    if not terms:
+        raise ValueError("The search text has no word to search.")
+    return " ".join(terms)
+
+
+def print_data_error(error: Exception) -> None:
+    metrics = get_metrics_recorder()
+    if isinstance(error, DatabaseLockedError):
+        if metrics:
+            metrics.record_data_error("database_locked")
+        print_error(error_message=DATABASE_LOCKED_ERROR)
+    else:
+        if metrics:
+            metrics.record_data_error("data_connection")
+        print_error(error_message=DATA_CONNECTION_ERROR, with_trace=True)
+
+
+class ChangesPrunedError(Exception):
+    """Deletes newer than the requested sequence number were dropped from the change log."""
+
+    def __init__(self, pruned_seq: int):
+        super().__init__(f"The change log was pruned up to {pruned_seq}.")
+        self.pruned_seq = pruned_seq
+
+
+# Opens the connection of the data layer, given the database path and the settings
+ConnectionFactory = Callable[[str, ConnectionSettings], Connection]
+
 
 class TasksTrackerData:
     connection: Connection
-    cursor: Cursor
 
-    def __init__(self):
-        self.connection = connect(DB_PATH)
-        self.cursor = self.connection.cursor()
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        settings: Optional[ConnectionSettings] = None,
+        connect: ConnectionFactory = open_connection,
+    ):
+        self.settings = settings or load_connection_settings()
+        self.db_path = db_path or get_db_path(DB_PATH)
+        self.connection = connect(self.db_path, self.settings)
+        self.savepoint_depth = 0
         self.prepare_data()
 
-    def prepare_data(self) -> bool:
-        create_table_query = """CREATE TABLE IF NOT EXISTS tasks( id text, title text, status text, priority text, description text, start_date text, end_date text)"""
+    def reader(self) -> Connection:
+        """Connection of the queries, every call uses its own cursor."""
+        return self.connection
+
+    def writer(self) -> Connection:
+        """Connection of the changes, which are only made inside `transaction`."""
+        return self.connection
+
+    def close(self) -> None:
+        self.connection.close()
 
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Commit the block when it succeeds and roll it back when it raises.
+
+        Inside another transaction the block runs in a savepoint, so that a failure only rolls
+        back the changes of the block and the outer transaction goes on.
+        """
+        connection = self.writer()
+        if connection.in_transaction:
+            self.savepoint_depth += 1
+            savepoint = f"savepoint_{self.savepoint_depth}"
+            connection.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield
+            except BaseException:
+                connection.execute(f"ROLLBACK TO {savepoint}")
+                connection.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                connection.execute(f"RELEASE {savepoint}")
+            finally:
+                self.savepoint_depth -= 1
+        else:
+            begin_write(connection, self.settings)
+            try:
+                yield
+                commit_write(connection, self.settings)
+            except BaseException:
+                # Also when the commit itself failed, which leaves the transaction open
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+
+    def prepare_data(self) -> bool:
         try:
-            with self.connection:
-                self.connection.cursor().execute(create_table_query)
-            return True
-        except Exception:
-            print_error(error_message=DATA_CONNECTION_ERROR, with_trace=True)
+            migrate(self.connection, settings=self.settings)
+        except Exception as error:
+            print_data_error(error)
             return False
+        if self.settings.archive_done_days is not None:
+            self.apply_archive_policy(self.settings.archive_done_days)
+        return True
+
+    def apply_archive_policy(self, done_for_days: int) -> Optional[int]:
+        """Archive the tasks done for more than the given days, when there are any.
+
+        Checked every time the database is opened, so the write lock is only taken when some
+        tasks have to be moved.
+        """
+        where_clause, parameters = build_archive_clause(done_for_days=done_for_days)
+        try:
+            (has_tasks,) = (
+                self.reader()
+                .execute(f"""SELECT EXISTS (SELECT 1 FROM tasks {where_clause})""", parameters)
+                .fetchone()
+            )
+        except Exception as error:
+            print_data_error(error)
+            return None
+        return self.archive_tasks(done_for_days=done_for_days) if has_tasks else 0
 
     def add_new_task(self, task: Task) -> bool:
-        insert_task_query = """INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)"""
+        insert_task_query = f"""INSERT INTO tasks ({TASK_TABLE_COLUMNS}) VALUES ({TASK_VALUES})"""
 
         try:
-            with self.connection:
-                self.connection.cursor().execute(
+            with self.transaction():
+                self.writer().execute(
                     insert_task_query,
                     (
                         task.id,
@@ -47,8 +445,8 @@ class TasksTrackerData:
                 )
 
             return True
-        except Exception:
-            print_error(error_message=DATA_CONNECTION_ERROR, with_trace=True)
+        except Exception as error:
+            print_data_error(error)
             return False
 
     def get_tasks_list(
@@ -57,48 +455,189 @@ class TasksTrackerData:
         priority: Optional[Priority] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
+        after: Optional[PageKey] = None,
+        limit: Optional[int] = None,
+        include_archived: bool = False,
     ) -> List[Task]:
-        get_all_tasks_query = """SELECT * from tasks WHERE (status = ?1 OR ?1 IS NULL) AND (priority = ?2 OR ?2 IS NULL) AND (start_date >= ?3 OR ?3 IS NULL) AND (end_date <= ?4 OR ?4 IS NULL OR end_date IS NULL) ORDER BY start_date ASC"""
+        where_clause, parameters = build_filter_clause(
+            status, priority, start_date, end_date, after
+        )
+        if include_archived:
+            tasks_source = tasks_with_archive(where_clause, "ORDER BY start_date, id LIMIT ?")
+            get_all_tasks_query = f"""SELECT {TASK_COLUMNS}, {DUE_STATE_COLUMN} from {tasks_source} ORDER BY start_date ASC, id ASC"""
+            parameters = [*parameters, *parameters]
+        else:
+            get_all_tasks_query = f"""SELECT {TASK_COLUMNS}, {DUE_STATE_COLUMN} from tasks {where_clause} ORDER BY start_date ASC, id ASC LIMIT ?"""
+        today = to_day(date.today())
+        parameters = [today, today + 1, *parameters, limit if limit is not None else -1]
 
         try:
-            with self.connection:
-                self.cursor.execute(
-                    get_all_tasks_query,
-                    (
-                        status.value if status else None,
-                        priority.value if priority else None,
-                        start_date.strftime(DB_DATE_FORMAT) if start_date else None,
-                        end_date.strftime(DB_DATE_FORMAT) if end_date else None,
-                    ),
-                )
-                results = self.cursor.fetchall()
-                return [Task(*result) for result in results]
+            return task_cursor(self.reader()).execute(get_all_tasks_query, parameters).fetchall()
+        except Exception as error:
+            print_data_error(error)
+            return []
 
-        except Exception:
-            print_error(error_message=DATA_CONNECTION_ERROR, with_trace=True)
+    def iter_task_rows(
+        self,
+        status: Optional[Status] = None,
+        priority: Optional[Priority] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        include_archived: bool = False,
+    ) -> Iterator[TaskRow]:
+        """Same filters and order as `get_tasks_list`, streamed as plain rows.
+
+        Rows are fetched `chunk_size` at a time, so memory use does not grow with the table.
+        Database errors are raised to the caller, which may already have used part of the rows.
+        """
+        where_clause, parameters = build_filter_clause(status, priority, start_date, end_date)
+        if include_archived:
+            tasks_source = tasks_with_archive(where_clause, "ORDER BY start_date, id")
+            get_all_tasks_query = f"""SELECT {TASK_COLUMNS} from {tasks_source}"""
+            parameters = [*parameters, *parameters]
+        else:
+            get_all_tasks_query = f"""SELECT {TASK_COLUMNS} from tasks {where_clause} ORDER BY start_date ASC, id ASC"""
+
+        cursor = self.reader().execute(get_all_tasks_query, parameters)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def get_task_columns(
+        self,
+        columns: Sequence[str],
+        status: Optional[Status] = None,
+        priority: Optional[Priority] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, List[Any]]:
+        """Values of the given task fields as one list per field, in the listing order.
+
+        For callers that only aggregate values: no Task is built and unused fields are not read.
+        """
+        unknown_columns = [column for column in columns if column not in TASK_COLUMN_EXPRESSIONS]
+        if unknown_columns:
+            raise ValueError(f"Unknown task columns: {', '.join(unknown_columns)}.")
+
+        where_clause, parameters = build_filter_clause(status, priority, start_date, end_date)
+        selected_columns = ", ".join(TASK_COLUMN_EXPRESSIONS[column] for column in columns)
+        get_task_columns_query = f"""SELECT {selected_columns} from tasks {where_clause} ORDER BY start_date ASC, id ASC"""
+
+        try:
+            rows = self.reader().execute(get_task_columns_query, parameters).fetchall()
+            values = zip(*rows) if rows else ([] for _ in columns)
+            return {column: list(column_values) for column, column_values in zip(columns, values)}
+        except Exception as error:
+            print_data_error(error)
+            return {column: [] for column in columns}
+
+    def search_tasks(
+        self,
+        text: str,
+        status: Optional[Status] = None,
+        priority: Optional[Priority] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Task]:
+        """Tasks with every word of the text in their title or description, best match first.
+
+        Matches are ranked by bm25, with title words weighing twice as much as description words.
+        """
+        where_clause, parameters = build_filter_clause(status, priority, start_date, end_date)
+        # The full-text index finds and ranks the matching rowids first, then only those rows
+        # are read from `tasks` and checked against the other filters.
+        search_tasks_query = f"""WITH matches AS MATERIALIZED (SELECT rowid, bm25(tasks_fts, 2.0, 1.0) AS score FROM tasks_fts WHERE tasks_fts MATCH ?) SELECT {TASK_COLUMNS}, {DUE_STATE_COLUMN} FROM matches JOIN tasks ON tasks.rowid = matches.rowid {where_clause} ORDER BY matches.score, start_date, id LIMIT ?"""
+        today = to_day(date.today())
+        parameters = [
+            build_search_query(text),
+            today,
+            today + 1,
+            *parameters,
+            limit if limit is not None else -1,
+        ]
+
+        try:
+            return task_cursor(self.reader()).execute(search_tasks_query, parameters).fetchall()
+        except Exception as error:
+            print_data_error(error)
             return []
 
-    def find_task_by_id(self, id: str) -> Optional[Task]:
-        find_task_query = """SELECT * from tasks WHERE id = ?"""
+    def get_tasks_stats(self, exact: bool = False) -> Optional[TasksStats]:
+        """Counts of the tasks by status and priority, and of the overdue and due soon tasks.
+
+        The counts are read from the counter tables, which do not grow with the tasks. With
+        `exact`, they are counted again from the tasks with index only scans.
+        """
+        if exact:
+            count_query = (
+                """SELECT status, priority, COUNT(*) from tasks GROUP BY status, priority"""
+            )
+            open_tasks_query = f"""SELECT COUNT(*) from tasks WHERE end_date <= ? AND {OPEN_TASK_CONDITION.format(status="status", end_date="end_date")}"""
+        else:
+            count_query = """SELECT status, priority, SUM(tasks) from task_counters GROUP BY status, priority"""
+            open_tasks_query = (
+                """SELECT COALESCE(SUM(open_tasks), 0) from task_due_counters WHERE end_date <= ?"""
+            )
+        today = to_day(date.today())
 
         try:
-            with self.connection:
-                record = self.cursor.execute(find_task_query, (id,)).fetchone()
-                if record:
-                    task = Task(*record)
-                    return task
-                else:
-                    return None
-        except Exception:
-            print_error(error_message=DATA_CONNECTION_ERROR, with_trace=True)
+            connection = self.reader()
+            by_status: Dict[Optional[str], int] = dict.fromkeys(
+                (status.value for status in Status), 0
+            )
+            by_priority: Dict[Optional[str], int] = dict.fromkeys(
+                (priority.value for priority in Priority), 0
+            )
+            for status, priority, tasks in connection.execute(count_query):
+                by_status[status] = by_status.get(status, 0) + tasks
+                by_priority[priority] = by_priority.get(priority, 0) + tasks
+
+            # Same as the "Expired" warning of the list: a task expires at the start of its end date
+            (overdue,) = connection.execute(open_tasks_query, (today,)).fetchone()
+            (due_by_next_week,) = connection.execute(
+                open_tasks_query, (today + DUE_SOON_DAYS,)
+            ).fetchone()
+            return TasksStats(
+                total=sum(by_status.values()),
+                by_status={status: tasks for status, tasks in by_status.items() if tasks or status},
+                by_priority={
+                    priority: tasks for priority, tasks in by_priority.items() if tasks or priority
+                },
+                overdue=overdue,
+                due_this_week=due_by_next_week - overdue,
+            )
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def find_task_by_id(self, id: str, include_archived: bool = False) -> Optional[Task]:
+        find_task_query = (
+            f"""SELECT {TASK_COLUMNS}, {NO_DUE_STATE_COLUMN} from tasks WHERE id = ?"""
+        )
+        parameters: Tuple[str, ...] = (id,)
+        if include_archived:
+            find_task_query += f""" UNION ALL SELECT {TASK_COLUMNS}, {NO_DUE_STATE_COLUMN} from tasks_archive WHERE id = ? LIMIT 1"""
+            parameters = (id, id)
+
+        try:
+            return task_cursor(self.reader()).execute(find_task_query, parameters).fetchone()
+        except Exception as error:
+            print_data_error(error)
             return None
 
     def update_task(self, task: Task) -> bool:
-        update_query_task = """UPDATE tasks SET title = ?2, status = ?3, priority = ?4, description = ?5, start_date = ?6, end_date = ?7 WHERE id = ?1"""
+        update_query_task = f"""UPDATE tasks SET title = ?2, status = ?3, priority = ?4, description = ?5, start_date = {DATE_TO_DAY.format("?6")}, end_date = {DATE_TO_DAY.format("?7")} WHERE id = ?1"""
 
         try:
-            with self.connection:
-                self.cursor.execute(
+            with self.transaction():
+                self.writer().execute(
                     update_query_task,
                     (
                         task.id,
@@ -111,26 +650,304 @@ class TasksTrackerData:
                     ),
                 )
             return True
-        except Exception:
-            print_error(error_message=DATA_CONNECTION_ERROR, with_trace=True)
+        except Exception as error:
+            print_data_error(error)
             return False
 
-    def delete_task(self, id: str) -> bool:
+    def patch_task(self, id: str, changes: Dict[str, Optional[str]]) -> Optional[List[Task]]:
+        """Change some fields of a task and return it as saved, with one statement.
+
+        Fields missing from the changes or without a value keep their current value, so
+        concurrent changes of other fields are not overwritten. Returns a list with the updated
+        task, empty when no task has the ID, and None when the update failed.
+        """
+        unknown_fields = [field for field in changes if field not in PATCH_FIELDS]
+        if unknown_fields:
+            raise ValueError(f"Invalid task fields to update: {', '.join(unknown_fields)}.")
+
+        try:
+            with self.transaction():
+                return (
+                    task_cursor(self.writer())
+                    .execute(
+                        PATCH_TASK_QUERY, (id, *(changes.get(field) for field in PATCH_FIELDS))
+                    )
+                    .fetchall()
+                )
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def delete_task(self, id: str) -> Optional[bool]:
+        """Return True when the task was deleted, False when no task has the ID and None when
+        the delete failed."""
         delete_query_task = """DELETE from tasks WHERE id = ?"""
         try:
-            with self.connection:
-                self.cursor.execute(delete_query_task, (id,))
+            with self.transaction():
+                cursor = self.writer().execute(delete_query_task, (id,))
+            return cursor.rowcount > 0
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def count_tasks(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        status: Optional[Status] = None,
+        priority: Optional[Priority] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """Number of tasks that `update_tasks` or `delete_tasks` would change with the filters."""
+        where_clause, parameters = build_filter_clause(
+            status, priority, start_date, end_date, ids=ids
+        )
+        count_tasks_query = f"""SELECT COUNT(*) from tasks {where_clause}"""
+
+        try:
+            return self.reader().execute(count_tasks_query, parameters).fetchone()[0]
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def update_tasks(
+        self,
+        changes: Dict[str, Optional[str]],
+        ids: Optional[Sequence[str]] = None,
+        status: Optional[Status] = None,
+        priority: Optional[Priority] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """Set the changed fields of every task with one of the IDs and matching the filters.
+
+        The tasks are changed by one statement, and the number of changed tasks is returned.
+        Without IDs nor filters, every task is changed. Dates are DB_DATE_FORMAT strings.
+        """
+        unknown_fields = [
+            field for field in changes if field == "id" or field not in TASK_COLUMN_EXPRESSIONS
+        ]
+        if unknown_fields or not changes:
+            raise ValueError(f"Invalid task fields to update: {', '.join(unknown_fields)}.")
+
+        where_clause, parameters = build_filter_clause(
+            status, priority, start_date, end_date, ids=ids
+        )
+        assignments = ", ".join(
+            f"{field} = {DATE_TO_DAY.format('?') if field.endswith('_date') else '?'}"
+            for field in changes
+        )
+        update_tasks_query = f"""UPDATE tasks SET {assignments} {where_clause}"""
+
+        try:
+            with self.transaction():
+                cursor = self.writer().execute(update_tasks_query, [*changes.values(), *parameters])
+            return cursor.rowcount
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def delete_tasks(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        status: Optional[Status] = None,
+        priority: Optional[Priority] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """Delete every task with one of the IDs and matching the filters, in one statement.
+
+        Returns the number of deleted tasks. Without IDs nor filters, every task is deleted.
+        """
+        where_clause, parameters = build_filter_clause(
+            status, priority, start_date, end_date, ids=ids
+        )
+        delete_tasks_query = f"""DELETE from tasks {where_clause}"""
+
+        try:
+            with self.transaction():
+                cursor = self.writer().execute(delete_tasks_query, parameters)
+            return cursor.rowcount
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def count_tasks_to_archive(
+        self, ids: Optional[Sequence[str]] = None, done_for_days: Optional[int] = None
+    ) -> Optional[int]:
+        where_clause, parameters = build_archive_clause(ids, done_for_days)
+        count_tasks_query = f"""SELECT COUNT(*) from tasks {where_clause}"""
+
+        try:
+            return self.reader().execute(count_tasks_query, parameters).fetchone()[0]
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def archive_tasks(
+        self, ids: Optional[Sequence[str]] = None, done_for_days: Optional[int] = None
+    ) -> Optional[int]:
+        """Move tasks to the archive in one transaction and return how many were moved.
+
+        Tasks with one of the IDs are moved whatever their status. Without IDs, the done tasks
+        are moved, only the ones done for more than `done_for_days` days when it is given.
+        """
+        where_clause, parameters = build_archive_clause(ids, done_for_days)
+        archive_tasks_query = f"""INSERT OR REPLACE INTO tasks_archive SELECT {TASK_TABLE_COLUMNS}, done_on, ? FROM tasks {where_clause}"""
+        delete_tasks_query = f"""DELETE FROM tasks {where_clause}"""
+
+        try:
+            with self.transaction():
+                self.writer().execute(archive_tasks_query, [to_day(date.today()), *parameters])
+                cursor = self.writer().execute(delete_tasks_query, parameters)
+            return cursor.rowcount
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def iter_changes(
+        self, since: int = 0, limit: Optional[int] = None, chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> Iterator[TaskChange]:
+        """Last change of every task changed after the `since` sequence number, in log order.
+
+        The changes are read in one snapshot with the tasks they changed. Reading from 0 gives
+        every task. Raises ChangesPrunedError when deletes after `since` were pruned, the reader
+        has to start again from 0. Database errors are raised to the caller, like
+        `iter_task_rows`.
+        """
+        # Changes of tasks still in `tasks`, then of the archived tasks, merged by sequence
+        changes_query = f"""SELECT seq, operation, task_id, {TASK_COLUMNS} FROM task_change_log LEFT JOIN tasks ON operation IN ('{Operation.INSERT.value}', '{Operation.UPDATE.value}') AND id = task_id WHERE seq > ?1 AND operation != '{Operation.ARCHIVE.value}' UNION ALL SELECT seq, operation, task_id, {TASK_COLUMNS} FROM task_change_log JOIN tasks_archive ON id = task_id WHERE seq > ?1 AND operation = '{Operation.ARCHIVE.value}' ORDER BY seq LIMIT ?2"""
+
+        connection = self.reader()
+        in_transaction = connection.in_transaction
+        if not in_transaction:
+            connection.execute("BEGIN")
+        cursor = connection.cursor()
+        try:
+            (pruned_seq,) = cursor.execute("SELECT seq FROM task_change_log_pruned").fetchone()
+            if 0 < since < pruned_seq:
+                raise ChangesPrunedError(pruned_seq)
+            cursor.row_factory = change_row_factory
+            cursor.execute(changes_query, (since, limit if limit is not None else -1))
+            while True:
+                changes = cursor.fetchmany(chunk_size)
+                if not changes:
+                    break
+                yield from changes
+        finally:
+            cursor.close()
+            if not in_transaction and connection.in_transaction:
+                connection.execute("COMMIT")
+
+    def get_change_counter(self) -> Optional[int]:
+        """Sequence number of the last change of the tasks, which grows with every change.
+
+        Unlike `PRAGMA data_version`, it is stored in the database and can be compared between
+        connections and processes.
+        """
+        change_counter_query = """SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'task_change_log'), 0)"""
+
+        try:
+            return self.reader().execute(change_counter_query).fetchone()[0]
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def prune_changes(self, deleted_for_days: int) -> Optional[int]:
+        """Drop the deletes logged more than the given days ago and return how many were dropped.
+
+        Other changes are never dropped, the log already keeps one change per task. Readers of
+        the log that are behind the dropped deletes have to read it again from the start.
+        """
+        where_clause = f"""WHERE operation = '{Operation.DELETE.value}' AND changed_on < ?"""
+        save_pruned_seq_query = f"""UPDATE task_change_log_pruned SET seq = MAX(seq, COALESCE((SELECT MAX(seq) FROM task_change_log {where_clause}), 0))"""
+        prune_changes_query = f"""DELETE FROM task_change_log {where_clause}"""
+        parameters = (to_day(date.today()) - deleted_for_days,)
+
+        try:
+            with self.transaction():
+                self.writer().execute(save_pruned_seq_query, parameters)
+                cursor = self.writer().execute(prune_changes_query, parameters)
+            return cursor.rowcount
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def delete_all_tasks(self) -> bool:
+        """Delete every task, archived tasks included."""
+        try:
+            with self.transaction():
+                self.writer().execute("""DELETE from tasks""")
+                self.writer().execute("""DELETE from tasks_archive""")
             return True
-        except Exception:
-            print_error(error_message=DATA_CONNECTION_ERROR, with_trace=True)
+        except Exception as error:
+            print_data_error(error)
             return False
 
-    def delete_all_tasks(self) -> bool:
-        delete_query_task = """DELETE from tasks"""
+    def add_tasks_batch(
+        self, rows: Sequence[TaskRow], checkpoint: Optional[str] = None, rows_done: int = 0
+    ) -> Optional[int]:
+        """Insert many tasks in one transaction and return how many were inserted.
+
+        Rows with an ID that already exists are skipped. When a checkpoint name is given,
+        `rows_done` is saved with the batch so that an interrupted import can be resumed.
+        """
+        insert_tasks_query = (
+            f"""INSERT OR IGNORE INTO tasks ({TASK_TABLE_COLUMNS}) VALUES ({TASK_VALUES})"""
+        )
+        save_checkpoint_query = """INSERT INTO import_checkpoints (name, rows_done) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET rows_done = excluded.rows_done"""
+
         try:
-            with self.connection:
-                self.cursor.execute(delete_query_task)
+            with self.transaction():
+                cursor = self.writer().cursor()
+                cursor.executemany(insert_tasks_query, rows)
+                inserted_rows = cursor.rowcount
+                if checkpoint:
+                    cursor.execute(save_checkpoint_query, (checkpoint, rows_done))
+            return inserted_rows
+        except Exception as error:
+            print_data_error(error)
+            return None
+
+    def get_import_checkpoint(self, checkpoint: str) -> int:
+        find_checkpoint_query = """SELECT rows_done from import_checkpoints WHERE name = ?"""
+
+        try:
+            record = self.reader().execute(find_checkpoint_query, (checkpoint,)).fetchone()
+            return record[0] if record else 0
+        except Exception as error:
+            print_data_error(error)
+            return 0
+
+    def is_import_completed(self, checkpoint: str) -> bool:
+        find_completed_query = """SELECT completed from import_checkpoints WHERE name = ?"""
+
+        try:
+            record = self.reader().execute(find_completed_query, (checkpoint,)).fetchone()
+            return bool(record and record[0])
+        except Exception as error:
+            print_data_error(error)
+            return False
+
+    def complete_import_checkpoint(self, checkpoint: str, rows_done: int) -> bool:
+        """Keep the checkpoint of a finished import, `--restart` imports the file again."""
+        complete_checkpoint_query = """INSERT INTO import_checkpoints VALUES (?, ?, 1) ON CONFLICT (name) DO UPDATE SET rows_done = excluded.rows_done, completed = 1"""
+
+        try:
+            with self.transaction():
+                self.writer().execute(complete_checkpoint_query, (checkpoint, rows_done))
             return True
-        except Exception:
-            print_error(error_message=DATA_CONNECTION_ERROR, with_trace=True)
+        except Exception as error:
+            print_data_error(error)
+            return False
+
+    def delete_import_checkpoint(self, checkpoint: str) -> bool:
+        delete_checkpoint_query = """DELETE from import_checkpoints WHERE name = ?"""
+
+        try:
+            with self.transaction():
+                self.writer().execute(delete_checkpoint_query, (checkpoint,))
+            return True
+        except Exception as error:
+            print_data_error(error)
             return False
@@ -0,0 +1,287 @@
+"""Opt-in metrics of the commands and the data layer, for the Prometheus textfile collector.
+
+Set TASKS_TRACKER_METRICS_FILE, or `file` in the `[metrics]` section of the config file, to the
+`.prom` file read by the collector. Every process counts in memory and merges its counts into the
+file once, when its command ends: the totals are kept in a JSON state file next to it and updated
+under an exclusive lock, and both files are replaced atomically, so the collector never reads a
+partial file and no process loses the counts of another one.
+"""
+import json
+import os
+import sqlite3
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional
+
+from tasks_tracker.configs import METRICS_SAVE_ERROR
+from tasks_tracker.settings import get_setting
+
+if TYPE_CHECKING:
+    from tasks_tracker.database import TasksTrackerData
+
+# Upper bounds of the histogram buckets in seconds, from a task lookup to a large import
+DURATION_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Type and help of every metric, in the order of the file
+METRICS = {
+    "tasks_tracker_commands_total": ("counter", "Commands run, by command and outcome."),
+    "tasks_tracker_command_duration_seconds": ("histogram", "Time to run a command."),
+    "tasks_tracker_data_calls_total": ("counter", "Calls of the data layer, by method."),
+    "tasks_tracker_data_call_duration_seconds": ("histogram", "Time of a data layer call."),
+    "tasks_tracker_data_errors_total": ("counter", "Database errors shown to the user."),
+    "tasks_tracker_database_size_bytes": ("gauge", "Size of the database."),
+    "tasks_tracker_tasks": ("gauge", "Tasks in the database, by status."),
+}
+
+# Methods of the data layer that are measured. `iter_task_rows` and `iter_changes` return
+# generators, their time is spent by the caller going through the rows.
+DATA_METHODS = (
+    "add_new_task",
+    "get_tasks_list",
+    "get_task_columns",
+    "search_tasks",
+    "get_tasks_stats",
+    "find_task_by_id",
+    "update_task",
+    "patch_task",
+    "delete_task",
+    "count_tasks",
+    "update_tasks",
+    "delete_tasks",
+    "count_tasks_to_archive",
+    "archive_tasks",
+    "get_change_counter",
+    "prune_changes",
+    "delete_all_tasks",
+    "add_tasks_batch",
+    "get_import_checkpoint",
+    "is_import_completed",
+    "complete_import_checkpoint",
+    "delete_import_checkpoint",
+)
+
+# Series of a metric by their labels, such as `command="list",outcome="ok"`
+Series = Dict[str, Any]
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels: str) -> str:
+    return ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items())
+
+
+def format_sample(name: str, labels: str, value: float) -> str:
+    return f"{name}{{{labels}}} {value}\n" if labels else f"{name} {value}\n"
+
+
+def render_metrics(state: Dict[str, Series]) -> str:
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        series = state.get(name)
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {help_text}\n# TYPE {name} {metric_type}\n")
+        for labels, value in sorted(series.items()):
+            if metric_type != "histogram":
+                lines.append(format_sample(name, labels, value))
+                continue
+            # Buckets are stored apart and shown as running totals, then the sum and count
+            total = 0
+            bucket_labels = f"{labels}," if labels else ""
+            for bound, bucket in zip((*DURATION_BUCKETS, "+Inf"), value[:-1]):
+                total += bucket
+                lines.append(format_sample(f"{name}_bucket", f'{bucket_labels}le="{bound}"', total))
+            lines.append(format_sample(f"{name}_sum", labels, value[-1]))
+            lines.append(format_sample(f"{name}_count", labels, total))
+    return "".join(lines)
+
+
+def merge_metrics(state: Dict[str, Series], recorded: Dict[str, Series]) -> None:
+    """Add the recorded counters and histograms to the state, gauges replace their old values."""
+    for name, series in recorded.items():
+        metric_type = METRICS[name][0]
+        if metric_type == "gauge":
+            state[name] = dict(series)
+            continue
+        state_series = state.setdefault(name, {})
+        for labels, value in series.items():
+            old_value = state_series.get(labels)
+            if metric_type == "counter":
+                state_series[labels] = (old_value or 0) + value
+            elif old_value and len(old_value) == len(value):
+                state_series[labels] = [old + new for old, new in zip(old_value, value)]
+            else:
+                # New series, or saved with other buckets
+                state_series[labels] = list(value)
+
+
+def write_file_atomically(path: str, content: str) -> None:
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        file.write(content)
+    os.replace(temporary_path, path)
+
+
+@contextmanager
+def lock_exclusively(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on the file while in the block, waiting for other processes.
+
+    Uses flock, or msvcrt on Windows, which gives up with an OSError after 10 seconds.
+    """
+    with open(path, "a+") as lock_file:
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+
+            # msvcrt locks bytes from the current position, the lock file stays empty
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+
+class MetricsRecorder:
+    """Metrics of this process since they were last saved."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.recorded: Dict[str, Series] = {}
+        # Method of the data layer running, for the errors it shows
+        self.data_method: Optional[str] = None
+
+    def count(self, name: str, **labels: str) -> None:
+        self.add_count(name, format_labels(**labels))
+
+    def add_count(self, name: str, labels: str) -> None:
+        series = self.recorded.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + 1
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        self.add_observation(name, format_labels(**labels), seconds)
+
+    def add_observation(self, name: str, labels: str, seconds: float) -> None:
+        series = self.recorded.setdefault(name, {})
+        # One count per bucket and the +Inf bucket, then the sum of the observed values
+        value = series.get(labels)
+        if value is None:
+            value = series[labels] = [0] * (len(DURATION_BUCKETS) + 1) + [0.0]
+        value[bisect_left(DURATION_BUCKETS, seconds)] += 1
+        value[-1] += seconds
+
+    def set_gauge(self, name: str, values: Dict[str, float]) -> None:
+        self.recorded[name] = values
+
+    def record_command(self, command: str, seconds: float, succeeded: bool) -> None:
+        self.count(
+            "tasks_tracker_commands_total", command=command, outcome="ok" if succeeded else "error"
+        )
+        self.observe("tasks_tracker_command_duration_seconds", seconds, command=command)
+
+    def record_data_error(self, error: str) -> None:
+        self.count("tasks_tracker_data_errors_total", method=self.data_method or "", error=error)
+
+    def record_database(self, tasks_data: "TasksTrackerData") -> None:
+        # Read from the counters kept by triggers, so this stays fast on large databases
+        try:
+            connection = tasks_data.reader()
+            (page_count,) = connection.execute("PRAGMA page_count").fetchone()
+            (page_size,) = connection.execute("PRAGMA page_size").fetchone()
+            tasks_by_status = connection.execute(
+                "SELECT status, SUM(tasks) FROM task_counters GROUP BY status"
+            ).fetchall()
+        except sqlite3.Error:
+            return
+        self.set_gauge("tasks_tracker_database_size_bytes", {"": page_count * page_size})
+        self.set_gauge(
+            "tasks_tracker_tasks",
+            {format_labels(status=status or "none"): tasks for status, tasks in tasks_by_status},
+        )
+
+    def measure(self, method_name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        labels = format_labels(method=method_name)
+
+        @wraps(method)
+        def measured_method(*args: Any, **kwargs: Any) -> Any:
+            outer_method, self.data_method = self.data_method, method_name
+            started_at = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.data_method = outer_method
+                self.add_count("tasks_tracker_data_calls_total", labels)
+                self.add_observation(
+                    "tasks_tracker_data_call_duration_seconds",
+                    labels,
+                    time.perf_counter() - started_at,
+                )
+
+        return measured_method
+
+    def measure_data(self, tasks_data: "TasksTrackerData") -> None:
+        """Measure the calls of this data layer object, other objects are left as they are."""
+        for method_name in DATA_METHODS:
+            setattr(
+                tasks_data, method_name, self.measure(method_name, getattr(tasks_data, method_name))
+            )
+
+    def save(self) -> None:
+        """Merge the recorded metrics into the metrics file and start recording again."""
+        if not self.recorded:
+            return
+        state_path = f"{self.path}.json"
+        try:
+            with lock_exclusively(f"{self.path}.lock"):
+                try:
+                    with open(state_path, encoding="utf-8") as state_file:
+                        state = json.load(state_file)
+                except (FileNotFoundError, ValueError):
+                    state = {}
+                merge_metrics(state, self.recorded)
+                write_file_atomically(state_path, json.dumps(state))
+                write_file_atomically(self.path, render_metrics(state))
+        except OSError as error:
+            # Metrics never make a command fail
+            sys.stderr.write(METRICS_SAVE_ERROR.format(self.path, error) + "\n")
+        self.recorded = {}
+
+
+_recorder: Optional[MetricsRecorder] = None
+
+
+def get_metrics_recorder() -> Optional[MetricsRecorder]:
+    """Recorder of this process, None when metrics are not enabled."""
+    global _recorder
+    if _recorder is None:
+        path = get_setting("metrics_file")
+        if path:
+            _recorder = MetricsRecorder(os.path.expanduser(path))
+    return _recorder
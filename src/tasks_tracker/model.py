@@ -1,27 +1,81 @@
 from datetime import datetime
-from typing import Optional
-
-from nanoid import generate
-
-
-class Task:
-    def __init__(
-        self,
-        id: Optional[str],
-        title: Optional[str],
-        status: Optional[str],
-        priority: Optional[str],
-        description: Optional[str],
-        start_date: Optional[str],
-        end_date: Optional[str],
-    ) -> None:
-        self.id = id if id else generate("1234567890abcdef", 10)
-        self.title = title
-        self.status = status
-        self.priority = priority
-        self.description = description
-        self.start_date = start_date
-        self.end_date = end_date
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from tasks_tracker.configs import DB_DATE_FORMAT
+from tasks_tracker.typing import Priority, Status
+
+# A task as stored in the tasks table: id, title, status, priority, description, start and end date
+TaskRow = Tuple[str, str, str, str, Optional[str], str, Optional[str]]
+
+# Position of a task in the listing order: start date, id
+PageKey = Tuple[str, str]
+
+
+def generate_task_id() -> str:
+    from nanoid import generate
+
+    return generate("1234567890abcdef", 10)
+
+
+class Task(NamedTuple):
+    """An immutable task, as loaded from the database. New tasks get their ID from
+    `generate_task_id`, so building a task from a row never imports nanoid."""
+
+    id: str
+    title: Optional[str]
+    status: Optional[str]
+    priority: Optional[str]
+    description: Optional[str]
+    start_date: Optional[str]
+    end_date: Optional[str]
+    # DueState value computed by the query that loaded the task, None when not computed
+    due_state: Optional[str] = None
 
     def __repr__(self) -> str:
         return f"({self.id}, {self.title}, {self.status}, {self.priority}, {self.description}, {self.start_date}, {self.end_date})"
+
+
+class TasksStats(NamedTuple):
+    """Overview of the tasks. Tasks due this week end in the next DUE_SOON_DAYS days, overdue
+    and due tasks only count the tasks that are not done."""
+
+    total: int
+    by_status: Dict[Optional[str], int]
+    by_priority: Dict[Optional[str], int]
+    overdue: int
+    due_this_week: int
+
+
+class TaskChange(NamedTuple):
+    """Last change of a task in the change log. The task is read when the change is, so it is
+    the task as it is now: in the archive for an archive change and None for a delete."""
+
+    seq: int
+    operation: str
+    task_id: str
+    task: Optional[TaskRow]
+
+
+def task_changes(**changes: Optional[str]) -> Dict[str, str]:
+    """The fields to change, without the ones given without a value."""
+    return {field: value for field, value in changes.items() if value}
+
+
+def new_task(
+    title: str,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    description: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Task:
+    """A task to add, with a new ID and the defaults of the `add` command."""
+    return Task(
+        generate_task_id(),
+        title,
+        status or Status.NOT_STARTED.value,
+        priority or Priority.LOW.value,
+        description,
+        start_date or datetime.now().strftime(DB_DATE_FORMAT),
+        end_date,
+    )
@@ -0,0 +1,82 @@
+"""Thread-safe variant of the data layer, for applications calling it from many threads."""
+import threading
+from contextlib import contextmanager
+from sqlite3 import Connection
+from typing import Iterator, List, Optional
+
+from tasks_tracker.connection import ConnectionSettings, open_connection
+from tasks_tracker.database import TasksTrackerData
+
+
+class ConnectionPool:
+    """One read connection per thread and a single write connection shared under a lock.
+
+    With WAL, read connections see the last committed changes and never wait for the writer.
+    Read connections are closed with the pool, not when their thread ends, so the pool is meant
+    for a fixed set of worker threads.
+    """
+
+    def __init__(self, db_path: str, settings: ConnectionSettings):
+        self.db_path = db_path
+        self.settings = settings
+        self.write_connection = open_connection(db_path, settings, check_same_thread=False)
+        self.write_lock = threading.RLock()
+        self.read_connections: List[Connection] = []
+        self._read_connections_lock = threading.Lock()
+        self._local = threading.local()
+
+    def read_connection(self) -> Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Only used by this thread, but closed by the thread closing the pool
+            connection = open_connection(self.db_path, self.settings, check_same_thread=False)
+            connection.execute("PRAGMA query_only = ON")
+            self._local.connection = connection
+            with self._read_connections_lock:
+                self.read_connections.append(connection)
+        return connection
+
+    def close(self) -> None:
+        with self._read_connections_lock:
+            for connection in self.read_connections:
+                connection.close()
+            self.read_connections.clear()
+        with self.write_lock:
+            self.write_connection.close()
+
+
+class PooledTasksTrackerData(TasksTrackerData):
+    """`TasksTrackerData` that can be shared by threads.
+
+    Queries run on the read connection of the calling thread. Changes take the write lock for
+    the whole transaction, and the queries made inside it use the write connection so that
+    they see the changes of the transaction.
+    """
+
+    def __init__(
+        self, db_path: Optional[str] = None, settings: Optional[ConnectionSettings] = None
+    ):
+        self._local = threading.local()
+        super().__init__(db_path, settings, connect=self._open_pool)
+
+    def _open_pool(self, db_path: str, settings: ConnectionSettings) -> Connection:
+        self.pool = ConnectionPool(db_path, settings)
+        return self.pool.write_connection
+
+    def reader(self) -> Connection:
+        if getattr(self._local, "transaction_depth", 0):
+            return self.pool.write_connection
+        return self.pool.read_connection()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self.pool.write_lock:
+            self._local.transaction_depth = getattr(self._local, "transaction_depth", 0) + 1
+            try:
+                with super().transaction():
+                    yield
+            finally:
+                self._local.transaction_depth -= 1
+
+    def close(self) -> None:
+        self.pool.close()
@@ -0,0 +1,201 @@
+"""Where the time of a command goes, for the global `--profile` option.
+
+The time of the command is split in phases: the imports before the command starts, opening
+(and migrating) the database, running the SQL queries, building tasks from their rows and the
+rest of the command, which is mostly rendering the output. Phases do not overlap: a phase that
+starts inside another one pauses it. Every SQL statement is also logged with its duration and
+the number of rows it returned or changed.
+"""
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tasks_tracker.connection import ConnectionSettings, open_connection
+from tasks_tracker.database import TasksTrackerData
+
+Clock = Tuple[float, float]
+
+# Phases in the order of the report. The command itself runs in the render phase.
+RENDER_PHASE = "render"
+PHASES = ("imports", "prepare_data", "query", "hydration", RENDER_PHASE)
+# Phases that keep the time of the phases started inside them, such as the migration queries
+ENCLOSING_PHASES = ("prepare_data",)
+STATEMENT_MAX_LENGTH = 100
+
+
+def read_clock() -> Clock:
+    return time.perf_counter(), time.process_time()
+
+
+def shorten_statement(sql: str) -> str:
+    sql = re.sub(r"\s+", " ", sql).strip()
+    return sql if len(sql) <= STATEMENT_MAX_LENGTH else sql[: STATEMENT_MAX_LENGTH - 3] + "..."
+
+
+class StatementTiming:
+    """An executed statement, its time includes fetching its rows."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.seconds = 0.0
+        self.rows = 0
+
+
+class Profiler:
+    def __init__(self, started_at: Optional[Clock] = None):
+        self.phases: Dict[str, List[float]] = {}
+        self.statements: List[StatementTiming] = []
+        self.stack = [RENDER_PHASE]
+        self.clock = read_clock()
+        if started_at:
+            self.add_time("imports", started_at, self.clock)
+
+    def add_time(self, phase: str, started_at: Clock, ended_at: Clock) -> None:
+        wall, cpu = self.phases.setdefault(phase, [0.0, 0.0])
+        self.phases[phase] = [wall + ended_at[0] - started_at[0], cpu + ended_at[1] - started_at[1]]
+
+    def charge(self) -> None:
+        """Add the time since the last change of phase to the current phase."""
+        clock = read_clock()
+        self.add_time(self.stack[-1], self.clock, clock)
+        self.clock = clock
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if self.stack[-1] in ENCLOSING_PHASES:
+            name = self.stack[-1]
+        self.charge()
+        self.stack.append(name)
+        try:
+            yield
+        finally:
+            self.charge()
+            self.stack.pop()
+
+    def report(self) -> List[str]:
+        self.charge()
+        lines = [f"{'PHASE':<14}{'WALL MS':>12}{'CPU MS':>12}"]
+        for phase in (*PHASES, *(phase for phase in self.phases if phase not in PHASES)):
+            if phase in self.phases:
+                wall, cpu = self.phases[phase]
+                lines.append(f"{phase:<14}{wall * 1000:>12.2f}{cpu * 1000:>12.2f}")
+        wall, cpu = (sum(times) for times in zip(*self.phases.values()))
+        lines.append(f"{'total':<14}{wall * 1000:>12.2f}{cpu * 1000:>12.2f}")
+
+        lines.append("")
+        lines.append(f"{len(self.statements)} SQL statements")
+        for statement in self.statements:
+            lines.append(
+                f"{statement.seconds * 1000:>10.3f} ms {statement.rows:>9} rows  "
+                f"{shorten_statement(statement.sql)}"
+            )
+        return lines
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Times its statements, and builds rows with its row factory apart from fetching them."""
+
+    profiler: Profiler
+    timing: Optional[StatementTiming] = None
+
+    def run_statement(self, sql: str, operation: Callable[[], Any]) -> "ProfiledCursor":
+        self.timing = StatementTiming(sql)
+        self.profiler.statements.append(self.timing)
+        with self.profiler.phase("query"):
+            started_at = time.perf_counter()
+            operation()
+            self.timing.seconds += time.perf_counter() - started_at
+        if self.description is None and self.rowcount > 0:
+            self.timing.rows = self.rowcount
+        return self
+
+    def execute(self, sql: str, parameters: Any = ()) -> "ProfiledCursor":
+        return self.run_statement(sql, lambda: super(ProfiledCursor, self).execute(sql, parameters))
+
+    def executemany(self, sql: str, parameters: Iterable[Any]) -> "ProfiledCursor":
+        return self.run_statement(
+            sql, lambda: super(ProfiledCursor, self).executemany(sql, parameters)
+        )
+
+    def executescript(self, sql: str) -> "ProfiledCursor":  # type: ignore[override]
+        return self.run_statement(sql, lambda: super(ProfiledCursor, self).executescript(sql))
+
+    def fetch(self, operation: Callable[[], Any], many: bool) -> Any:
+        row_factory, self.row_factory = self.row_factory, None
+        try:
+            with self.profiler.phase("query"):
+                started_at = time.perf_counter()
+                rows = operation()
+                if self.timing:
+                    self.timing.seconds += time.perf_counter() - started_at
+                    self.timing.rows += len(rows) if many else int(rows is not None)
+        finally:
+            self.row_factory = row_factory
+        if row_factory is None or rows is None:
+            return rows
+        with self.profiler.phase("hydration"):
+            if many:
+                return [row_factory(self, row) for row in rows]
+            return row_factory(self, rows)
+
+    def fetchone(self) -> Any:
+        return self.fetch(super().fetchone, many=False)
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        size = self.arraysize if size is None else size
+        return self.fetch(lambda: super(ProfiledCursor, self).fetchmany(size), many=True)
+
+    def fetchall(self) -> List[Any]:
+        return self.fetch(super().fetchall, many=True)
+
+    def __next__(self) -> Any:
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors, including the ones of its `execute` shortcuts, are timed."""
+
+    def __init__(self, *args: Any, profiler: Profiler, **kwargs: Any):
+        self.profiler = profiler
+        super().__init__(*args, **kwargs)
+
+    def cursor(self, factory: Any = ProfiledCursor) -> Any:
+        cursor = super().cursor(factory)
+        cursor.profiler = self.profiler
+        return cursor
+
+    def execute(self, sql: str, parameters: Any = ()) -> ProfiledCursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, parameters: Iterable[Any]) -> ProfiledCursor:
+        return self.cursor().executemany(sql, parameters)
+
+    def executescript(self, sql: str) -> ProfiledCursor:  # type: ignore[override]
+        return self.cursor().executescript(sql)
+
+
+class ProfiledTasksTrackerData(TasksTrackerData):
+    """`TasksTrackerData` reporting its work to the profiler."""
+
+    connection: ProfiledConnection
+
+    def __init__(
+        self,
+        profiler: Profiler,
+        db_path: Optional[str] = None,
+        settings: Optional[ConnectionSettings] = None,
+    ):
+        with profiler.phase("prepare_data"):
+            super().__init__(
+                db_path,
+                settings,
+                connect=partial(
+                    open_connection, factory=partial(ProfiledConnection, profiler=profiler)
+                ),
+            )
@@ -0,0 +1,208 @@
+"""Renderers of the task list, one per `list --format`.
+
+The table is drawn by rich. The other formats write every page of tasks to the output stream
+with a single write, without rich, so that they stay fast on large lists and in pipes.
+"""
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import IO, Any, Dict, List, Optional, Type
+
+from typer import echo
+
+from tasks_tracker.configs import NO_TASK_FOUND
+from tasks_tracker.model import Task
+from tasks_tracker.transfer import TASK_FIELDS
+from tasks_tracker.typing import ListFormat
+from tasks_tracker.utils import (
+    PLAIN_DUE_STATE_WARNINGS,
+    TABLE_DUE_STATE_WARNINGS,
+    EndDateCells,
+    enum_value_to_str,
+    get_console,
+    print_date,
+    print_next_page_hint,
+    print_tasks_list_table,
+)
+
+NEXT_PAGE_HINT = "More tasks available, show them with: --after {}"
+
+# Backslash first, so that the escapes added for the other characters are not escaped again
+TSV_ESCAPES = (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r"))
+
+PLAIN_HEADER = (
+    f"{'ID':<10}  {'TITLE':<30}  {'STATUS':<11}  {'PRIORITY':<8}  {'START DATE':<10}  "
+    f"{'END DATE':<25}  DESCRIPTION\n"
+)
+
+
+class RecordingStream:
+    """Writes through to a stream and records the text, until it is more than `max_size`."""
+
+    def __init__(self, stream: IO[str], max_size: int):
+        self.stream = stream
+        self.max_size = max_size
+        self.size = 0
+        self.parts: Optional[List[str]] = []
+
+    def write(self, text: str) -> int:
+        if self.parts is not None:
+            self.size += len(text)
+            if self.size > self.max_size:
+                self.parts = None
+            else:
+                self.parts.append(text)
+        return self.stream.write(text)
+
+    def recorded(self) -> Optional[str]:
+        """The text written so far, None when it got too large."""
+        return None if self.parts is None else "".join(self.parts)
+
+    def __getattr__(self, name: str) -> Any:
+        # isatty, flush and the like are the ones of the stream
+        return getattr(self.stream, name)
+
+
+class TasksRenderer(ABC):
+    """Writes the pages of the list as they are fetched, then the end of the list."""
+
+    def __init__(self, stream: Optional[IO[str]] = None):
+        # Looked up when the command runs, so that a replaced sys.stdout (tests, server) is used
+        self.stream = stream or sys.stdout
+        self.tasks_count = 0
+
+    @abstractmethod
+    def write_page(self, tasks: List[Task]) -> None:
+        """Write a page of tasks and add them to `tasks_count`."""
+
+    def record(self, max_size: int) -> None:
+        """Record the output of the pages written from now on, see `recorded_output`."""
+        self.stream = RecordingStream(self.stream, max_size)
+
+    def recorded_output(self) -> Optional[str]:
+        return self.stream.recorded() if isinstance(self.stream, RecordingStream) else None
+
+    def replay(self, output: str, tasks_count: int) -> None:
+        """Write the recorded output of pages instead of writing the pages again."""
+        self.stream.write(output)
+        self.tasks_count = tasks_count
+
+    def finish(self, next_cursor: Optional[str] = None) -> None:
+        """End the list, with the cursor of the next page when the list was stopped early."""
+        if next_cursor:
+            # Machine readable output stays parseable, the hint goes to stderr
+            echo(NEXT_PAGE_HINT.format(next_cursor), err=True)
+
+
+class TableRenderer(TasksRenderer):
+    def __init__(self, stream: Optional[IO[str]] = None):
+        super().__init__(stream)
+        self.end_dates = EndDateCells(TABLE_DUE_STATE_WARNINGS)
+
+    def record(self, max_size: int) -> None:
+        # The table is written by the console to its own output
+        self.stream = RecordingStream(get_console().file, max_size)
+
+    def write_page(self, tasks: List[Task]) -> None:
+        if tasks or self.tasks_count == 0:
+            if isinstance(self.stream, RecordingStream):
+                with get_console().capture() as capture:
+                    print_tasks_list_table(tasks, self.tasks_count == 0, self.end_dates)
+                self.stream.write(capture.get())
+            else:
+                print_tasks_list_table(tasks, self.tasks_count == 0, self.end_dates)
+        self.tasks_count += len(tasks)
+
+    def replay(self, output: str, tasks_count: int) -> None:
+        get_console().file.write(output)
+        self.tasks_count = tasks_count
+
+    def finish(self, next_cursor: Optional[str] = None) -> None:
+        if next_cursor:
+            print_next_page_hint(next_cursor)
+
+
+class PlainRenderer(TasksRenderer):
+    """Aligned columns with the texts of the table, without colors or borders."""
+
+    def __init__(self, stream: Optional[IO[str]] = None):
+        super().__init__(stream)
+        self.end_dates = EndDateCells(PLAIN_DUE_STATE_WARNINGS)
+
+    def write_page(self, tasks: List[Task]) -> None:
+        if not tasks:
+            return
+        lines = [PLAIN_HEADER] if self.tasks_count == 0 else []
+        end_dates = self.end_dates
+        for task in tasks:
+            lines.append(
+                f"{task.id:<10}  {task.title.capitalize() if task.title else '-':<30}  "
+                f"{enum_value_to_str(task.status):<11}  {enum_value_to_str(task.priority):<8}  "
+                f"{print_date(task.start_date):<10}  "
+                f"{end_dates.get(task.end_date, task.due_state):<25}  "
+                f"{task.description.capitalize() if task.description else 'Not provided'}\n"
+            )
+        self.stream.write("".join(lines))
+        self.tasks_count += len(tasks)
+
+    def finish(self, next_cursor: Optional[str] = None) -> None:
+        if self.tasks_count == 0:
+            self.stream.write(NO_TASK_FOUND + "\n")
+        if next_cursor:
+            self.stream.write(NEXT_PAGE_HINT.format(next_cursor) + "\n")
+
+
+def escape_tsv_value(value: Optional[str]) -> str:
+    if value is None:
+        return ""
+    for character, escape in TSV_ESCAPES:
+        if character in value:
+            value = value.replace(character, escape)
+    return value
+
+
+class TsvRenderer(TasksRenderer):
+    """The stored values, a header line then one line per task."""
+
+    def __init__(self, stream: Optional[IO[str]] = None):
+        super().__init__(stream)
+        self.lines = ["\t".join(TASK_FIELDS) + "\n"]
+
+    def write_page(self, tasks: List[Task]) -> None:
+        # The header is written with the first page, even an empty one
+        lines, self.lines = self.lines, []
+        for task in tasks:
+            lines.append("\t".join(map(escape_tsv_value, task[: len(TASK_FIELDS)])) + "\n")
+        self.stream.write("".join(lines))
+        self.tasks_count += len(tasks)
+
+
+class JsonRenderer(TasksRenderer):
+    """One JSON array of objects with the stored values and the due state."""
+
+    fields = (*TASK_FIELDS, "due_state")
+
+    def __init__(self, stream: Optional[IO[str]] = None):
+        super().__init__(stream)
+        self.encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def write_page(self, tasks: List[Task]) -> None:
+        if not tasks:
+            return
+        separator = "[\n" if self.tasks_count == 0 else ",\n"
+        self.stream.write(
+            separator + ",\n".join(self.encode(dict(zip(self.fields, task))) for task in tasks)
+        )
+        self.tasks_count += len(tasks)
+
+    def finish(self, next_cursor: Optional[str] = None) -> None:
+        self.stream.write("\n]\n" if self.tasks_count else "[]\n")
+        super().finish(next_cursor)
+
+
+RENDERERS: Dict[ListFormat, Type[TasksRenderer]] = {
+    ListFormat.TABLE: TableRenderer,
+    ListFormat.PLAIN: PlainRenderer,
+    ListFormat.TSV: TsvRenderer,
+    ListFormat.JSON: JsonRenderer,
+}
@@ -0,0 +1,98 @@
+"""Server of `tasks-tracker serve`: runs the commands forwarded by `client.forward_command`.
+
+Commands run one at a time in the serving thread, with the modules already imported and the
+database connection of `cli.get_app_data` kept open between commands.
+"""
+import json
+import os
+import socket
+import socketserver
+import traceback
+from typing import Any, Dict, Optional
+
+from click.testing import CliRunner
+from rich.console import Console
+from typer.main import get_command
+
+from tasks_tracker import cli, utils
+from tasks_tracker.configs import __app_name__
+
+runner = CliRunner(mix_stderr=False)
+_command = None
+
+
+def run_command(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a forwarded command and capture its output like a terminal of the client would get."""
+    global _command
+    if _command is None:
+        _command = get_command(cli.cli_controller)
+
+    env = {"COLUMNS": str(request["width"])} if request.get("width") else {}
+    console = utils._console
+    # Rich prints to the captured output, styled for the terminal of the client
+    utils._console = Console(force_terminal=request.get("tty", False), width=request.get("width"))
+    try:
+        result = runner.invoke(
+            _command,
+            request["args"],
+            input=request.get("input"),
+            env=env,
+            color=request.get("tty", False),
+            prog_name=__app_name__,
+        )
+    finally:
+        utils._console = console
+
+    stderr = result.stderr
+    if result.exception and not isinstance(result.exception, SystemExit):
+        stderr += "".join(traceback.format_exception(*result.exc_info))
+    return {"stdout": result.stdout, "stderr": stderr, "exit_code": result.exit_code}
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        request_line = self.rfile.readline()
+        # An empty request is `is_server_running` checking that the socket is in use
+        if request_line:
+            response = run_command(json.loads(request_line))
+            self.wfile.write(json.dumps(response).encode("utf-8"))
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    def server_bind(self) -> None:
+        # Only the user running the server may send it commands
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+
+def is_server_running(socket_path: str) -> bool:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        connection.close()
+
+
+def create_server(socket_path: str) -> Optional[CommandServer]:
+    """Listen on the socket, None when another server already listens on it."""
+    # The folder of the default socket, when there is no XDG_RUNTIME_DIR
+    directory = os.path.dirname(socket_path)
+    if directory:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.path.exists(socket_path):
+        if is_server_running(socket_path):
+            return None
+        os.unlink(socket_path)
+    return CommandServer(socket_path, CommandHandler)
+
+
+def close_server(server: CommandServer) -> None:
+    server.server_close()
+    if os.path.exists(server.server_address):
+        os.unlink(server.server_address)
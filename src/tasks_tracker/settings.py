@@ -0,0 +1,155 @@
+"""Settings of the app, from the config file and the environment variables.
+
+The config file is an INI file, `tasks-tracker/config.ini` in the user config folder
+(XDG_CONFIG_HOME, ~/.config by default) or the file named by TASKS_TRACKER_CONFIG:
+
+    [database]
+    path = ~/tasks/tasks-tracker.db
+    storage_profile = fast
+
+Every setting also has an environment variable, which wins over the config file, and the
+global `--db` option wins over both. The entry point reads the settings of the `serve` client
+before anything else is imported, so configparser is only imported when a config file exists.
+"""
+import os
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, TypeVar
+
+from tasks_tracker.configs import (
+    DB_PATH,
+    INVALID_CONFIG_FILE_ERROR,
+    INVALID_SETTING_ERROR,
+    LIST_CACHE_ENV,
+    METRICS_FILE_ENV,
+    NO_DAEMON_ENV,
+    __app_name__,
+)
+
+CONFIG_FILE_ENV = "TASKS_TRACKER_CONFIG"
+CONFIG_FILE_NAME = "config.ini"
+# Values of the enabled flags, the ones of configparser
+ENABLED_VALUES = ("1", "yes", "true", "on")
+
+T = TypeVar("T")
+
+
+class InvalidSettingError(Exception):
+    """A setting of the config file or of the environment has a value that cannot be used."""
+
+
+class Setting(NamedTuple):
+    section: str
+    option: str
+    env: str
+
+
+SETTINGS = {
+    "db_path": Setting("database", "path", "TASKS_TRACKER_DB"),
+    "storage_profile": Setting("database", "storage_profile", "TASKS_TRACKER_STORAGE_PROFILE"),
+    "journal_mode": Setting("database", "journal_mode", "TASKS_TRACKER_JOURNAL_MODE"),
+    "synchronous": Setting("database", "synchronous", "TASKS_TRACKER_SYNCHRONOUS"),
+    "busy_timeout_ms": Setting("database", "busy_timeout_ms", "TASKS_TRACKER_BUSY_TIMEOUT_MS"),
+    "write_retries": Setting("database", "write_retries", "TASKS_TRACKER_WRITE_RETRIES"),
+    "retry_backoff_seconds": Setting("database", "retry_backoff", "TASKS_TRACKER_RETRY_BACKOFF"),
+    "archive_done_days": Setting(
+        "database", "archive_done_days", "TASKS_TRACKER_ARCHIVE_DONE_DAYS"
+    ),
+    "list_cache": Setting("list", "cache", LIST_CACHE_ENV),
+    "socket_path": Setting("serve", "socket", "TASKS_TRACKER_SOCKET"),
+    "no_daemon": Setting("serve", "no_daemon", NO_DAEMON_ENV),
+    "metrics_file": Setting("metrics", "file", METRICS_FILE_ENV),
+}
+
+
+def get_config_file_path() -> str:
+    if os.environ.get(CONFIG_FILE_ENV):
+        return os.environ[CONFIG_FILE_ENV]
+    config_dir = os.environ.get("XDG_CONFIG_HOME") or os.path.join("~", ".config")
+    return os.path.expanduser(os.path.join(config_dir, __app_name__, CONFIG_FILE_NAME))
+
+
+@lru_cache(maxsize=None)
+def read_config_file(path: str) -> Dict[Tuple[str, str], str]:
+    """Values of the config file by section and option, empty when there is no file."""
+    if not os.path.exists(path):
+        return {}
+    from configparser import ConfigParser
+    from configparser import Error as ConfigParserError
+
+    parser = ConfigParser(interpolation=None)
+    try:
+        with open(path, encoding="utf-8") as config_file:
+            parser.read_file(config_file)
+    except (ConfigParserError, OSError, UnicodeDecodeError) as error:
+        raise InvalidSettingError(INVALID_CONFIG_FILE_ERROR.format(path, error))
+    return {
+        (section, option): value
+        for section in parser.sections()
+        for option, value in parser.items(section)
+    }
+
+
+def load_config_file() -> Dict[Tuple[str, str], str]:
+    """Values of the config file, raises InvalidSettingError when it cannot be read."""
+    return read_config_file(get_config_file_path())
+
+
+def get_setting(name: str) -> Optional[str]:
+    """Value of the environment variable of the setting, else of the config file, else None."""
+    setting = SETTINGS[name]
+    value = os.environ.get(setting.env)
+    if value:
+        return value
+    return load_config_file().get((setting.section, setting.option))
+
+
+def parse_setting(name: str, parse: Callable[[str], T], expected: str) -> Optional[T]:
+    """Value of the setting parsed by `parse`, None when it is not set.
+
+    `parse` raises ValueError for a value it cannot use, which is reported with the variable and
+    the config file option of the setting and the `expected` values.
+    """
+    value = get_setting(name)
+    if not value:
+        return None
+    try:
+        return parse(value.strip())
+    except ValueError:
+        setting = SETTINGS[name]
+        raise InvalidSettingError(
+            INVALID_SETTING_ERROR.format(
+                value, setting.env, setting.option, setting.section, expected
+            )
+        )
+
+
+def is_enabled(name: str) -> bool:
+    value = get_setting(name)
+    return value is not None and value.strip().lower() in ENABLED_VALUES
+
+
+def get_db_path(default: str = DB_PATH) -> str:
+    path = get_setting("db_path")
+    return os.path.expanduser(path) if path else default
+
+
+def get_socket_path(db_path: Optional[str] = None) -> str:
+    """Unix socket of the `serve` command, one per database file unless it is set.
+
+    Sockets are kept in XDG_RUNTIME_DIR, which only its user can use, else in a folder of the
+    user in the temporary folder, created by the server with the same permissions.
+    """
+    socket_path = get_setting("socket_path")
+    if socket_path:
+        return os.path.expanduser(socket_path)
+
+    name = f"{__app_name__}-{os.getuid() if hasattr(os, 'getuid') else 0}"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        os.environ.get("TMPDIR") or "/tmp", name
+    )
+    db_path = db_path or get_setting("db_path")
+    if db_path:
+        from zlib import crc32
+
+        name += f"-{crc32(os.path.abspath(os.path.expanduser(db_path)).encode()):08x}"
+    return os.path.join(runtime_dir, f"{name}.sock")
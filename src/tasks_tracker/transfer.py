@@ -0,0 +1,330 @@
+import csv
+import json
+import struct
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from typer import BadParameter
+
+from tasks_tracker.configs import DB_DATE_FORMAT, DISPLAYING_DATE_FORMAT
+from tasks_tracker.model import TaskChange, TaskRow, generate_task_id
+from tasks_tracker.typing import Priority, Status, TransferFormat
+from tasks_tracker.utils import format_db_date_str, input_data_validation
+
+if TYPE_CHECKING:
+    from tasks_tracker.database import TasksTrackerData
+
+TASK_FIELDS = ("id", "title", "status", "priority", "description", "start_date", "end_date")
+
+FILE_EXTENSION_FORMATS = {
+    ".csv": TransferFormat.CSV,
+    ".jsonl": TransferFormat.JSONL,
+    ".ndjson": TransferFormat.NDJSON,
+    ".ttb": TransferFormat.BINARY,
+}
+
+# The binary format starts with a magic header, then every task is written as its 7 fields, each
+# one as a 2 bytes length followed by the UTF-8 text. NULL_LENGTH marks a missing value.
+BINARY_HEADER = b"TTB1"
+NULL_LENGTH = 0xFFFF
+FIELD_LENGTH = struct.Struct("<H")
+
+# A CSV or binary record is already split into fields, a JSON line is decoded when it is
+# validated so that a malformed line is reported like any other invalid row.
+Record = Union[Dict[str, Any], str]
+
+
+class RowError(NamedTuple):
+    row_number: int
+    message: str
+
+
+class ImportSummary(NamedTuple):
+    rows_read: int
+    rows_imported: int
+    rows_rejected: int
+    rows_duplicated: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+
+def detect_format(file_path: str) -> Optional[TransferFormat]:
+    for extension, file_format in FILE_EXTENSION_FORMATS.items():
+        if file_path.lower().endswith(extension):
+            return file_format
+    return None
+
+
+@contextmanager
+def open_transfer_file(file_path: str, file_format: TransferFormat, mode: str) -> Iterator[IO]:
+    """Open a file to read ("r") or write ("w") in the given format, - is stdin or stdout."""
+    binary = file_format == TransferFormat.BINARY
+    if file_path == "-":
+        stream = sys.stdin if mode == "r" else sys.stdout
+        yield stream.buffer if binary else stream
+    elif binary:
+        with open(file_path, f"{mode}b") as stream:
+            yield stream
+    else:
+        with open(file_path, mode, encoding="utf-8", newline="") as stream:
+            yield stream
+
+
+def read_binary_records(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    if stream.read(len(BINARY_HEADER)) != BINARY_HEADER:
+        raise ValueError("Not a tasks tracker binary file.")
+
+    while True:
+        record: Dict[str, Any] = {}
+        for field in TASK_FIELDS:
+            length_bytes = stream.read(FIELD_LENGTH.size)
+            if not length_bytes and not record:
+                return
+            if len(length_bytes) < FIELD_LENGTH.size:
+                raise ValueError("Truncated tasks tracker binary file.")
+            (length,) = FIELD_LENGTH.unpack(length_bytes)
+            record[field] = None if length == NULL_LENGTH else stream.read(length).decode("utf-8")
+        yield record
+
+
+def read_records(stream: IO, file_format: TransferFormat) -> Iterator[Tuple[int, Record]]:
+    """Yield every record of the input with its row number, starting from 1."""
+    if file_format == TransferFormat.CSV:
+        yield from enumerate(csv.DictReader(stream), start=1)
+    elif file_format == TransferFormat.BINARY:
+        yield from enumerate(read_binary_records(stream), start=1)
+    else:
+        row_number = 0
+        for line in stream:
+            if line.strip():
+                row_number += 1
+                yield row_number, line
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        if len(value) == 10 and value[4] == "-":
+            # Dates exported from this app are in the database format, which has a fast parser
+            return datetime.fromisoformat(value)
+        return datetime.strptime(value, DISPLAYING_DATE_FORMAT)
+    except ValueError:
+        raise BadParameter(f"Invalid date '{value}', use the format dd/mm/yyyy or yyyy-mm-dd.")
+
+
+def parse_enum_value(enum_type: Any, value: Optional[str], default: Any) -> str:
+    if not value:
+        return default.value
+    try:
+        return enum_type(value.strip().lower()).value
+    except ValueError:
+        choices = ", ".join(item.value for item in enum_type)
+        raise BadParameter(f"Invalid {enum_type.__name__.lower()} '{value}', use one of {choices}.")
+
+
+def record_to_task_row(record: Record, today: str, allow_past_dates: bool = False) -> TaskRow:
+    """Validate a record with the same rules as the `add` command and turn it into a task row."""
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except ValueError as error:
+            raise BadParameter(f"Invalid JSON: {error}.")
+        if not isinstance(record, dict):
+            raise BadParameter("Invalid JSON: a line must be an object.")
+
+    fields: Dict[str, Optional[str]] = {}
+    for field in TASK_FIELDS:
+        value = record.get(field)
+        fields[field] = (str(value).strip() if value is not None else "") or None
+
+    if not fields["title"]:
+        raise BadParameter("Title is required.")
+
+    start_date = parse_date(fields["start_date"])
+    end_date = parse_date(fields["end_date"])
+    input_data_validation(
+        id=fields["id"],
+        title=fields["title"],
+        description=fields["description"],
+        start_date=start_date,
+        end_date=end_date,
+        allow_past_dates=allow_past_dates,
+    )
+
+    return (
+        fields["id"] or generate_task_id(),
+        fields["title"],
+        parse_enum_value(Status, fields["status"], Status.NOT_STARTED),
+        parse_enum_value(Priority, fields["priority"], Priority.LOW),
+        fields["description"],
+        format_db_date_str(start_date) or today,
+        format_db_date_str(end_date),
+    )
+
+
+def validate_records(
+    records: Iterable[Tuple[int, Record]], allow_past_dates: bool = False
+) -> Iterator[Tuple[int, Union[TaskRow, RowError]]]:
+    today = datetime.now().strftime(DB_DATE_FORMAT)
+    for row_number, record in records:
+        try:
+            yield row_number, record_to_task_row(record, today, allow_past_dates)
+        except BadParameter as error:
+            yield row_number, RowError(row_number, error.message)
+
+
+def batch_task_rows(
+    rows: Iterable[Tuple[int, Union[TaskRow, RowError]]], batch_size: int
+) -> Iterator[Tuple[int, List[TaskRow], List[RowError]]]:
+    """Group valid rows in batches, with the number of the last input row of each batch."""
+    batch: List[TaskRow] = []
+    errors: List[RowError] = []
+    row_number = 0
+
+    for row_number, row in rows:
+        if isinstance(row, RowError):
+            errors.append(row)
+        else:
+            batch.append(row)
+        if len(batch) >= batch_size:
+            yield row_number, batch, errors
+            batch, errors = [], []
+
+    if batch or errors:
+        yield row_number, batch, errors
+
+
+def import_tasks_from_stream(
+    app_data: "TasksTrackerData",
+    stream: IO,
+    file_format: TransferFormat,
+    batch_size: int,
+    checkpoint: Optional[str] = None,
+    allow_past_dates: bool = False,
+    on_row_error: Optional[Callable[[RowError], None]] = None,
+) -> Optional[ImportSummary]:
+    """Stream the input into the database, one transaction per batch.
+
+    With a checkpoint name, the rows already imported by a previous run are skipped and the
+    checkpoint is marked as completed once the whole input is imported. Returns None when a
+    batch fails.
+    """
+    started_at = time.perf_counter()
+    rows_done = app_data.get_import_checkpoint(checkpoint) if checkpoint else 0
+    rows_read = rows_imported = rows_rejected = rows_duplicated = 0
+
+    records = islice(read_records(stream, file_format), rows_done, None)
+    batches = batch_task_rows(validate_records(records, allow_past_dates), batch_size)
+
+    for last_row_number, batch, errors in batches:
+        inserted_rows = app_data.add_tasks_batch(batch, checkpoint, last_row_number)
+        if inserted_rows is None:
+            return None
+
+        for error in errors:
+            if on_row_error:
+                on_row_error(error)
+        rows_read = last_row_number - rows_done
+        rows_imported += inserted_rows
+        rows_rejected += len(errors)
+        rows_duplicated += len(batch) - inserted_rows
+
+    if checkpoint:
+        app_data.complete_import_checkpoint(checkpoint, rows_done + rows_read)
+
+    return ImportSummary(
+        rows_read=rows_read,
+        rows_imported=rows_imported,
+        rows_rejected=rows_rejected,
+        rows_duplicated=rows_duplicated,
+        seconds=time.perf_counter() - started_at,
+    )
+
+
+def write_csv(stream: IO[str], rows: Iterable[TaskRow]) -> int:
+    writer = csv.writer(stream)
+    writer.writerow(TASK_FIELDS)
+    rows_written = 0
+    for row in rows:
+        writer.writerow(row)
+        rows_written += 1
+    return rows_written
+
+
+def write_jsonl(stream: IO[str], rows: Iterable[TaskRow]) -> int:
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    rows_written = 0
+    for row in rows:
+        stream.write(encode(dict(zip(TASK_FIELDS, row))))
+        stream.write("\n")
+        rows_written += 1
+    return rows_written
+
+
+def write_changes(stream: IO[str], changes: Iterable[TaskChange]) -> Optional[int]:
+    """Write the changes as JSON lines and return the sequence number of the last one."""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    last_seq = None
+    for seq, operation, task_id, task in changes:
+        stream.write(
+            encode(
+                {
+                    "seq": seq,
+                    "operation": operation,
+                    "id": task_id,
+                    "task": dict(zip(TASK_FIELDS, task)) if task else None,
+                }
+            )
+        )
+        stream.write("\n")
+        last_seq = seq
+    return last_seq
+
+
+def write_binary(stream: IO[bytes], rows: Iterable[TaskRow]) -> int:
+    null_field = FIELD_LENGTH.pack(NULL_LENGTH)
+    stream.write(BINARY_HEADER)
+    rows_written = 0
+    for row in rows:
+        record = bytearray()
+        for value in row:
+            if value is None:
+                record += null_field
+            else:
+                encoded_value = value.encode("utf-8")
+                record += FIELD_LENGTH.pack(len(encoded_value))
+                record += encoded_value
+        stream.write(record)
+        rows_written += 1
+    return rows_written
+
+
+def export_tasks_to_stream(stream: IO, file_format: TransferFormat, rows: Iterable[TaskRow]) -> int:
+    """Write the rows as they come from the database and return how many were written."""
+    if file_format == TransferFormat.CSV:
+        return write_csv(stream, rows)
+    elif file_format == TransferFormat.BINARY:
+        return write_binary(stream, rows)
+    else:
+        return write_jsonl(stream, rows)
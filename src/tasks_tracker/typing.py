@@ -12,3 +12,30 @@ class Priority(Enum):
     HIGH = "high"
     MEDIUM = "medium"
     LOW = "low"
+
+
+class TransferFormat(Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+    NDJSON = "ndjson"
+    BINARY = "binary"
+
+
+class ListFormat(Enum):
+    TABLE = "table"
+    PLAIN = "plain"
+    TSV = "tsv"
+    JSON = "json"
+
+
+class DueState(Enum):
+    ON_TIME = "on_time"
+    EXPIRES_SOON = "expires_soon"
+    EXPIRED = "expired"
+
+
+class Operation(Enum):
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+    ARCHIVE = "archive"
@@ -1,23 +1,103 @@
-from datetime import datetime
-from typing import List, Optional
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
 
-from rich import box
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
 from typer import BadParameter
 
-from tasks_tracker.configs import DB_DATE_FORMAT, DISPLAYING_DATE_FORMAT, NO_TASK_FOUND
-from tasks_tracker.model import Task
-from tasks_tracker.typing import Priority, Status
+from tasks_tracker.configs import (
+    DATE_CACHE_SIZE,
+    DB_DATE_FORMAT,
+    DISPLAYING_DATE_FORMAT,
+    DUE_SOON_DAYS,
+    NO_TASK_FOUND,
+)
+from tasks_tracker.model import PageKey, Task, TasksStats
+from tasks_tracker.typing import DueState, Priority, Status
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
 
+_console: Optional["Console"] = None
 
-def enum_value_to_str(enum_value: Optional[str]) -> str:
+
+def get_console() -> "Console":
+    # Rich is only imported when something is printed, which keeps --help and argument errors fast.
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+@contextmanager
+def console_to_stderr() -> Iterator[None]:
+    """Print panels and errors to stderr in the block, when stdout is machine-readable output."""
+    global _console
+    from rich.console import Console
+
+    console = _console
+    _console = Console(stderr=True)
+    try:
+        yield
+    finally:
+        _console = console
+
+
+def is_terminal_output() -> bool:
+    # A console set up before the command, such as the one of a forwarded command on the server,
+    # knows whether the output ends up in a terminal. Otherwise stdout is checked without rich.
+    if _console is not None:
+        return _console.is_terminal
+    return sys.stdout.isatty()
+
+
+def format_enum_value(enum_value: Optional[str]) -> str:
     return enum_value.replace("_", " ").strip().upper() if enum_value else "-"
 
 
+# There are only a few statuses and priorities, so their texts are computed once
+ENUM_VALUE_TEXTS = {
+    enum_value.value: format_enum_value(enum_value.value) for enum_value in (*Status, *Priority)
+}
+STATUS_STYLES = {
+    Status.DONE.value: "[bold spring_green2]{}[/bold spring_green2]",
+    Status.ON_HOLD.value: "[bold orange_red1]{}[/bold orange_red1]",
+    Status.IN_PROGRESS.value: "[bold turquoise2]{}[/bold turquoise2]",
+}
+PRIORITY_STYLES = {
+    Priority.HIGH.value: "[bold orange_red1]{}[/bold orange_red1]",
+    Priority.MEDIUM.value: "[bold bright_cyan]{}[/bold bright_cyan]",
+}
+STYLED_STATUSES = {
+    status.value: STATUS_STYLES.get(status.value, "{}").format(ENUM_VALUE_TEXTS[status.value])
+    for status in Status
+}
+STYLED_PRIORITIES = {
+    priority.value: PRIORITY_STYLES.get(priority.value, "[bold]{}[/bold]").format(
+        ENUM_VALUE_TEXTS[priority.value]
+    )
+    for priority in Priority
+}
+
+# End dates with the warning of their due state, in the table and in plain text
+TABLE_DUE_STATE_WARNINGS = {
+    DueState.EXPIRES_SOON.value: "[orange1]{}[/orange1] \n[orange1 bold]Expired soon[/orange1 bold]",
+    DueState.EXPIRED.value: "[bright_red]{}[/bright_red] \n[bright_red bold]Expired[/bright_red bold]",
+}
+PLAIN_DUE_STATE_WARNINGS = {
+    DueState.EXPIRES_SOON.value: "{} (Expired soon)",
+    DueState.EXPIRED.value: "{} (Expired)",
+}
+
+
+def enum_value_to_str(enum_value: Optional[str]) -> str:
+    text = ENUM_VALUE_TEXTS.get(enum_value) if enum_value else None
+    return text if text is not None else format_enum_value(enum_value)
+
+
 def task_id_validation(id: Optional[str] = None) -> None:
     if id and len(id) != 10:
         raise BadParameter("ID must have a length of 10 alphabet mixed with number characters.")
@@ -39,12 +119,24 @@ def task_description_validation(description: Optional[str] = None) -> None:
         pass
 
 
+def bulk_target_validation(ids: Optional[List[str]], *filters: object) -> None:
+    if not ids and not any(filters):
+        raise BadParameter("Provide the IDs of the tasks or at least one filter.")
+
+
+def task_changes_validation(changes: Dict[str, str]) -> None:
+    if not changes:
+        raise BadParameter("Provide at least one field to update.")
+
+
 def date_validation(
-    start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    allow_past_dates: Optional[bool] = False,
 ) -> None:
-    if start_date and start_date < datetime.now():
+    if not allow_past_dates and start_date and start_date < datetime.now():
         raise BadParameter("Start date cannot be a past date.")
-    elif end_date and end_date < datetime.now():
+    elif not allow_past_dates and end_date and end_date < datetime.now():
         raise BadParameter("End date cannot be a past date.")
     elif end_date and start_date and end_date < start_date:
         raise BadParameter("End date must be after start date.")
@@ -52,6 +144,25 @@ def date_validation(
         pass
 
 
+def encode_page_cursor(task: Task) -> str:
+    return f"{task.start_date}:{task.id}"
+
+
+def decode_page_cursor(cursor: Optional[str]) -> Optional[PageKey]:
+    if not cursor:
+        return None
+    start_date, _, id = cursor.partition(":")
+    try:
+        datetime.strptime(start_date, DB_DATE_FORMAT)
+        task_id_validation(id or None)
+    except ValueError:
+        raise BadParameter("Cursor must be the value shown after the previous page.")
+    if not id:
+        raise BadParameter("Cursor must be the value shown after the previous page.")
+    return start_date, id
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def db_to_displaying_date(date_str: str) -> str:
     return datetime.strptime(date_str, DB_DATE_FORMAT).strftime(DISPLAYING_DATE_FORMAT)
 
@@ -66,11 +177,12 @@ def input_data_validation(
     description: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    allow_past_dates: Optional[bool] = False,
 ) -> None:
     task_id_validation(id)
     task_title_validation(title)
     task_description_validation(description)
-    date_validation(start_date, end_date)
+    date_validation(start_date, end_date, allow_past_dates)
 
 
 def print_text_with_panel(
@@ -78,6 +190,9 @@ def print_text_with_panel(
     content: Optional[str] = None,
     border_style: Optional[str] = "bright_green",
 ) -> None:
+    from rich.panel import Panel
+
+    console = get_console()
     console.print()
     console.print(
         Panel(
@@ -92,7 +207,7 @@ def print_text_with_panel(
 
 def print_error(error_message: str, with_trace: Optional[bool] = False) -> None:
     if with_trace:
-        console.print_exception()
+        get_console().print_exception()
     print_text_with_panel(title="Error", content=error_message, border_style="bright_red")
 
 
@@ -113,42 +228,60 @@ def format_db_date_str(date: Optional[datetime]) -> Optional[str]:
 
 
 def styling_status(status: Optional[str]) -> str:
-    if status == Status.DONE.value:
-        return f"[bold spring_green2]{enum_value_to_str(status)}[/bold spring_green2]"
-    elif status == Status.ON_HOLD.value:
-        return f"[bold orange_red1]{enum_value_to_str(status)}[/bold orange_red1]"
-    elif status == Status.IN_PROGRESS.value:
-        return f"[bold turquoise2]{enum_value_to_str(status)}[/bold turquoise2]"
-    else:
-        return enum_value_to_str(status)
+    styled_status = STYLED_STATUSES.get(status) if status else None
+    return styled_status if styled_status is not None else enum_value_to_str(status)
 
 
 def styling_priority(priority: Optional[str]) -> str:
-    if priority == Priority.HIGH.value:
-        return f"[bold orange_red1]{enum_value_to_str(priority)}[/bold orange_red1]"
-    elif priority == Priority.MEDIUM.value:
-        return f"[bold bright_cyan]{enum_value_to_str(priority)}[/bold bright_cyan]"
-    else:
-        return f"[bold]{enum_value_to_str(priority)}[/bold]"
-
-
-def print_end_date_with_warning(end_date: Optional[str]) -> Optional[str]:
-    display_end_date = print_date(end_date)
-
-    if end_date is None:
-        return display_end_date
-
-    days_left = (datetime.strptime(end_date, DB_DATE_FORMAT) - datetime.now()).days
-
-    if days_left == 0:
-        return f"[orange1]{display_end_date}[/orange1] \n[orange1 bold]Expired soon[/orange1 bold]"
-    elif days_left < 0:
-        return f"[bright_red]{display_end_date}[/bright_red] \n[bright_red bold]Expired[/bright_red bold]"
-    else:
-        return display_end_date
+    styled_priority = STYLED_PRIORITIES.get(priority) if priority else None
+    if styled_priority is not None:
+        return styled_priority
+    return PRIORITY_STYLES.get(priority, "[bold]{}[/bold]").format(enum_value_to_str(priority))
+
+
+class EndDateCells:
+    """End dates of one list, displayed with the warning of their due state.
+
+    The due states are computed against the day the list started, like the list query does: a
+    task expires at the start of its end date. Every end date is formatted once per list.
+    """
+
+    def __init__(self, warnings: Dict[str, str], today: Optional[date] = None):
+        today = today or date.today()
+        self.today = today.strftime(DB_DATE_FORMAT)
+        self.tomorrow = (today + timedelta(days=1)).strftime(DB_DATE_FORMAT)
+        self.warnings = warnings
+        self.cells: Dict[Tuple[str, Optional[str]], str] = {}
+
+    def due_state(self, end_date: str) -> str:
+        # Dates in the database format compare in the same order as their days
+        if end_date <= self.today:
+            return DueState.EXPIRED.value
+        elif end_date == self.tomorrow:
+            return DueState.EXPIRES_SOON.value
+        else:
+            return DueState.ON_TIME.value
+
+    def get(self, end_date: Optional[str], due_state: Optional[str] = None) -> str:
+        if end_date is None:
+            return print_date(end_date)
+        cell = self.cells.get((end_date, due_state))
+        if cell is None:
+            # Tasks listed from the database come with their due state, computed by the query
+            warning = self.warnings.get(due_state or self.due_state(end_date), "{}")
+            cell = self.cells[end_date, due_state] = warning.format(db_to_displaying_date(end_date))
+        return cell
+
+
+def get_due_state(end_date: str) -> str:
+    return EndDateCells({}).due_state(end_date)
 
 
 def print_task_detail(task: Task) -> None:
+    from rich import box
+    from rich.table import Table
+
+    console = get_console()
     console.print()
     table = Table(show_header=False, show_lines=True, box=box.ROUNDED)
     table.add_column(style="bold", min_width=10)
@@ -177,13 +310,22 @@ def print_task_detail(task: Task) -> None:
     console.print()
 
 
-def print_tasks_list_table(tasks: List[Task]) -> None:
+def print_tasks_list_table(
+    tasks: List[Task],
+    with_title: Optional[bool] = True,
+    end_dates: Optional[EndDateCells] = None,
+) -> None:
+    from rich import box
+    from rich.table import Table
+
+    console = get_console()
     console.print()
     if len(tasks) == 0:
         print_success_message(NO_TASK_FOUND)
     else:
-        console.print("[bold turquoise2]TASKS LIST[/bold turquoise2]")
-        console.print()
+        if with_title:
+            console.print("[bold turquoise2]TASKS LIST[/bold turquoise2]")
+            console.print()
         table = Table(show_header=True, show_lines=True, box=box.ROUNDED)
         table.add_column("[bold magenta2]Id[/bold magenta2]", width=10)
         table.add_column("[bold magenta2]Title[/bold magenta2]", min_width=10, max_width=30)
@@ -198,6 +340,7 @@ def print_tasks_list_table(tasks: List[Task]) -> None:
         table.add_column("[bold magenta2]Status[/bold magenta2]", width=12, no_wrap=False)
         table.add_column("[bold magenta2]Start date[/bold magenta2]", width=12)
         table.add_column("[bold magenta2]End date[/bold magenta2]", width=14, no_wrap=False)
+        end_dates = end_dates or EndDateCells(TABLE_DUE_STATE_WARNINGS)
         for task in tasks:
             table.add_row(
                 task.id,
@@ -206,7 +349,41 @@ def print_tasks_list_table(tasks: List[Task]) -> None:
                 styling_priority(task.priority),
                 styling_status(task.status),
                 print_date(task.start_date),
-                print_end_date_with_warning(task.end_date),
+                end_dates.get(task.end_date, task.due_state),
             )
         console.print(table)
         console.print()
+
+
+def print_tasks_stats(stats: TasksStats) -> None:
+    from rich.panel import Panel
+    from rich.table import Table
+
+    table = Table.grid(padding=(0, 2))
+    table.add_column(style="bold light_green", min_width=16)
+    table.add_column(justify="right")
+    table.add_row("Tasks", f"[bold magenta]{stats.total:,}[/bold magenta]")
+    table.add_row()
+    for status, tasks in stats.by_status.items():
+        table.add_row(styling_status(status), f"{tasks:,}")
+    table.add_row()
+    for priority, tasks in stats.by_priority.items():
+        table.add_row(styling_priority(priority), f"{tasks:,}")
+    table.add_row()
+    table.add_row("[bright_red]Overdue[/bright_red]", f"[bright_red]{stats.overdue:,}[/bright_red]")
+    table.add_row(
+        f"[orange1]Due in {DUE_SOON_DAYS} days[/orange1]",
+        f"[orange1]{stats.due_this_week:,}[/orange1]",
+    )
+
+    console = get_console()
+    console.print()
+    console.print(
+        Panel.fit(table, title="[bold turquoise2]TASKS STATS[/bold turquoise2]", title_align="left")
+    )
+    console.print()
+
+
+def print_next_page_hint(cursor: str) -> None:
+    get_console().print(f"More tasks available, show them with: [bold]--after {cursor}[/bold]")
+    get_console().print()
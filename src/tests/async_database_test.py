@@ -0,0 +1,104 @@
+import asyncio
+import time
+from contextlib import aclosing
+
+import pytest
+
+from tasks_tracker.async_database import AsyncTasksTrackerData
+from tasks_tracker.database import TasksTrackerData
+from tasks_tracker.model import Task
+from tasks_tracker.typing import Status
+
+LARGE_LIST_ROWS = 50_000
+
+
+def task_rows(count: int):
+    return [
+        (
+            f"{index:010d}",
+            f"task {index}",
+            "done" if index % 2 else "on_hold",
+            "low",
+            None,
+            f"2022-{index % 12 + 1:02d}-01",
+            None,
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def large_db_path(db_path):
+    tasks_data = TasksTrackerData(db_path)
+    tasks_data.add_tasks_batch(task_rows(LARGE_LIST_ROWS))
+    tasks_data.close()
+    return db_path
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Largest delay of a timer of the event loop until `stop` is set."""
+    largest_lag = 0.0
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(interval)
+        largest_lag = max(largest_lag, time.perf_counter() - started_at - interval)
+    return largest_lag
+
+
+def test_async_operations(db_path):
+    async def scenario():
+        async with await AsyncTasksTrackerData.open(db_path) as tasks_data:
+            task = Task("1111111111", "a", "done", "low", None, "2022-01-01", None)
+            assert await tasks_data.add_new_task(task)
+            assert await tasks_data.update_task(task._replace(title="b"))
+            assert (await tasks_data.find_task_by_id("1111111111")).title == "b"
+            assert [task.id for task in await tasks_data.get_tasks_list()] == ["1111111111"]
+            assert await tasks_data.delete_task("1111111111")
+            assert await tasks_data.find_task_by_id("1111111111") is None
+            assert await tasks_data.add_new_task(task)
+            assert await tasks_data.delete_all_tasks()
+            assert await tasks_data.get_tasks_list() == []
+
+    asyncio.run(scenario())
+
+
+def test_iter_tasks_streams_the_list_in_chunks(large_db_path):
+    async def scenario():
+        async with await AsyncTasksTrackerData.open(large_db_path) as tasks_data:
+            streamed = [task async for task in tasks_data.iter_tasks(Status.DONE, chunk_size=999)]
+            assert streamed == await tasks_data.get_tasks_list(Status.DONE)
+
+            async with aclosing(tasks_data.iter_tasks(chunk_size=10)) as tasks:
+                async for task in tasks:
+                    break
+            assert [task] == await tasks_data.get_tasks_list(limit=1)
+
+    asyncio.run(scenario())
+
+
+def test_large_lists_do_not_block_the_event_loop(large_db_path):
+    async def scenario():
+        async with await AsyncTasksTrackerData.open(large_db_path) as tasks_data:
+            stop = asyncio.Event()
+            lag = asyncio.create_task(measure_loop_lag(stop))
+
+            started_at = time.perf_counter()
+            lists = await asyncio.gather(
+                tasks_data.get_tasks_list(),
+                tasks_data.get_tasks_list(Status.DONE),
+                tasks_data.get_tasks_list(Status.ON_HOLD),
+            )
+            streamed_tasks = 0
+            async for _ in tasks_data.iter_tasks():
+                streamed_tasks += 1
+            queries_seconds = time.perf_counter() - started_at
+
+            stop.set()
+            return [len(tasks) for tasks in lists], streamed_tasks, queries_seconds, await lag
+
+    list_sizes, streamed_tasks, queries_seconds, largest_lag = asyncio.run(scenario())
+
+    assert list_sizes == [LARGE_LIST_ROWS, LARGE_LIST_ROWS // 2, LARGE_LIST_ROWS // 2]
+    assert streamed_tasks == LARGE_LIST_ROWS
+    # The timer keeps running while the queries take many times longer than the allowed lag
+    assert largest_lag < 0.1 < queries_seconds
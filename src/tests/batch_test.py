@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from tasks_tracker import cli
+from tasks_tracker.cli import cli_controller
+from tasks_tracker.configs import NO_TASK_FOUND_ERROR
+from tasks_tracker.model import Task
+
+runner = CliRunner(mix_stderr=False)
+
+script = """# nightly job
+add "first task" -p high -s in_progress
+add second -d "second description"
+
+update 1111111111 -t renamed -f
+delete 2222222222 -f
+list
+add "unterminated
+"""
+
+
+@pytest.fixture(autouse=True)
+def app_data(monkeypatch, tasks_data):
+    monkeypatch.setattr(cli, "_app_data", tasks_data)
+    tasks_data.add_new_task(
+        Task("2222222222", "to delete", "done", "low", None, "2022-01-01", None)
+    )
+    return tasks_data
+
+
+def run_script(content, *args):
+    result = runner.invoke(cli_controller, ["batch", "-", *args], input=content)
+    return result, [json.loads(line) for line in result.stdout.splitlines()]
+
+
+def test_batch_prints_one_result_per_command(app_data):
+    result, results = run_script(script)
+
+    assert result.exit_code == 1
+    assert [(line["line"], line["command"], line["ok"]) for line in results] == [
+        (2, "add", True),
+        (3, "add", True),
+        (5, "update", False),
+        (6, "delete", True),
+        (7, "list", False),
+        (8, "add", False),
+    ]
+    assert results[2]["error"] == NO_TASK_FOUND_ERROR
+    assert "Ran 6 commands" in result.stderr and "3 failed" in result.stderr
+
+    tasks = app_data.get_tasks_list()
+    assert sorted(task.title for task in tasks) == ["first task", "second"]
+    assert {task.id for task in tasks} == {results[0]["id"], results[1]["id"]}
+
+
+def test_batch_commits_in_groups(app_data):
+    commands = "".join(f"add 'task {index}'\n" for index in range(5))
+    result, results = run_script(commands, "--commit-size", "2")
+
+    assert result.exit_code == 0
+    assert len(results) == 5
+    assert len(app_data.get_tasks_list()) == 6
+
+
+def test_batch_rolls_back_a_failed_command_only(app_data):
+    app_data.patch_task = lambda id, changes: None
+
+    result, results = run_script("add kept\nupdate 2222222222 -t changed -f\n")
+
+    assert [line["ok"] for line in results] == [True, False]
+    assert sorted(task.title for task in app_data.get_tasks_list()) == ["kept", "to delete"]
+
+
+def test_transaction_rolls_back_savepoint_only(app_data):
+    with app_data.transaction():
+        app_data.add_new_task(Task("3333333333", "a", "done", "low", None, "2022-01-01", None))
+        with pytest.raises(RuntimeError):
+            with app_data.transaction():
+                app_data.delete_all_tasks()
+                raise RuntimeError()
+
+    assert sorted(task.id for task in app_data.get_tasks_list()) == ["2222222222", "3333333333"]
+
+
+def test_batch_runs_set_based_commands(app_data):
+    app_data.add_new_task(Task("3333333333", "old", "on_hold", "low", None, "2022-01-01", None))
+
+    result, results = run_script(
+        "update --where-status on_hold -s done -f\n"
+        "delete 2222222222 3333333333 -f\n"
+        "delete --status done -f\n"
+    )
+
+    assert result.exit_code == 0
+    assert [line["ok"] for line in results] == [True, True, True]
+    # Scripts can tell a bulk command that matched no task from one that did
+    assert [line["count"] for line in results] == [1, 2, 0]
+    assert app_data.get_tasks_list() == []
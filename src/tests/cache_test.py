@@ -0,0 +1,63 @@
+import os
+from unittest.mock import Mock
+
+from typer.testing import CliRunner
+
+from tasks_tracker import cli
+from tasks_tracker.cache import CacheEntry, ResultCache
+from tasks_tracker.cli import cli_controller
+from tasks_tracker.model import Task
+
+runner = CliRunner(mix_stderr=False)
+
+
+def test_repeated_list_is_served_from_cache_until_tasks_change(tasks_data, monkeypatch):
+    monkeypatch.setattr(cli, "_app_data", tasks_data)
+    tasks_data.add_new_task(
+        Task("1111111111", "first", "in_progress", None, None, "2022-02-02", None)
+    )
+    tasks_data.add_new_task(
+        Task("2222222222", "second", "in_progress", None, None, "2022-03-03", None)
+    )
+    get_tasks_list = Mock(wraps=tasks_data.get_tasks_list)
+    monkeypatch.setattr(tasks_data, "get_tasks_list", get_tasks_list)
+
+    for list_format in ("json", "table"):
+        args = ["list", "--cache", "--status", "in_progress", "--format", list_format, "-l", "1"]
+        first_result = runner.invoke(cli_controller, args)
+        calls = get_tasks_list.call_count
+        second_result = runner.invoke(cli_controller, args)
+
+        assert second_result.exit_code == 0
+        assert get_tasks_list.call_count == calls
+        assert second_result.stdout == first_result.stdout
+        assert second_result.stderr == first_result.stderr
+        assert "1111111111" in second_result.stdout and "--after 2022-02-02:1111111111" in (
+            second_result.stdout + second_result.stderr
+        )
+
+    # Other arguments are another entry
+    assert "2222222222" in runner.invoke(cli_controller, ["list", "--cache", "-F", "tsv"]).stdout
+
+    tasks_data.patch_task("1111111111", {"title": "changed"})
+    result = runner.invoke(
+        cli_controller, ["list", "--cache", "--status", "in_progress", "-F", "json"]
+    )
+    assert '"changed"' in result.stdout
+    assert len(os.listdir(f"{tasks_data.db_path}-cache")) == 4
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=300)
+    for key in ("first", "second", "third"):
+        cache.put(key, CacheEntry(1, None, key * 10))
+        os.utime(cache.entry_path(key), (0, len(os.listdir(tmp_path))))
+    assert cache.get("first") == CacheEntry(1, None, "first" * 10)
+
+    cache.put("fourth", CacheEntry(1, None, "fourth" * 10))
+
+    assert cache.get("second") is None
+    assert [cache.get(key) is not None for key in ("first", "third", "fourth")] == [True] * 3
+    # Too large for the cache
+    cache.put("large", CacheEntry(1, None, "x" * 300))
+    assert cache.get("large") is None
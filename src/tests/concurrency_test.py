@@ -0,0 +1,78 @@
+import multiprocessing
+import sqlite3
+import threading
+
+from tasks_tracker.configs import DATABASE_LOCKED_ERROR
+from tasks_tracker.connection import ConnectionSettings
+from tasks_tracker.database import TasksTrackerData
+from tasks_tracker.model import Task
+
+PROCESSES = 8
+TASKS_PER_PROCESS = 40
+
+
+def hold_write_lock(db_path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    connection.execute("BEGIN IMMEDIATE")
+    return connection
+
+
+def add_and_update_tasks(db_path: str, worker: int) -> int:
+    """Add tasks then mark them done, return how many writes failed."""
+    tasks_data = TasksTrackerData(db_path)
+    failed_writes = 0
+    for index in range(TASKS_PER_PROCESS):
+        task = Task(
+            f"{worker:04d}{index:06d}", "task", "not_started", "low", None, "2022-01-01", None
+        )
+        failed_writes += not tasks_data.add_new_task(task)
+        failed_writes += not tasks_data.update_task(task._replace(status="done"))
+    tasks_data.connection.close()
+    return failed_writes
+
+
+def test_database_uses_wal(tasks_data):
+    assert tasks_data.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # normal
+    assert tasks_data.connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+def test_write_fails_with_locked_error_after_retries(db_path, capsys):
+    settings = ConnectionSettings(busy_timeout_ms=10, write_retries=2, retry_backoff_seconds=0.01)
+    tasks_data = TasksTrackerData(db_path, settings)
+    lock = hold_write_lock(db_path)
+    capsys.readouterr()
+
+    added = tasks_data.add_new_task(
+        Task("1111111111", "a", "done", "low", None, "2022-01-01", None)
+    )
+
+    lock.execute("ROLLBACK")
+    assert not added
+    assert DATABASE_LOCKED_ERROR in capsys.readouterr().out
+    assert not tasks_data.connection.in_transaction
+    tasks_data.connection.close()
+
+
+def test_write_is_retried_until_the_lock_is_released(db_path):
+    settings = ConnectionSettings(busy_timeout_ms=10, write_retries=8, retry_backoff_seconds=0.01)
+    tasks_data = TasksTrackerData(db_path, settings)
+    lock = hold_write_lock(db_path)
+    threading.Timer(0.2, lambda: lock.execute("ROLLBACK")).start()
+
+    assert tasks_data.add_new_task(Task("1111111111", "a", "done", "low", None, "2022-01-01", None))
+    assert tasks_data.find_task_by_id("1111111111")
+    tasks_data.connection.close()
+
+
+def test_concurrent_writers_lose_no_writes(tasks_data, db_path):
+    with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+        failed_writes = pool.starmap(
+            add_and_update_tasks, [(db_path, worker) for worker in range(PROCESSES)]
+        )
+
+    statuses = tasks_data.connection.execute(
+        "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+    ).fetchall()
+    assert sum(failed_writes) == 0
+    assert statuses == [("done", PROCESSES * TASKS_PER_PROCESS)]
@@ -0,0 +1,28 @@
+import pytest
+
+from tasks_tracker.database import TasksTrackerData
+
+
+@pytest.fixture(autouse=True)
+def restore_tasks_tracker_data():
+    # CLI tests replace TasksTrackerData methods with mocks on the class itself, put them back
+    # so that tests running against a real database are not affected.
+    original_attributes = dict(vars(TasksTrackerData))
+    yield
+    for name, value in list(vars(TasksTrackerData).items()):
+        if name not in original_attributes:
+            delattr(TasksTrackerData, name)
+        elif value is not original_attributes[name]:
+            setattr(TasksTrackerData, name, original_attributes[name])
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "tasks-tracker.db")
+
+
+@pytest.fixture
+def tasks_data(db_path):
+    data = TasksTrackerData(db_path)
+    yield data
+    data.connection.close()
@@ -0,0 +1,519 @@
+from datetime import date, datetime, timedelta
+from sqlite3 import connect
+
+import pytest
+
+from tasks_tracker.connection import ConnectionSettings
+from tasks_tracker.database import (
+    SCHEMA_VERSION,
+    ChangesPrunedError,
+    TasksTrackerData,
+    get_schema_version,
+)
+from tasks_tracker.model import Task, TasksStats
+from tasks_tracker.typing import DueState, Priority, Status
+from tasks_tracker.utils import get_due_state
+
+legacy_task_data = (
+    ("a1b2c3d4e5", "title_1", "in_progress", "high", "task 1", "2022-02-02", None),
+    ("f6a7b8c9d0", "title_2", "done", "medium", "task 2", "2022-01-01", "2022-11-11"),
+)
+
+
+def create_legacy_database(db_path: str, rows=legacy_task_data) -> None:
+    connection = connect(db_path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE tasks( id text, title text, status text, priority text, description text, start_date text, end_date text)"
+        )
+        connection.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    connection.close()
+
+
+def query_plan(tasks_data: TasksTrackerData, query: str, parameters: tuple) -> str:
+    rows = tasks_data.connection.execute(f"EXPLAIN QUERY PLAN {query}", parameters).fetchall()
+    return " ".join(row[-1] for row in rows)
+
+
+def test_new_database_is_created_with_latest_schema(tasks_data):
+    assert get_schema_version(tasks_data.connection) == SCHEMA_VERSION
+
+
+def test_legacy_database_is_upgraded_in_place(db_path):
+    create_legacy_database(db_path)
+
+    tasks_data = TasksTrackerData(db_path)
+
+    assert get_schema_version(tasks_data.connection) == SCHEMA_VERSION
+    assert len(tasks_data.get_tasks_list()) == 2
+
+
+def test_legacy_rows_without_a_unique_id_get_a_new_one(db_path):
+    create_legacy_database(
+        db_path,
+        legacy_task_data
+        + (
+            ("a1b2c3d4e5", "duplicated", "done", "low", None, "2022-03-03", None),
+            (None, "without id", "done", "low", None, "2022-04-04", None),
+        ),
+    )
+
+    tasks_data = TasksTrackerData(db_path)
+
+    # The first row keeps a duplicated ID
+    assert tasks_data.find_task_by_id("a1b2c3d4e5").title == "title_1"
+    tasks = {task.title: task for task in tasks_data.get_tasks_list()}
+    assert set(tasks) == {"title_1", "title_2", "duplicated", "without id"}
+    new_ids = {tasks["duplicated"].id, tasks["without id"].id}
+    assert len(new_ids) == 2 and new_ids.isdisjoint({"a1b2c3d4e5", "f6a7b8c9d0"})
+    assert all(len(id) == 10 and set(id) <= set("0123456789abcdef") for id in new_ids)
+
+
+def test_opening_upgraded_database_again_keeps_data(db_path):
+    create_legacy_database(db_path)
+    TasksTrackerData(db_path).connection.close()
+
+    tasks_data = TasksTrackerData(db_path)
+
+    assert get_schema_version(tasks_data.connection) == SCHEMA_VERSION
+    assert len(tasks_data.get_tasks_list()) == 2
+
+
+def test_find_task_by_id_uses_primary_key(tasks_data):
+    plan = query_plan(tasks_data, "SELECT * from tasks WHERE id = ?", ("a1b2c3d4e5",))
+    assert "USING INDEX sqlite_autoindex_tasks_1" in plan
+
+
+def test_tasks_list_filters_use_composite_index(tasks_data):
+    plan = query_plan(
+        tasks_data,
+        "SELECT * from tasks WHERE status = ? AND priority = ? AND start_date >= ? ORDER BY start_date ASC",
+        ("done", "high", "2022-01-01"),
+    )
+    assert "USING INDEX idx_tasks_status_priority_start_date" in plan
+
+
+def test_tasks_list_filters(tasks_data):
+    tasks_data.add_new_task(Task("1111111111", "a", "done", "high", None, "2022-01-01", None))
+    tasks_data.add_new_task(
+        Task("2222222222", "b", "done", "low", None, "2022-02-01", "2022-03-01")
+    )
+    tasks_data.add_new_task(Task("3333333333", "c", "on_hold", "low", None, "2022-03-01", None))
+
+    assert [task.id for task in tasks_data.get_tasks_list(status=Status.DONE)] == [
+        "1111111111",
+        "2222222222",
+    ]
+    assert [task.id for task in tasks_data.get_tasks_list(priority=Priority.LOW)] == [
+        "2222222222",
+        "3333333333",
+    ]
+    assert [task.id for task in tasks_data.get_tasks_list(start_date=datetime(2022, 1, 15))] == [
+        "2222222222",
+        "3333333333",
+    ]
+    assert [task.id for task in tasks_data.get_tasks_list(end_date=datetime(2022, 2, 15))] == [
+        "1111111111",
+        "3333333333",
+    ]
+
+
+def test_tasks_list_pages_with_keyset(tasks_data):
+    tasks_data.add_tasks_batch(
+        [
+            ("3333333333", "c", "done", "low", None, "2022-01-01", None),
+            ("1111111111", "a", "done", "low", None, "2022-01-01", None),
+            ("2222222222", "b", "done", "low", None, "2022-01-02", None),
+            ("0000000000", "d", "on_hold", "low", None, "2022-01-03", None),
+        ]
+    )
+
+    first_page = tasks_data.get_tasks_list(limit=2)
+    last_task = first_page[-1]
+    second_page = tasks_data.get_tasks_list(after=(last_task.start_date, last_task.id), limit=2)
+    filtered_page = tasks_data.get_tasks_list(
+        status=Status.DONE, after=(last_task.start_date, last_task.id)
+    )
+
+    assert [task.id for task in first_page] == ["1111111111", "3333333333"]
+    assert [task.id for task in second_page] == ["2222222222", "0000000000"]
+    assert [task.id for task in filtered_page] == ["2222222222"]
+
+
+def test_tasks_list_pages_use_index_seek(tasks_data):
+    plan = query_plan(
+        tasks_data,
+        "SELECT * from tasks WHERE status = ? AND (start_date, id) > (?, ?) ORDER BY start_date ASC, id ASC LIMIT ?",
+        ("done", "2022-01-01", "1111111111", 10),
+    )
+    assert "USING INDEX idx_tasks_status_start_date (status=? AND (start_date,id)>(?,?))" in plan
+
+
+def test_dates_are_stored_as_days(tasks_data):
+    tasks_data.add_new_task(
+        Task("1111111111", "a", "done", "low", None, "1970-01-02", "2022-02-02")
+    )
+
+    stored_dates = tasks_data.connection.execute(
+        "SELECT start_date, end_date FROM tasks"
+    ).fetchone()
+    task = tasks_data.find_task_by_id("1111111111")
+
+    assert stored_dates == (1, 19025)
+    assert (task.start_date, task.end_date) == ("1970-01-02", "2022-02-02")
+
+
+def test_legacy_dates_are_converted_to_days(db_path):
+    create_legacy_database(db_path)
+
+    tasks_data = TasksTrackerData(db_path)
+
+    assert [(task.start_date, task.end_date) for task in tasks_data.get_tasks_list()] == [
+        ("2022-01-01", "2022-11-11"),
+        ("2022-02-02", None),
+    ]
+
+
+def test_tasks_list_computes_due_state(tasks_data):
+    today = date.today()
+    end_dates = {
+        "1111111111": today - timedelta(days=1),
+        "2222222222": today,
+        "3333333333": today + timedelta(days=1),
+        "4444444444": today + timedelta(days=2),
+    }
+    for id, end_date in end_dates.items():
+        tasks_data.add_new_task(
+            Task(id, "a", "done", "low", None, "2022-01-01", end_date.isoformat())
+        )
+    tasks_data.add_new_task(Task("5555555555", "a", "done", "low", None, "2022-01-01", None))
+
+    tasks = tasks_data.get_tasks_list()
+
+    assert [task.due_state for task in tasks] == [
+        DueState.EXPIRED.value,
+        DueState.EXPIRED.value,
+        DueState.EXPIRES_SOON.value,
+        DueState.ON_TIME.value,
+        None,
+    ]
+    # Same warnings as the ones computed for a single task
+    assert [task.due_state for task in tasks[:4]] == [
+        get_due_state(task.end_date) for task in tasks[:4]
+    ]
+
+
+def test_tasks_are_immutable_and_slotted(tasks_data):
+    tasks_data.add_new_task(Task("1111111111", "a", "done", "low", None, "2022-01-01", None))
+
+    task = tasks_data.find_task_by_id("1111111111")
+
+    assert type(task) is Task
+    assert task == ("1111111111", "a", "done", "low", None, "2022-01-01", None, None)
+    assert not hasattr(task, "__dict__")
+    with pytest.raises(AttributeError):
+        task.title = "b"
+
+
+def test_get_task_columns(tasks_data):
+    tasks_data.add_new_task(Task("1111111111", "a", "done", "high", None, "2022-02-01", None))
+    tasks_data.add_new_task(Task("2222222222", "b", "done", "low", None, "2022-01-01", None))
+    tasks_data.add_new_task(Task("3333333333", "c", "on_hold", "low", None, "2022-03-01", None))
+
+    assert tasks_data.get_task_columns(["priority", "start_date"], status=Status.DONE) == {
+        "priority": ["low", "high"],
+        "start_date": ["2022-01-01", "2022-02-01"],
+    }
+    assert tasks_data.get_task_columns(["id"], status=Status.NOT_STARTED) == {"id": []}
+    with pytest.raises(ValueError):
+        tasks_data.get_task_columns(["id", "rowid"])
+
+
+def test_search_tasks_ranks_and_filters(tasks_data):
+    tasks_data.add_new_task(
+        Task("1111111111", "report", "done", "high", "quarterly report", "2022-01-01", None)
+    )
+    tasks_data.add_new_task(
+        Task("2222222222", "meeting", "done", "low", "prepare the report", "2022-01-02", None)
+    )
+    tasks_data.add_new_task(
+        Task("3333333333", "reporting", "on_hold", "low", "café notes", "2022-01-03", None)
+    )
+
+    assert [task.id for task in tasks_data.search_tasks("report")] == [
+        "1111111111",
+        "2222222222",
+    ]
+    assert [task.id for task in tasks_data.search_tasks("REPORT prepare")] == ["2222222222"]
+    # A title match ranks before a description match
+    assert [task.id for task in tasks_data.search_tasks("rep*", priority=Priority.LOW)] == [
+        "3333333333",
+        "2222222222",
+    ]
+    assert [task.id for task in tasks_data.search_tasks("cafe")] == ["3333333333"]
+    assert tasks_data.search_tasks('"OR NEAR(') == []
+    with pytest.raises(ValueError):
+        tasks_data.search_tasks("* ")
+
+
+def test_search_index_follows_changes(tasks_data):
+    task = Task("1111111111", "draft", "done", "low", None, "2022-01-01", None)
+    tasks_data.add_new_task(task)
+    tasks_data.update_task(task._replace(title="final", description="signed"))
+
+    assert tasks_data.search_tasks("draft") == []
+    assert [task.id for task in tasks_data.search_tasks("final signed")] == ["1111111111"]
+
+    tasks_data.delete_task("1111111111")
+    assert tasks_data.search_tasks("final") == []
+
+
+def test_legacy_tasks_are_indexed_for_search(db_path):
+    create_legacy_database(db_path)
+
+    tasks_data = TasksTrackerData(db_path)
+
+    assert [task.id for task in tasks_data.search_tasks("title_2")] == ["f6a7b8c9d0"]
+
+
+def test_tasks_stats_counters_follow_changes(tasks_data):
+    today = date.today()
+    tasks_data.add_new_task(
+        Task("1111111111", "a", "done", "high", None, "2022-01-01", today.isoformat())
+    )
+    tasks_data.add_new_task(
+        Task("2222222222", "b", "on_hold", "low", None, "2022-01-01", today.isoformat())
+    )
+    tasks_data.add_tasks_batch(
+        [
+            ("3333333333", "c", "in_progress", "low", None, "2022-01-01", None),
+            ("4444444444", "d", "not_started", "low", None, "2022-01-01", "2022-01-01"),
+            ("5555555555", "e", "not_started", "medium", None, "2022-01-01", None),
+        ]
+    )
+    tasks_data.update_task(
+        Task(
+            "5555555555",
+            "e",
+            "in_progress",
+            "medium",
+            None,
+            "2022-01-01",
+            (today + timedelta(days=7)).isoformat(),
+        )
+    )
+    tasks_data.delete_task("3333333333")
+
+    expected_stats = TasksStats(
+        total=4,
+        by_status={"not_started": 1, "in_progress": 1, "on_hold": 1, "done": 1},
+        by_priority={"high": 1, "medium": 1, "low": 2},
+        overdue=2,
+        due_this_week=1,
+    )
+    assert tasks_data.get_tasks_stats() == expected_stats
+    assert tasks_data.get_tasks_stats(exact=True) == expected_stats
+
+    tasks_data.delete_all_tasks()
+    assert tasks_data.get_tasks_stats().total == 0
+
+
+def test_legacy_tasks_are_counted(db_path):
+    create_legacy_database(db_path)
+
+    tasks_data = TasksTrackerData(db_path)
+
+    assert tasks_data.get_tasks_stats() == tasks_data.get_tasks_stats(exact=True)
+    assert tasks_data.get_tasks_stats().by_status["done"] == 1
+
+
+def test_set_based_update_and_delete(tasks_data):
+    tasks_data.add_tasks_batch(
+        [
+            ("1111111111", "a", "in_progress", "high", None, "2022-01-01", None),
+            ("2222222222", "b", "in_progress", "high", None, "2022-02-01", None),
+            ("3333333333", "c", "in_progress", "low", None, "2022-03-01", None),
+        ]
+    )
+
+    assert tasks_data.count_tasks(status=Status.IN_PROGRESS, priority=Priority.HIGH) == 2
+    assert (
+        tasks_data.update_tasks(
+            {"status": "done", "end_date": "2022-04-01"},
+            status=Status.IN_PROGRESS,
+            priority=Priority.HIGH,
+        )
+        == 2
+    )
+    assert tasks_data.find_task_by_id("2222222222") == Task(
+        "2222222222", "b", "done", "high", None, "2022-02-01", "2022-04-01"
+    )
+    assert tasks_data.count_tasks(ids=["3333333333", "4444444444"]) == 1
+    assert tasks_data.count_tasks(ids=[]) == 0
+
+    assert tasks_data.delete_tasks(ids=["1111111111", "3333333333"], status=Status.DONE) == 1
+    assert [task.id for task in tasks_data.get_tasks_list()] == ["2222222222", "3333333333"]
+    with pytest.raises(ValueError):
+        tasks_data.update_tasks({"id": "5555555555"})
+
+
+def test_set_based_update_looks_up_ids(tasks_data):
+    plan = query_plan(
+        tasks_data,
+        "UPDATE tasks SET status = ? WHERE id IN (SELECT value FROM json_each(?))",
+        ("done", '["1111111111"]'),
+    )
+    assert "INDEX sqlite_autoindex_tasks_1 (id=?)" in plan
+
+
+def test_patch_task_merges_fields_in_one_statement(tasks_data):
+    tasks_data.add_new_task(Task("1111111111", "a", "done", "low", "notes", "2022-01-01", None))
+
+    updated_tasks = tasks_data.patch_task(
+        "1111111111", {"priority": "high", "end_date": "2022-02-02"}
+    )
+
+    assert updated_tasks == [
+        Task("1111111111", "a", "done", "high", "notes", "2022-01-01", "2022-02-02")
+    ]
+    assert tasks_data.find_task_by_id("1111111111") == updated_tasks[0]
+    assert tasks_data.patch_task("2222222222", {"title": "b"}) == []
+    with pytest.raises(ValueError):
+        tasks_data.patch_task("1111111111", {"id": "2222222222"})
+
+
+def test_delete_task_tells_whether_the_task_existed(tasks_data):
+    tasks_data.add_new_task(Task("1111111111", "a", "done", "low", None, "2022-01-01", None))
+
+    assert tasks_data.delete_task("1111111111") is True
+    assert tasks_data.delete_task("1111111111") is False
+
+
+def test_done_day_is_kept_by_triggers(tasks_data):
+    tasks_data.add_new_task(Task("1111111111", "done", "done", None, None, "2022-02-02", None))
+    tasks_data.add_new_task(Task("2222222222", "open", "on_hold", None, None, "2022-02-02", None))
+    tasks_data.update_tasks({"status": "done"}, ids=["2222222222"])
+    tasks_data.patch_task("1111111111", {"status": "in_progress"})
+
+    done_days = dict(tasks_data.connection.execute("SELECT id, done_on FROM tasks"))
+    assert done_days == {"1111111111": None, "2222222222": (date.today() - date(1970, 1, 1)).days}
+
+
+def test_archived_tasks_are_only_listed_on_demand(tasks_data):
+    tasks = [
+        Task("1111111111", "first", "done", None, None, "2022-01-01", None),
+        Task("2222222222", "second", "in_progress", None, None, "2022-02-02", None),
+        Task("3333333333", "third", "done", None, None, "2022-03-03", None),
+        Task("4444444444", "fourth", "on_hold", None, None, "2022-04-04", None),
+    ]
+    for task in tasks:
+        tasks_data.add_new_task(task)
+
+    assert tasks_data.count_tasks_to_archive() == 2
+    assert tasks_data.archive_tasks(ids=["4444444444"]) == 1
+    assert tasks_data.archive_tasks() == 2
+
+    assert [task.id for task in tasks_data.get_tasks_list()] == ["2222222222"]
+    assert tasks_data.get_tasks_list(include_archived=True) == tasks
+    assert [
+        task.id
+        for task in tasks_data.get_tasks_list(
+            Status.DONE, after=("2022-01-01", "1111111111"), limit=1, include_archived=True
+        )
+    ] == ["3333333333"]
+    assert [row[0] for row in tasks_data.iter_task_rows(include_archived=True)] == [
+        task.id for task in tasks
+    ]
+    assert tasks_data.find_task_by_id("3333333333") is None
+    assert tasks_data.find_task_by_id("3333333333", include_archived=True) == tasks[2]
+    assert tasks_data.get_tasks_stats().total == 1
+
+
+def test_archive_policy_moves_tasks_done_for_long(db_path):
+    tasks_data = TasksTrackerData(db_path)
+    tasks_data.add_new_task(Task("1111111111", "old", "done", None, None, "2022-01-01", None))
+    tasks_data.add_new_task(Task("2222222222", "new", "done", None, None, "2022-01-01", None))
+    tasks_data.connection.execute("UPDATE tasks SET done_on = done_on - 31 WHERE id = '1111111111'")
+    assert tasks_data.count_tasks_to_archive(done_for_days=30) == 1
+    tasks_data.close()
+
+    tasks_data = TasksTrackerData(db_path, ConnectionSettings(archive_done_days=30))
+    assert [task.id for task in tasks_data.get_tasks_list()] == ["2222222222"]
+    assert tasks_data.find_task_by_id("1111111111", include_archived=True).title == "old"
+    assert tasks_data.apply_archive_policy(30) == 0
+    tasks_data.close()
+
+
+def test_legacy_tasks_start_the_change_log(db_path):
+    create_legacy_database(db_path)
+
+    tasks_data = TasksTrackerData(db_path)
+
+    assert [(change.operation, change.task_id) for change in tasks_data.iter_changes()] == [
+        ("insert", "a1b2c3d4e5"),
+        ("insert", "f6a7b8c9d0"),
+    ]
+    tasks_data.close()
+
+
+def test_change_log_keeps_the_last_change_of_every_task(tasks_data):
+    for id in ("1111111111", "2222222222", "3333333333"):
+        tasks_data.add_new_task(Task(id, "title", "not_started", "low", None, "2022-02-02", None))
+    tasks_data.patch_task("1111111111", {"status": "done"})
+    # Saving a task without changing it is not a change
+    tasks_data.update_task(tasks_data.find_task_by_id("3333333333"))
+    tasks_data.delete_task("2222222222")
+    tasks_data.archive_tasks(ids=["1111111111"])
+
+    changes = list(tasks_data.iter_changes())
+    assert [(change.seq, change.operation, change.task_id) for change in changes] == [
+        (3, "insert", "3333333333"),
+        (5, "delete", "2222222222"),
+        (6, "archive", "1111111111"),
+    ]
+    assert changes[0].task == (
+        "3333333333",
+        "title",
+        "not_started",
+        "low",
+        None,
+        "2022-02-02",
+        None,
+    )
+    assert changes[1].task is None
+    assert changes[2].task[2] == "done"
+    assert [change.seq for change in tasks_data.iter_changes(since=5)] == [6]
+    assert [change.seq for change in tasks_data.iter_changes(limit=1)] == [3]
+
+    # Sequence numbers of dropped entries are never given again
+    tasks_data.add_new_task(Task("2222222222", "again", None, None, None, "2022-02-02", None))
+    assert [change.seq for change in tasks_data.iter_changes(since=6)] == [7]
+
+
+def test_pruned_deletes_are_detected(tasks_data):
+    tasks_data.add_new_task(Task("1111111111", "title", None, None, None, "2022-02-02", None))
+    tasks_data.add_new_task(Task("2222222222", "title", None, None, None, "2022-02-02", None))
+    tasks_data.delete_task("1111111111")
+    assert tasks_data.prune_changes(deleted_for_days=0) == 0
+
+    tasks_data.connection.execute("UPDATE task_change_log SET changed_on = changed_on - 31")
+    assert tasks_data.prune_changes(deleted_for_days=30) == 1
+
+    with pytest.raises(ChangesPrunedError):
+        list(tasks_data.iter_changes(since=2))
+    assert [change.seq for change in tasks_data.iter_changes(since=3)] == []
+    assert [change.task_id for change in tasks_data.iter_changes()] == ["2222222222"]
+    assert not tasks_data.connection.in_transaction
+
+
+def test_delete_all_tasks_deletes_archived_tasks(tasks_data):
+    tasks_data.add_new_task(Task("1111111111", "first", "done", None, None, "2022-01-01", None))
+    tasks_data.add_new_task(Task("2222222222", "second", "on_hold", None, None, "2022-02-02", None))
+    tasks_data.archive_tasks()
+
+    assert tasks_data.delete_all_tasks() is True
+    assert tasks_data.get_tasks_list(include_archived=True) == []
+    assert [(change.operation, change.task_id) for change in tasks_data.iter_changes()] == [
+        ("delete", "2222222222"),
+        ("delete", "1111111111"),
+    ]
@@ -0,0 +1,106 @@
+import json
+import sys
+from types import SimpleNamespace
+
+from typer.testing import CliRunner
+
+from tasks_tracker import cli, database, metrics
+from tasks_tracker.cli import cli_controller
+from tasks_tracker.configs import METRICS_FILE_ENV
+from tasks_tracker.connection import DatabaseLockedError
+from tasks_tracker.metrics import MetricsRecorder
+
+runner = CliRunner()
+
+
+def read_state(path):
+    with open(f"{path}.json") as state_file:
+        return json.load(state_file)
+
+
+def test_processes_merge_their_metrics(tmp_path):
+    path = str(tmp_path / "tasks_tracker.prom")
+    for seconds, tasks in ((0.003, 10), (20.0, 12)):
+        # A recorder per process
+        recorder = MetricsRecorder(path)
+        recorder.record_command("list", seconds, succeeded=True)
+        recorder.set_gauge("tasks_tracker_tasks", {'status="done"': tasks})
+        recorder.save()
+
+    state = read_state(path)
+    assert state["tasks_tracker_commands_total"] == {'command="list",outcome="ok"': 2}
+    assert state["tasks_tracker_tasks"] == {'status="done"': 12}
+
+    with open(path) as metrics_file:
+        lines = metrics_file.read().splitlines()
+    assert "# TYPE tasks_tracker_command_duration_seconds histogram" in lines
+    assert 'tasks_tracker_command_duration_seconds_bucket{command="list",le="0.001"} 0' in lines
+    assert 'tasks_tracker_command_duration_seconds_bucket{command="list",le="0.005"} 1' in lines
+    assert 'tasks_tracker_command_duration_seconds_bucket{command="list",le="10.0"} 1' in lines
+    assert 'tasks_tracker_command_duration_seconds_bucket{command="list",le="+Inf"} 2' in lines
+    assert 'tasks_tracker_command_duration_seconds_count{command="list"} 2' in lines
+    assert 'tasks_tracker_tasks{status="done"} 12' in lines
+
+
+def test_metrics_are_saved_without_fcntl(tmp_path, monkeypatch):
+    # Windows has no fcntl, the lock is taken with msvcrt
+    locks = []
+    fake_msvcrt = SimpleNamespace(
+        LK_LOCK=1, LK_UNLCK=0, locking=lambda fd, mode, size: locks.append(mode)
+    )
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+    monkeypatch.setitem(sys.modules, "msvcrt", fake_msvcrt)
+    path = str(tmp_path / "tasks_tracker.prom")
+    recorder = MetricsRecorder(path)
+    recorder.record_command("list", 0.003, succeeded=True)
+
+    recorder.save()
+
+    assert locks == [1, 0]
+    assert read_state(path)["tasks_tracker_commands_total"] == {'command="list",outcome="ok"': 1}
+
+
+def test_commands_and_data_calls_are_recorded(db_path, tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks_tracker.prom")
+    monkeypatch.setenv(METRICS_FILE_ENV, path)
+    monkeypatch.setattr(metrics, "_recorder", None)
+    monkeypatch.setattr(database, "DB_PATH", db_path)
+    monkeypatch.setattr(cli, "_app_data", None)
+
+    assert runner.invoke(cli_controller, ["add", "first", "-s", "done"]).exit_code == 0
+    assert runner.invoke(cli_controller, ["list", "--format", "tsv"]).exit_code == 0
+    cli._app_data.close()
+
+    state = read_state(path)
+    assert state["tasks_tracker_commands_total"] == {
+        'command="add",outcome="ok"': 1,
+        'command="list",outcome="ok"': 1,
+    }
+    assert state["tasks_tracker_data_calls_total"] == {
+        'method="add_new_task"': 1,
+        'method="get_tasks_list"': 1,
+    }
+    assert state["tasks_tracker_tasks"] == {'status="done"': 1}
+    assert state["tasks_tracker_database_size_bytes"][""] > 0
+
+
+def test_data_errors_are_counted_with_their_method(tmp_path, monkeypatch):
+    recorder = MetricsRecorder(str(tmp_path / "tasks_tracker.prom"))
+    monkeypatch.setattr(metrics, "_recorder", recorder)
+
+    def failing_method():
+        database.print_data_error(DatabaseLockedError("database is locked"))
+
+    recorder.measure("add_new_task", failing_method)()
+
+    assert recorder.recorded["tasks_tracker_data_errors_total"] == {
+        'method="add_new_task",error="database_locked"': 1
+    }
+    assert recorder.data_method is None
+
+
+def test_metrics_are_off_by_default(monkeypatch):
+    monkeypatch.delenv(METRICS_FILE_ENV, raising=False)
+    monkeypatch.setattr(metrics, "_recorder", None)
+
+    assert metrics.get_metrics_recorder() is None
@@ -0,0 +1,77 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tasks_tracker.model import Task
+from tasks_tracker.pool import PooledTasksTrackerData
+
+THREADS = 8
+TASKS_PER_THREAD = 50
+
+
+@pytest.fixture
+def pooled_data(db_path):
+    data = PooledTasksTrackerData(db_path)
+    yield data
+    data.close()
+
+
+def new_task(id: str) -> Task:
+    return Task(id, "task", "not_started", "low", None, "2022-01-01", None)
+
+
+def test_threads_read_with_their_own_connection(pooled_data):
+    pooled_data.add_new_task(new_task("1111111111"))
+
+    def read(_):
+        return pooled_data.find_task_by_id("1111111111"), id(pooled_data.reader())
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        results = list(executor.map(read, range(THREADS * 4)))
+
+    assert all(task.id == "1111111111" for task, _ in results)
+    assert len({connection for _, connection in results}) <= THREADS
+
+
+def test_threads_write_without_losing_changes(pooled_data):
+    def write(thread):
+        failed_writes = 0
+        for index in range(TASKS_PER_THREAD):
+            task = new_task(f"{thread:04d}{index:06d}")
+            failed_writes += not pooled_data.add_new_task(task)
+            failed_writes += not pooled_data.update_task(task._replace(status="done"))
+            failed_writes += not pooled_data.get_tasks_list(limit=10)
+        return failed_writes
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        failed_writes = sum(executor.map(write, range(THREADS)))
+
+    tasks = pooled_data.get_tasks_list()
+    assert failed_writes == 0
+    assert len(tasks) == THREADS * TASKS_PER_THREAD
+    assert {task.status for task in tasks} == {"done"}
+
+
+def test_transaction_reads_its_own_changes(pooled_data):
+    other_thread_tasks = []
+
+    with pooled_data.transaction():
+        pooled_data.add_new_task(new_task("1111111111"))
+        assert pooled_data.find_task_by_id("1111111111")
+
+        # Other threads only see committed changes
+        thread = threading.Thread(
+            target=lambda: other_thread_tasks.append(pooled_data.find_task_by_id("1111111111"))
+        )
+        thread.start()
+        thread.join()
+
+    assert other_thread_tasks == [None]
+    assert pooled_data.find_task_by_id("1111111111")
+
+
+def test_read_connections_cannot_write(pooled_data):
+    with pytest.raises(sqlite3.OperationalError):
+        pooled_data.reader().execute("DELETE FROM tasks")
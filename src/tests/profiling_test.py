@@ -0,0 +1,55 @@
+import pstats
+
+from typer.testing import CliRunner
+
+from tasks_tracker import cli, database
+from tasks_tracker.cli import cli_controller
+from tasks_tracker.model import Task
+from tasks_tracker.profiling import ProfiledTasksTrackerData, Profiler
+
+runner = CliRunner(mix_stderr=False)
+
+task = Task("1111111111", "first", "done", "high", None, "2022-02-02", None)
+
+
+def test_profiled_data_logs_statements_and_phases(db_path):
+    profiler = Profiler()
+    tasks_data = ProfiledTasksTrackerData(profiler, db_path)
+    tasks_data.add_new_task(task)
+
+    assert tasks_data.get_tasks_list() == [task]
+    assert tasks_data.find_task_by_id("missing") is None
+    tasks_data.close()
+
+    select, find = profiler.statements[-2:]
+    assert select.sql.startswith("SELECT") and select.rows == 1
+    assert find.rows == 0
+    insert = next(
+        statement
+        for statement in profiler.statements
+        if statement.sql.startswith("INSERT INTO tasks (")
+    )
+    assert insert.rows == 1
+    assert {"prepare_data", "query", "hydration", "render"} <= set(profiler.phases)
+
+
+def test_profile_option_prints_to_stderr(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", db_path)
+    monkeypatch.setattr(cli, "_app_data", None)
+    stats_path = str(tmp_path / "list.prof")
+
+    result = runner.invoke(
+        cli_controller,
+        ["--profile", "--profile-output", stats_path, "list", "--format", "tsv"],
+    )
+
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == [
+        "id\ttitle\tstatus\tpriority\tdescription\tstart_date\tend_date"
+    ]
+    assert result.stderr.startswith("PHASE")
+    assert "\nprepare_data " in result.stderr
+    assert " SQL statements\n" in result.stderr
+    assert pstats.Stats(stats_path).total_calls > 0
+    # The profiled data layer is closed with the command
+    assert cli._app_data is None and cli._profiler is None
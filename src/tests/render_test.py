@@ -0,0 +1,111 @@
+import io
+import json
+from datetime import date
+
+import pytest
+from typer.testing import CliRunner
+
+from tasks_tracker import cli
+from tasks_tracker.cli import cli_controller
+from tasks_tracker.configs import NO_TASK_FOUND
+from tasks_tracker.model import Task
+from tasks_tracker.render import JsonRenderer, PlainRenderer, TasksRenderer, TsvRenderer
+from tasks_tracker.utils import (
+    TABLE_DUE_STATE_WARNINGS,
+    EndDateCells,
+    styling_priority,
+    styling_status,
+)
+
+runner = CliRunner(mix_stderr=False)
+
+tasks = [
+    Task("1111111111", "first", "in_progress", "high", "tab\there", "2022-02-02", None),
+    Task("2222222222", "second", "done", "low", None, "2022-03-03", "2022-04-04", "expired"),
+]
+
+
+def render(renderer_class, pages, next_cursor=None):
+    stream = io.StringIO()
+    renderer = renderer_class(stream)
+    for page in pages:
+        renderer.write_page(page)
+    renderer.finish(next_cursor)
+    return stream.getvalue()
+
+
+def test_plain_renderer_uses_the_texts_of_the_table():
+    lines = render(PlainRenderer, [tasks[:1], tasks[1:]], "2022-03-03:2222222222").splitlines()
+
+    assert lines[0].startswith("ID          TITLE")
+    assert lines[1].split()[:6] == ["1111111111", "First", "IN", "PROGRESS", "HIGH", "02/02/2022"]
+    assert lines[1].endswith("Not setting                Tab\there")
+    assert "04/04/2022 (Expired)" in lines[2]
+    assert lines[3] == "More tasks available, show them with: --after 2022-03-03:2222222222"
+    assert render(PlainRenderer, [[]]) == f"{NO_TASK_FOUND}\n"
+
+
+def test_end_date_cells_use_the_day_the_list_started():
+    end_dates = EndDateCells(TABLE_DUE_STATE_WARNINGS, today=date(2022, 3, 3))
+
+    assert end_dates.due_state("2022-03-03") == "expired"
+    assert end_dates.due_state("2022-03-04") == "expires_soon"
+    assert end_dates.due_state("2022-03-05") == "on_time"
+    assert end_dates.get("2022-03-04") == (
+        "[orange1]04/03/2022[/orange1] \n[orange1 bold]Expired soon[/orange1 bold]"
+    )
+    # The due state computed by the query wins
+    assert end_dates.get("2022-03-04", "on_time") == "04/03/2022"
+    assert end_dates.get(None) == "Not setting"
+
+
+def test_styles_of_enum_values():
+    assert styling_status("in_progress") == "[bold turquoise2]IN PROGRESS[/bold turquoise2]"
+    assert styling_status("not_started") == "NOT STARTED"
+    assert styling_status(None) == "-"
+    assert styling_priority("low") == "[bold]LOW[/bold]"
+    assert styling_priority(None) == "[bold]-[/bold]"
+
+
+def test_tsv_renderer_escapes_values():
+    assert render(TsvRenderer, [tasks]).splitlines() == [
+        "id\ttitle\tstatus\tpriority\tdescription\tstart_date\tend_date",
+        "1111111111\tfirst\tin_progress\thigh\ttab\\there\t2022-02-02\t",
+        "2222222222\tsecond\tdone\tlow\t\t2022-03-03\t2022-04-04",
+    ]
+    assert render(TsvRenderer, [[]]).count("\n") == 1
+
+
+def test_json_renderer_writes_one_array():
+    output = json.loads(render(JsonRenderer, [tasks[:1], [], tasks[1:]]))
+
+    assert [task["id"] for task in output] == ["1111111111", "2222222222"]
+    assert output[1]["due_state"] == "expired"
+    assert json.loads(render(JsonRenderer, [[]])) == []
+
+
+def test_list_command_format_option(tasks_data, monkeypatch):
+    monkeypatch.setattr(cli, "_app_data", tasks_data)
+    for task in tasks:
+        tasks_data.add_new_task(task._replace(due_state=None))
+
+    result = runner.invoke(cli_controller, ["list", "--format", "json", "--limit", "1"])
+
+    assert result.exit_code == 0
+    assert [task["id"] for task in json.loads(result.stdout)] == ["1111111111"]
+    assert "--after 2022-02-02:1111111111" in result.stderr
+
+    # Not a terminal: plain by default
+    result = runner.invoke(cli_controller, ["list"])
+    assert result.stdout.startswith("ID          TITLE")
+
+    result = runner.invoke(cli_controller, ["list", "--format", "table"])
+    assert "TASKS LIST" in result.stdout
+
+
+def test_renderer_needs_write_page():
+    class IncompleteRenderer(TasksRenderer):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteRenderer(io.StringIO())
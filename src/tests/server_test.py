@@ -0,0 +1,105 @@
+import io
+import os
+import stat
+import tempfile
+import threading
+
+import pytest
+
+from tasks_tracker import cli, database
+from tasks_tracker.client import can_forward, forward_command
+from tasks_tracker.configs import NO_DAEMON_ENV
+from tasks_tracker.server import close_server, create_server
+from tasks_tracker.settings import get_socket_path
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "tasks-tracker.sock")
+
+
+@pytest.fixture
+def server(socket_path, db_path, monkeypatch):
+    # The server thread opens its own connection to the test database on the first command
+    monkeypatch.setattr(database, "DB_PATH", db_path)
+    monkeypatch.setattr(cli, "_app_data", None)
+    command_server = create_server(socket_path)
+    thread = threading.Thread(target=command_server.serve_forever)
+    thread.start()
+    yield command_server
+    command_server.shutdown()
+    thread.join()
+    close_server(command_server)
+
+
+def test_forward_command_runs_on_the_server(server, socket_path, capsys, monkeypatch):
+    monkeypatch.setenv("COLUMNS", "200")
+    assert forward_command(socket_path, ["add", "served task", "-p", "high"]) == 0
+    assert "New task added successfully." in capsys.readouterr().out
+
+    assert forward_command(socket_path, ["list"]) == 0
+    assert "Served task" in capsys.readouterr().out
+
+
+def test_forward_command_returns_the_exit_code_and_errors(server, socket_path, capsys):
+    assert forward_command(socket_path, ["list", "--status", "unknown"]) == 2
+    assert "Invalid value" in capsys.readouterr().err
+
+
+def test_forward_command_sends_the_confirmation_answer(server, socket_path, capsys, monkeypatch):
+    monkeypatch.setenv("COLUMNS", "200")
+    forward_command(socket_path, ["add", "to keep", "-p", "low"])
+    monkeypatch.setattr("sys.stdin", io.StringIO("n\n"))
+
+    assert forward_command(socket_path, ["delete-all"]) == 0
+    assert "Surely you want to delete all your tasks?" in capsys.readouterr().out
+    forward_command(socket_path, ["list"])
+    assert "To keep" in capsys.readouterr().out
+
+
+def test_forward_command_without_server(socket_path):
+    assert forward_command(socket_path, ["list"]) is None
+
+    # A socket file left by a server that was killed
+    open(socket_path, "w").close()
+    assert forward_command(socket_path, ["list"]) is None
+
+
+def test_forward_command_skips_socket_of_another_user(server, socket_path, monkeypatch):
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+
+    assert forward_command(socket_path, ["list"]) is None
+
+
+def test_default_socket_is_in_a_folder_of_the_user(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.delenv("TASKS_TRACKER_SOCKET", raising=False)
+    # tmp_path can be longer than a socket path may be
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        monkeypatch.setenv("TMPDIR", directory)
+        socket_path = get_socket_path(str(tmp_path / "tasks-tracker.db"))
+        assert os.path.dirname(socket_path) == os.path.join(
+            directory, f"tasks-tracker-{os.getuid()}"
+        )
+
+        close_server(create_server(socket_path))
+
+        assert stat.S_IMODE(os.stat(os.path.dirname(socket_path)).st_mode) == 0o700
+
+
+def test_only_one_server_per_socket(server, socket_path):
+    assert create_server(socket_path) is None
+
+
+def test_can_forward(monkeypatch):
+    monkeypatch.setattr("sys.stdin.isatty", lambda: True)
+    assert can_forward(["list", "--status", "done"])
+    assert can_forward(["delete", "1234567890", "-f"])
+    assert not can_forward(["delete", "1234567890"])
+    assert not can_forward(["import", "tasks.csv"])
+    assert not can_forward(["--version"])
+    assert not can_forward([])
+
+    monkeypatch.setenv(NO_DAEMON_ENV, "1")
+    assert not can_forward(["list"])
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from tasks_tracker import cli
+from tasks_tracker.cli import cli_controller
+from tasks_tracker.connection import ConnectionSettings, load_connection_settings
+from tasks_tracker.database import TasksTrackerData
+from tasks_tracker.settings import (
+    CONFIG_FILE_ENV,
+    InvalidSettingError,
+    get_db_path,
+    get_socket_path,
+)
+
+runner = CliRunner(mix_stderr=False)
+
+
+def write_config(tmp_path, monkeypatch, content):
+    config_path = tmp_path / "config.ini"
+    config_path.write_text(content)
+    monkeypatch.setenv(CONFIG_FILE_ENV, str(config_path))
+
+
+def test_environment_overrides_config_file(tmp_path, monkeypatch):
+    write_config(
+        tmp_path,
+        monkeypatch,
+        "[database]\npath = ~/tasks.db\nstorage_profile = fast\nbusy_timeout_ms = 100\n",
+    )
+    monkeypatch.setenv("TASKS_TRACKER_BUSY_TIMEOUT_MS", "200")
+
+    assert get_db_path() == os.path.expanduser("~/tasks.db")
+    settings = load_connection_settings()
+    assert settings.storage_profile == "fast" and settings.busy_timeout_ms == 200
+
+    monkeypatch.setenv("TASKS_TRACKER_DB", str(tmp_path / "env.db"))
+    assert get_db_path() == str(tmp_path / "env.db")
+    # Every database gets its own server
+    assert get_socket_path() != get_socket_path(str(tmp_path / "other.db"))
+
+
+def test_invalid_setting_is_reported(tmp_path, monkeypatch):
+    write_config(tmp_path, monkeypatch, "[database]\nwrite_retries = many\n")
+    with pytest.raises(InvalidSettingError, match="TASKS_TRACKER_WRITE_RETRIES"):
+        load_connection_settings()
+
+    monkeypatch.setenv("TASKS_TRACKER_WRITE_RETRIES", "2")
+    monkeypatch.setenv("TASKS_TRACKER_STORAGE_PROFILE", "bogus")
+    with pytest.raises(InvalidSettingError, match="use one of default, fast"):
+        load_connection_settings()
+
+    monkeypatch.setenv("TASKS_TRACKER_STORAGE_PROFILE", "FAST")
+    assert load_connection_settings().storage_profile == "fast"
+
+    monkeypatch.setenv("TASKS_TRACKER_ARCHIVE_DONE_DAYS", "x")
+    monkeypatch.setattr(cli, "_app_data", None)
+    result = runner.invoke(cli_controller, ["list"])
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert "TASKS_TRACKER_ARCHIVE_DONE_DAYS" in result.stdout
+
+
+def test_malformed_config_file_is_reported(tmp_path, monkeypatch):
+    write_config(tmp_path, monkeypatch, "path = ~/tasks.db\n")
+    monkeypatch.setattr(cli, "_app_data", None)
+
+    with pytest.raises(InvalidSettingError, match="Cannot read the config file"):
+        get_socket_path()
+    assert runner.invoke(cli_controller, ["--help"]).exit_code == 0
+    result = runner.invoke(cli_controller, ["list"])
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert "Cannot read the config file" in result.stdout
+    assert cli._app_data is None
+
+
+def test_db_option_selects_the_database(tmp_path, monkeypatch):
+    monkeypatch.setenv("TASKS_TRACKER_DB", str(tmp_path / "env.db"))
+    monkeypatch.setattr(cli, "_app_data", None)
+    monkeypatch.setattr(cli, "_db_path", None)
+    db_path = str(tmp_path / "option.db")
+
+    result = runner.invoke(cli_controller, ["--db", db_path, "add", "first"])
+
+    assert result.exit_code == 0
+    cli._app_data.connection.close()
+    assert not os.path.exists(tmp_path / "env.db")
+    assert TasksTrackerData(db_path).count_tasks() == 1
+
+
+def test_storage_profile_sets_pragmas(db_path):
+    tasks_data = TasksTrackerData(
+        db_path, ConnectionSettings(storage_profile="ephemeral", synchronous="normal")
+    )
+    pragmas = [
+        tasks_data.connection.execute(f"PRAGMA {name}").fetchone()[0]
+        for name in ("mmap_size", "cache_size", "temp_store", "synchronous")
+    ]
+    tasks_data.connection.close()
+
+    # The synchronous level of the settings wins over the one of the profile
+    assert pragmas == [256 * 1024 * 1024, -65536, 2, 1]
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+import pytest
+
+import tasks_tracker
+
+# Total import time budget per command, measured with `python -X importtime`. The budgets leave
+# room for slower machines, the import lists below catch the regressions that matter the most.
+STARTUP_BUDGETS_MS = {
+    ("--help",): 150,
+    ("--version",): 250,
+    ("add", "--help"): 150,
+    ("list", "--help"): 150,
+    ("add", "title", "--priority", "urgent"): 150,
+}
+
+# Modules that none of the commands above should need.
+LAZY_MODULES = ("sqlite3", "nanoid", "tasks_tracker.database", "rich.markdown", "rich.syntax")
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(tasks_tracker.__file__)))
+
+
+def measure_imports(*args: str) -> Tuple[int, Dict[str, int]]:
+    """Run the CLI entry point and return its exit code and the self import time per module."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import sys; from tasks_tracker import main; sys.argv[0] = 'tasks-tracker'; main()",
+            *args,
+        ],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": SRC_DIR},
+    )
+    import_times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_time, _, module = line[len("import time:") :].split("|")
+            import_times[module.strip()] = int(self_time)
+    return result.returncode, import_times
+
+
+@pytest.mark.parametrize("args", STARTUP_BUDGETS_MS.keys())
+def test_startup_stays_within_budget(args):
+    budget_ms = STARTUP_BUDGETS_MS[args]
+
+    # Keep the best of a few runs to not fail on a noisy machine
+    best_ms = None
+    for _ in range(3):
+        _, import_times = measure_imports(*args)
+        total_ms = sum(import_times.values()) / 1000
+        best_ms = total_ms if best_ms is None else min(best_ms, total_ms)
+
+    assert best_ms <= budget_ms, f"{' '.join(args)} took {best_ms:.1f}ms to import"
+
+
+@pytest.mark.parametrize("args", STARTUP_BUDGETS_MS.keys())
+def test_startup_does_not_import_lazy_modules(args):
+    _, import_times = measure_imports(*args)
+    assert [module for module in LAZY_MODULES if module in import_times] == []
+
+
+def test_help_does_not_import_rich():
+    exit_code, import_times = measure_imports("--help")
+    assert exit_code == 0
+    assert "rich.console" not in import_times
@@ -1,3 +1,4 @@
+import json
 from unittest.mock import Mock
 
 from typer.testing import CliRunner
@@ -6,20 +7,28 @@ from tasks_tracker.cli import cli_controller
 from tasks_tracker.configs import (
     ADDING_TASK_ERROR,
     ADDING_TASK_SUCCESS,
+    ARCHIVE_TASKS_DRY_RUN,
+    ARCHIVE_TASKS_SUCCESS,
+    CHANGES_SUCCESS,
     DELETE_ALL_TASKS_ERROR,
     DELETE_ALL_TASKS_SUCCESS,
     DELETE_TASK_ERROR,
     DELETE_TASK_SUCCESS,
+    DELETE_TASKS_DRY_RUN,
+    DELETE_TASKS_SUCCESS,
     NO_TASK_FOUND,
     NO_TASK_FOUND_ERROR,
+    PRUNE_CHANGES_SUCCESS,
     UPDATE_TASK_ERROR,
     UPDATE_TASK_SUCCESS,
+    UPDATE_TASKS_DRY_RUN,
+    UPDATE_TASKS_SUCCESS,
     __app_name__,
     __author__,
     __version__,
 )
-from tasks_tracker.database import TasksTrackerData
-from tasks_tracker.model import Task
+from tasks_tracker.database import ChangesPrunedError, TasksTrackerData
+from tasks_tracker.model import Task, TaskChange, TasksStats
 from tasks_tracker.typing import Priority, Status
 
 runner = CliRunner()
@@ -121,6 +130,73 @@ def test_list_command_with_data_exist():
     assert "Task 1 description" in result.stdout
 
 
+def test_list_command_with_limit_shows_next_page_cursor():
+    TasksTrackerData.get_tasks_list = Mock(return_value=[Task(*i) for i in mock_task_data])
+    result = runner.invoke(cli_controller, ["list", "--limit", "1"])
+    assert result.exit_code == 0
+    assert "Title_1" in result.stdout
+    assert "Title_2" not in result.stdout
+    assert "--after 2022-02-02:1" in result.stdout
+
+
+def test_list_command_with_invalid_cursor():
+    result = runner.invoke(cli_controller, ["list", "--after", "not-a-cursor"])
+    assert result.exit_code == 2
+
+
+# Search command tests
+
+
+def test_search_command_with_data_exist():
+    TasksTrackerData.search_tasks = Mock(return_value=[Task(*mock_task_data[0])])
+    result = runner.invoke(cli_controller, ["search", "descr*", "--status", "in_progress"])
+    assert result.exit_code == 0
+    assert "Title_1" in result.stdout
+    assert TasksTrackerData.search_tasks.call_args.args[:2] == ("descr*", Status.IN_PROGRESS)
+
+
+def test_search_command_with_empty_list():
+    TasksTrackerData.search_tasks = Mock(return_value=[])
+    result = runner.invoke(cli_controller, ["search", "nothing"])
+    assert result.exit_code == 0
+    assert NO_TASK_FOUND in result.stdout
+
+
+def test_search_command_without_words():
+    result = runner.invoke(cli_controller, ["search", " * "])
+    assert result.exit_code == 2
+
+
+# Stats command tests
+
+
+def test_stats_command_prints_panel_and_json():
+    TasksTrackerData.get_tasks_stats = Mock(
+        return_value=TasksStats(
+            total=2,
+            by_status={"in_progress": 1, "done": 1},
+            by_priority={"high": 1, "medium": 1},
+            overdue=0,
+            due_this_week=1,
+        )
+    )
+    result = runner.invoke(cli_controller, ["stats"])
+    assert result.exit_code == 0
+    assert "TASKS STATS" in result.stdout
+    assert "IN PROGRESS" in result.stdout
+
+    result = runner.invoke(cli_controller, ["stats", "--json", "--exact"])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["due_this_week"] == 1
+    TasksTrackerData.get_tasks_stats.assert_called_with(exact=True)
+
+
+def test_stats_command_with_failure():
+    TasksTrackerData.get_tasks_stats = Mock(return_value=None)
+    result = runner.invoke(cli_controller, ["stats"])
+    assert result.exit_code == 1
+
+
 # Update command tests
 
 
@@ -144,37 +220,69 @@ def test_update_command_with_help_option():
 
 
 def test_update_command_with_prompt():
-    TasksTrackerData.find_task_by_id = Mock(return_value=None)
-    TasksTrackerData.update_task = Mock(return_value=False)
+    TasksTrackerData.patch_task = Mock(return_value=[])
     result = runner.invoke(cli_controller, ["update", "1234567890"])
     assert result.exit_code == 0
     assert "Update this task with provided data?" in result.stdout
 
 
 def test_update_command_with_no_task_id_error():
-    TasksTrackerData.find_task_by_id = Mock(return_value=None)
-    TasksTrackerData.update_task = Mock(return_value=False)
+    TasksTrackerData.patch_task = Mock(return_value=[])
     result = runner.invoke(cli_controller, ["update", "1234567890", "-f"])
     assert result.exit_code == 0
     assert NO_TASK_FOUND_ERROR in result.stdout
 
 
 def test_update_command_without_prompt_and_success():
-    TasksTrackerData.find_task_by_id = Mock(return_value=Task(*mock_task_data[0]))
-    TasksTrackerData.update_task = Mock(return_value=True)
-    result = runner.invoke(cli_controller, ["update", "1234567890", "-f"])
+    TasksTrackerData.patch_task = Mock(return_value=[Task(*mock_task_data[0])])
+    result = runner.invoke(cli_controller, ["update", "1234567890", "-f", "-p", "high"])
     assert result.exit_code == 0
     assert UPDATE_TASK_SUCCESS in result.stdout
+    # Only the given fields are sent, the task shown is the one returned by the update
+    TasksTrackerData.patch_task.assert_called_once_with("1234567890", {"priority": "high"})
+    assert "Title_1" in result.stdout
 
 
 def test_update_command_without_prompt_and_fail():
-    TasksTrackerData.find_task_by_id = Mock(return_value=Task(*mock_task_data[0]))
-    TasksTrackerData.update_task = Mock(return_value=False)
+    TasksTrackerData.patch_task = Mock(return_value=None)
     result = runner.invoke(cli_controller, ["update", "1234567890", "-f"])
     assert result.exit_code == 0
     assert UPDATE_TASK_ERROR in result.stdout
 
 
+def test_update_command_with_filters_and_dry_run():
+    TasksTrackerData.count_tasks = Mock(return_value=3)
+    TasksTrackerData.update_tasks = Mock(return_value=3)
+    result = runner.invoke(
+        cli_controller,
+        ["update", "--where-status", "in_progress", "--where-priority", "high", "-s", "done"]
+        + ["--dry-run"],
+    )
+    assert result.exit_code == 0
+    assert UPDATE_TASKS_DRY_RUN.format(3) in result.stdout
+    TasksTrackerData.update_tasks.assert_not_called()
+
+    result = runner.invoke(
+        cli_controller, ["update", "--where-status", "in_progress", "-s", "done"]
+    )
+    assert "Update 3 tasks with provided data?" in result.stdout
+
+    result = runner.invoke(
+        cli_controller, ["update", "1234567890", "0987654321", "-s", "done", "-f"]
+    )
+    assert result.exit_code == 0
+    assert UPDATE_TASKS_SUCCESS.format(3) in result.stdout
+    assert TasksTrackerData.update_tasks.call_args.args[0] == {"status": "done"}
+    assert TasksTrackerData.update_tasks.call_args.kwargs["ids"] == ["1234567890", "0987654321"]
+
+
+def test_update_command_without_target_or_changes():
+    result = runner.invoke(cli_controller, ["update", "-s", "done", "-f"])
+    assert result.exit_code == 2
+    result = runner.invoke(cli_controller, ["update", "--where-status", "done", "-f"])
+    assert result.exit_code == 2
+
+
 # Delete command test
 
 
@@ -186,7 +294,6 @@ def test_detete_command_with_help_option():
 
 
 def test_delete_command_with_no_task_id_error():
-    TasksTrackerData.find_task_by_id = Mock(return_value=None)
     TasksTrackerData.delete_task = Mock(return_value=False)
     result = runner.invoke(cli_controller, ["delete", "1234567890", "-f"])
     assert result.exit_code == 0
@@ -201,7 +308,6 @@ def test_delete_command_with_prompt():
 
 
 def test_delete_command_without_prompt_and_success():
-    TasksTrackerData.find_task_by_id = Mock(return_value=Task(*mock_task_data[0]))
     TasksTrackerData.delete_task = Mock(return_value=True)
     result = runner.invoke(cli_controller, ["delete", "1234567890", "-f"])
     assert result.exit_code == 0
@@ -209,8 +315,7 @@ def test_delete_command_without_prompt_and_success():
 
 
 def test_delete_command_without_prompt_and_fail():
-    TasksTrackerData.find_task_by_id = Mock(return_value=Task(*mock_task_data[0]))
-    TasksTrackerData.delete_task = Mock(return_value=False)
+    TasksTrackerData.delete_task = Mock(return_value=None)
     result = runner.invoke(cli_controller, ["delete", "1234567890", "-f"])
     assert result.exit_code == 0
     assert DELETE_TASK_ERROR in result.stdout
@@ -245,3 +350,85 @@ def test_delete_all_command_without_prompt_and_fail():
     result = runner.invoke(cli_controller, ["delete-all", "-f"])
     assert result.exit_code == 0
     assert DELETE_ALL_TASKS_ERROR in result.stdout
+
+
+def test_delete_command_with_filters_and_dry_run():
+    TasksTrackerData.count_tasks = Mock(return_value=2)
+    TasksTrackerData.delete_tasks = Mock(return_value=2)
+    result = runner.invoke(cli_controller, ["delete", "--status", "done", "--dry-run"])
+    assert result.exit_code == 0
+    assert DELETE_TASKS_DRY_RUN.format(2) in result.stdout
+    TasksTrackerData.delete_tasks.assert_not_called()
+
+    result = runner.invoke(cli_controller, ["delete", "--status", "done", "-p", "low", "-f"])
+    assert result.exit_code == 0
+    assert DELETE_TASKS_SUCCESS.format(2) in result.stdout
+    assert TasksTrackerData.delete_tasks.call_args.kwargs["priority"] == Priority.LOW
+
+
+def test_delete_command_without_target():
+    result = runner.invoke(cli_controller, ["delete", "-f"])
+    assert result.exit_code == 2
+
+
+def test_archive_command():
+    TasksTrackerData.count_tasks_to_archive = Mock(return_value=3)
+    TasksTrackerData.archive_tasks = Mock(return_value=3)
+    result = runner.invoke(cli_controller, ["archive", "--done-for", "30", "--dry-run"])
+    assert result.exit_code == 0
+    assert ARCHIVE_TASKS_DRY_RUN.format(3) in result.stdout
+    TasksTrackerData.count_tasks_to_archive.assert_called_once_with(None, 30)
+    TasksTrackerData.archive_tasks.assert_not_called()
+
+    result = runner.invoke(cli_controller, ["archive"])
+    assert result.exit_code == 0
+    assert ARCHIVE_TASKS_SUCCESS.format(3) in result.stdout
+    TasksTrackerData.archive_tasks.assert_called_once_with(None, None)
+
+    result = runner.invoke(cli_controller, ["archive", "1234567890", "--done-for", "30"])
+    assert result.exit_code == 2
+
+
+def test_list_command_with_archived_tasks():
+    TasksTrackerData.get_tasks_list = Mock(return_value=[])
+    result = runner.invoke(cli_controller, ["list", "--include-archived"])
+    assert result.exit_code == 0
+    assert TasksTrackerData.get_tasks_list.call_args.kwargs["include_archived"] is True
+
+
+def test_changes_command():
+    changes = [
+        TaskChange(
+            4, "update", "1234567890", ("1234567890", "title", None, None, None, "2022-02-02", None)
+        ),
+        TaskChange(5, "delete", "0987654321", None),
+    ]
+    TasksTrackerData.iter_changes = Mock(return_value=iter(changes))
+    result = runner.invoke(cli_controller, ["changes", "--since", "3"])
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert json.loads(lines[0])["task"]["title"] == "title"
+    assert json.loads(lines[1]) == {
+        "seq": 5,
+        "operation": "delete",
+        "id": "0987654321",
+        "task": None,
+    }
+    assert CHANGES_SUCCESS.format(5) in lines[-1]
+    TasksTrackerData.iter_changes.assert_called_once_with(3, None)
+
+
+def test_changes_command_prints_errors_to_stderr():
+    TasksTrackerData.iter_changes = Mock(side_effect=ChangesPrunedError(9))
+    result = CliRunner(mix_stderr=False).invoke(cli_controller, ["changes", "--since", "3"])
+    assert result.exit_code == 1
+    assert result.stdout == ""
+    assert "Deletes after 3 were pruned" in result.stderr
+
+
+def test_prune_changes_command():
+    TasksTrackerData.prune_changes = Mock(return_value=2)
+    result = runner.invoke(cli_controller, ["prune-changes", "--deleted-for", "7"])
+    assert result.exit_code == 0
+    assert PRUNE_CHANGES_SUCCESS.format(2) in result.stdout
+    TasksTrackerData.prune_changes.assert_called_once_with(7)
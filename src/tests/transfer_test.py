@@ -0,0 +1,227 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from tasks_tracker import cli
+from tasks_tracker.cli import cli_controller
+from tasks_tracker.database import TasksTrackerData
+
+runner = CliRunner(mix_stderr=False)
+
+csv_content = """id,title,status,priority,description,start_date,end_date
+1111111111,title_1,done,high,task 1 description,2022-02-02,
+,title_2,,,,01/01/2022,11/11/2022
+,title_3,unknown,,,,
+,,done,,,,
+"""
+
+
+@pytest.fixture(autouse=True)
+def app_data(monkeypatch, tasks_data):
+    monkeypatch.setattr(cli, "_app_data", tasks_data)
+    return tasks_data
+
+
+def write_jsonl(path, records):
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+    return str(path)
+
+
+def test_import_csv_reports_invalid_rows(tmp_path, app_data):
+    file = tmp_path / "tasks.csv"
+    file.write_text(csv_content)
+
+    result = runner.invoke(cli_controller, ["import", str(file), "--allow-past-dates"])
+
+    assert result.exit_code == 0
+    assert "Imported 2 of 4 rows" in result.stdout
+    assert "row 3: Invalid status 'unknown'" in result.stderr
+    assert "row 4: Title is required." in result.stderr
+
+    tasks = app_data.get_tasks_list()
+    assert [task.title for task in tasks] == ["title_2", "title_1"]
+    assert tasks[0].status == "not_started"
+    assert tasks[0].priority == "low"
+    assert tasks[0].end_date == "2022-11-11"
+
+
+def test_import_applies_add_command_validation(tmp_path, app_data):
+    file = tmp_path / "tasks.csv"
+    file.write_text(csv_content)
+
+    result = runner.invoke(cli_controller, ["import", str(file)])
+
+    assert result.exit_code == 0
+    assert "row 1: Start date cannot be a past date." in result.stderr
+    assert app_data.get_tasks_list() == []
+
+
+def test_import_jsonl_skips_existing_ids(tmp_path, app_data):
+    file = write_jsonl(
+        tmp_path / "tasks.jsonl",
+        [{"id": "1111111111", "title": "title_1"}, {"id": "1111111111", "title": "again"}],
+    )
+
+    result = runner.invoke(cli_controller, ["import", file, "--batch-size", "1"])
+
+    assert result.exit_code == 0
+    assert "Imported 1 of 2 rows" in result.stdout
+    assert "1 skipped with an existing ID" in result.stdout
+    assert app_data.find_task_by_id("1111111111").title == "title_1"
+
+
+def test_import_reports_malformed_json_line(tmp_path):
+    file = tmp_path / "tasks.jsonl"
+    file.write_text('{"title": "title_1"}\n{"title": \n')
+
+    result = runner.invoke(cli_controller, ["import", str(file)])
+
+    assert result.exit_code == 0
+    assert "row 2: Invalid JSON" in result.stderr
+
+
+def test_import_from_stdin_needs_format():
+    result = runner.invoke(cli_controller, ["import", "-"], input='{"title": "title_1"}\n')
+    assert result.exit_code == 1
+
+    result = runner.invoke(
+        cli_controller, ["import", "-", "--format", "jsonl"], input='{"title": "title_1"}\n'
+    )
+    assert result.exit_code == 0
+    assert "Imported 1 of 1 rows" in result.stdout
+
+
+def test_import_reports_missing_file(tmp_path):
+    result = runner.invoke(cli_controller, ["import", str(tmp_path / "missing.csv")])
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert "Cannot read the tasks from" in result.stdout
+
+
+def test_import_reports_corrupt_binary_file(tmp_path, app_data):
+    file = tmp_path / "tasks.ttb"
+    file.write_bytes(b"not a binary file")
+
+    result = runner.invoke(cli_controller, ["import", str(file)])
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert "Cannot read the tasks from" in result.stdout
+    assert app_data.get_tasks_list() == []
+
+
+def test_import_resumes_from_checkpoint(tmp_path, monkeypatch, app_data):
+    file = write_jsonl(tmp_path / "tasks.jsonl", [{"title": f"title_{i}"} for i in range(5)])
+    add_tasks_batch = TasksTrackerData.add_tasks_batch
+    batches = []
+
+    def fail_on_third_batch(self, rows, checkpoint=None, rows_done=0):
+        batches.append(rows)
+        if len(batches) == 3:
+            return None
+        return add_tasks_batch(self, rows, checkpoint, rows_done)
+
+    monkeypatch.setattr(TasksTrackerData, "add_tasks_batch", fail_on_third_batch)
+    result = runner.invoke(cli_controller, ["import", file, "--batch-size", "2"])
+    assert result.exit_code == 1
+    assert len(app_data.get_tasks_list()) == 4
+
+    monkeypatch.setattr(TasksTrackerData, "add_tasks_batch", add_tasks_batch)
+    result = runner.invoke(cli_controller, ["import", file, "--batch-size", "2"])
+    assert result.exit_code == 0
+    assert "Imported 1 of 1 rows" in result.stdout
+    assert len(app_data.get_tasks_list()) == 5
+    assert app_data.is_import_completed(str(tmp_path / "tasks.jsonl"))
+
+
+def test_import_again_adds_nothing_unless_restarted(tmp_path, app_data):
+    file = write_jsonl(tmp_path / "tasks.jsonl", [{"title": "title_1"}, {"title": "title_2"}])
+    runner.invoke(cli_controller, ["import", file])
+
+    result = runner.invoke(cli_controller, ["import", file])
+
+    assert result.exit_code == 0
+    assert "was already imported" in result.stderr
+    assert len(app_data.get_tasks_list()) == 2
+
+    result = runner.invoke(cli_controller, ["import", file, "--restart"])
+
+    assert result.exit_code == 0
+    assert "Imported 2 of 2 rows" in result.stdout
+    assert len(app_data.get_tasks_list()) == 4
+
+
+# Export command tests
+
+
+exported_task_data = [
+    ("1111111111", "title_1", "done", "high", "task, with comma", "2022-02-02", None),
+    ("2222222222", "title_2", "on_hold", "low", None, "2022-01-01", "2022-11-11"),
+    ("3333333333", "tiêu đề", "done", "low", "mô tả", "2022-03-03", None),
+]
+
+
+def test_export_jsonl_to_stdout(app_data):
+    app_data.add_tasks_batch(exported_task_data)
+
+    result = runner.invoke(cli_controller, ["export", "--status", "done"])
+
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [record["id"] for record in records] == ["1111111111", "3333333333"]
+    assert records[1]["title"] == "tiêu đề"
+    assert records[0]["end_date"] is None
+    assert "Exported 2 tasks." in result.stderr
+
+
+def test_export_csv_file(tmp_path, app_data):
+    app_data.add_tasks_batch(exported_task_data)
+    file = tmp_path / "tasks.csv"
+
+    result = runner.invoke(cli_controller, ["export", str(file), "--priority", "low"])
+
+    assert result.exit_code == 0
+    assert "Exported 2 tasks." in result.stdout
+    assert file.read_text().splitlines() == [
+        "id,title,status,priority,description,start_date,end_date",
+        "2222222222,title_2,on_hold,low,,2022-01-01,2022-11-11",
+        "3333333333,tiêu đề,done,low,mô tả,2022-03-03,",
+    ]
+
+
+def test_export_to_stdout_prints_errors_to_stderr(monkeypatch, app_data):
+    def fail(*args, **kwargs):
+        raise OSError("disk error")
+
+    monkeypatch.setattr(TasksTrackerData, "iter_task_rows", fail)
+
+    result = runner.invoke(cli_controller, ["export", "-F", "csv"])
+
+    assert result.exit_code == 1
+    assert result.stdout == ""
+    assert "Exporting tasks failed." in result.stderr
+
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl", "ttb"])
+def test_exported_file_can_be_imported(tmp_path, db_path, app_data, extension):
+    app_data.add_tasks_batch(exported_task_data)
+    file = str(tmp_path / f"tasks.{extension}")
+    runner.invoke(cli_controller, ["export", file])
+
+    other_app_data = TasksTrackerData(str(tmp_path / "other.db"))
+    cli._app_data = other_app_data
+    result = runner.invoke(cli_controller, ["import", file, "--allow-past-dates"])
+
+    assert result.exit_code == 0
+    assert list(other_app_data.iter_task_rows()) == list(app_data.iter_task_rows())
+
+
+def test_iter_task_rows_streams_in_chunks(app_data):
+    app_data.add_tasks_batch(exported_task_data)
+
+    rows = app_data.iter_task_rows(chunk_size=1)
+
+    assert next(rows)[0] == "2222222222"
+    assert [row[0] for row in rows] == ["1111111111", "3333333333"]